@@ -5,44 +5,23 @@ This module provides functionality to analyze power outage schedule images
 by detecting colored regions and converting them to time intervals.
 """
 
-from typing import Tuple, List
+import io
+from functools import lru_cache
+from typing import Callable, Dict, Optional, Sequence, Tuple, List, Union
+
+import numpy as np
 from PIL import Image
 
+from schedule_config import NO_OUTAGE, ScheduleConfig, time_to_string
 
-class ScheduleConfig:
-    """Configuration constants for schedule image analysis."""
-
-    TARGET_WIDTH: int = 1280
-    TARGET_HEIGHT: int = 335
-    START_X: int = 128
-    END_X: int = 1270
-    PIXELS_PER_HALF_HOUR: int = 24
-    TOTAL_HALF_HOURS: int = 48
-    COLOR_THRESHOLD: int = 50
-
-    QUEUE_COLORS = {
-        (254, 255, 3): "Черга 1",
-        (146, 210, 74): "Черга 2",
-        (253, 193, 0): "Черга 3",
-        (0, 178, 237): "Черга 4",
-        (236, 126, 49): "Черга 5",
-        (179, 126, 218): "Черга 6"
-    }
 
-    QUEUE_COORDINATES = {
-        "Черга 1-1": 90,
-        "Черга 1-2": 109,
-        "Черга 2-1": 127,
-        "Черга 2-2": 146,
-        "Черга 3-1": 170,
-        "Черга 3-2": 190,
-        "Черга 4-1": 214,
-        "Черга 4-2": 233,
-        "Черга 5-1": 255,
-        "Черга 5-2": 275,
-        "Черга 6-1": 298,
-        "Черга 6-2": 315,
-    }
+GridGeometry = Tuple[float, float, float, float]
+"""Grid placement in target pixels: (scale_x, offset_x, scale_y, offset_y).
+
+A ScheduleConfig coordinate c maps to offset + scale * c on the image
+resized to the target size."""
+
+NOMINAL_GEOMETRY: GridGeometry = (1.0, 0.0, 1.0, 0.0)
 
 
 def resize_image(img: Image.Image) -> Image.Image:
@@ -90,29 +69,183 @@ def is_outage_color(pixel: Tuple[int, ...],
     Returns:
         True if pixel matches any outage color
     """
-    for color in ScheduleConfig.QUEUE_COLORS.keys():
-        if calculate_rgb_distance(pixel[:3], color) < threshold:
-            return True
-    return False
+    return get_classifier(threshold=threshold).classify(pixel) != NO_OUTAGE
 
 
-def time_to_string(half_hour_index: int) -> str:
+class PaletteClassifier:
     """
-    Convert half-hour index to time string.
+    Lookup-table classifier mapping RGB colours to queue palette ids.
 
-    Args:
-        half_hour_index: Index representing 30-minute interval (0-48)
+    The RGB cube is quantized into bins of 4x4x4 colours. Bins whose colours
+    all classify the same way store the result directly; the few bins that
+    straddle a threshold sphere or a boundary between two palette colours are
+    marked ambiguous and resolved with an exact distance check, so results
+    always match the Euclidean definition.
 
-    Returns:
-        Formatted time string (HH:MM)
+    A pixel matches the nearest palette colour among those within their own
+    threshold, so every colour may have a different threshold.
     """
-    hours = half_hour_index // 2
-    minutes = 30 if half_hour_index % 2 else 0
 
-    if hours == 24:
-        return "24:00"
+    QUANT_SHIFT: int = 2
+    LEVELS: int = 256 >> QUANT_SHIFT
+    AMBIGUOUS: int = 255
+
+    def __init__(self, palette: Sequence[Tuple[int, int, int]],
+                 threshold: Union[int, Sequence[int]]):
+        """
+        Build the lookup table for a palette.
+
+        Args:
+            palette: RGB colours; matches are reported as 1-based indices
+            threshold: Maximum distance to consider colors matching, either
+                shared by all colours or one per palette colour
+        """
+        self.palette = tuple(tuple(color) for color in palette)
+        self.threshold = threshold
+        if isinstance(threshold, (int, np.integer)):
+            self.thresholds = (threshold,) * len(self.palette)
+        else:
+            self.thresholds = tuple(int(value) for value in threshold)
+            if len(self.thresholds) != len(self.palette):
+                raise ValueError("Кількість порогів не відповідає кількості кольорів")
+        self._palette_array = np.array(self.palette, dtype=np.int32).reshape(-1, 3)
+        self._threshold_sq = np.array(self.thresholds, dtype=np.int64) ** 2
+        self.table = self._build_table()
+        self._table_bytes = self.table.tobytes()
+
+    def _build_table(self) -> np.ndarray:
+        """
+        Compute the quantized lookup table.
+
+        Returns:
+            Flat uint8 array of LEVELS**3 entries
+        """
+        width = 1 << self.QUANT_SHIFT
+        low = np.arange(self.LEVELS, dtype=np.int64) * width
+        high = low + width - 1
+        colors = self._palette_array.astype(np.int64)
+
+        # Per channel and palette colour: (levels, colors) distance terms.
+        min_terms, max_terms = [], []
+        for channel in range(3):
+            c = colors[:, channel]
+            below = np.maximum(low[:, None] - c, 0)
+            above = np.maximum(c - high[:, None], 0)
+            min_terms.append((below + above) ** 2)
+            max_terms.append(np.maximum(c - low[:, None], high[:, None] - c) ** 2)
+
+        def cube(terms):
+            return (terms[0][:, None, None, :] + terms[1][None, :, None, :] +
+                    terms[2][None, None, :, :])
+
+        min_sq = cube(min_terms)
+        max_sq = cube(max_terms)
+
+        table = np.full((self.LEVELS,) * 3, self.AMBIGUOUS, dtype=np.uint8)
+        table[(min_sq >= self._threshold_sq).all(axis=-1)] = NO_OUTAGE
+
+        # d_k^2 - d_j^2 is linear in the pixel, so its maximum over a bin is
+        # reached at a bin corner chosen per channel by the sign of c_j - c_k.
+        for k in range(len(colors)):
+            inside = max_sq[..., k] < self._threshold_sq[k]
+            for j in range(len(colors)):
+                if j == k:
+                    continue
+                coefficient = 2 * (colors[j] - colors[k])
+                worst = [np.where(coefficient[ch] > 0, high, low) * coefficient[ch]
+                         for ch in range(3)]
+                margin = (worst[0][:, None, None] + worst[1][None, :, None] +
+                          worst[2][None, None, :] +
+                          (colors[k] ** 2).sum() - (colors[j] ** 2).sum())
+                inside &= margin < 0
+            table[inside] = k + 1
+
+        return table.reshape(-1)
+
+    def _table_index(self, red: int, green: int, blue: int) -> int:
+        shift = self.QUANT_SHIFT
+        return ((red >> shift) * self.LEVELS + (green >> shift)) * self.LEVELS + (blue >> shift)
+
+    def classify(self, pixel: Tuple[int, ...]) -> int:
+        """
+        Classify a single pixel.
+
+        Args:
+            pixel: RGB pixel tuple from image
+
+        Returns:
+            NO_OUTAGE or the 1-based index of the closest matching palette colour
+        """
+        red, green, blue = pixel[:3]
+        value = self._table_bytes[self._table_index(red, green, blue)]
+        if value != self.AMBIGUOUS:
+            return value
+
+        best_id, best_distance = NO_OUTAGE, None
+        for color_id, ((r, g, b), threshold) in enumerate(
+                zip(self.palette, self.thresholds), start=1):
+            distance = (red - r) ** 2 + (green - g) ** 2 + (blue - b) ** 2
+            if distance < threshold * threshold and (
+                    best_distance is None or distance < best_distance):
+                best_id, best_distance = color_id, distance
+        return best_id
+
+    def classify_array(self, pixels: np.ndarray) -> np.ndarray:
+        """
+        Classify an array of pixels with one table gather.
+
+        Args:
+            pixels: Array of shape (..., 3) or (..., 4) with RGB(A) values
+
+        Returns:
+            uint8 array of shape (...) with values as returned by classify
+        """
+        rgb = np.asarray(pixels)[..., :3].astype(np.intp) >> self.QUANT_SHIFT
+        index = (rgb[..., 0] * self.LEVELS + rgb[..., 1]) * self.LEVELS + rgb[..., 2]
+        ids = self.table[index]
+
+        ambiguous = ids == self.AMBIGUOUS
+        if ambiguous.any():
+            ids[ambiguous] = self._classify_exact(np.asarray(pixels)[ambiguous])
+        return ids
+
+    def _classify_exact(self, pixels: np.ndarray) -> np.ndarray:
+        """Classify pixels of shape (n, 3+) with batched squared distances."""
+        diff = pixels[:, np.newaxis, :3].astype(np.int32) - self._palette_array
+        distances = np.einsum('nkc,nkc->nk', diff, diff).astype(np.int64)
+        distances[distances >= self._threshold_sq] = np.iinfo(np.int64).max
+        nearest = distances.argmin(axis=-1)
+        matched = distances.min(axis=-1) < np.iinfo(np.int64).max
+        return np.where(matched, nearest + 1, NO_OUTAGE).astype(np.uint8)
+
+
+@lru_cache(maxsize=16)
+def _cached_classifier(palette: Tuple[Tuple[int, int, int], ...],
+                       threshold: Union[int, Tuple[int, ...]]) -> PaletteClassifier:
+    return PaletteClassifier(palette, threshold)
+
+
+def get_classifier(palette: Optional[Sequence[Tuple[int, int, int]]] = None,
+                   threshold: Union[int, Sequence[int]] = ScheduleConfig.COLOR_THRESHOLD
+                   ) -> PaletteClassifier:
+    """
+    Get the shared classifier for a palette and threshold.
+
+    Lookup tables are built once per (palette, threshold) pair and reused.
+
+    Args:
+        palette: RGB colours, defaults to ScheduleConfig.QUEUE_COLORS
+        threshold: Maximum distance to consider colors matching, shared or
+            one per palette colour
 
-    return f"{hours:02d}:{minutes:02d}"
+    Returns:
+        Memoized PaletteClassifier instance
+    """
+    if palette is None:
+        palette = ScheduleConfig.QUEUE_COLORS.keys()
+    if not isinstance(threshold, (int, np.integer)):
+        threshold = tuple(int(value) for value in threshold)
+    return _cached_classifier(tuple(tuple(color) for color in palette), threshold)
 
 
 def analyze_row(img: Image.Image, y_coord: int) -> List[Tuple[int, int]]:
@@ -129,13 +262,14 @@ def analyze_row(img: Image.Image, y_coord: int) -> List[Tuple[int, int]]:
     outages = []
     in_outage = False
     start_index = None
+    classifier = get_classifier()
 
     for half_hour in range(ScheduleConfig.TOTAL_HALF_HOURS):
         x = (ScheduleConfig.START_X +
              half_hour * ScheduleConfig.PIXELS_PER_HALF_HOUR +
              ScheduleConfig.PIXELS_PER_HALF_HOUR // 2)
         pixel = img.getpixel((x, y_coord))
-        has_outage = is_outage_color(pixel)
+        has_outage = classifier.classify(pixel) != NO_OUTAGE
 
         if has_outage and not in_outage:
             in_outage = True
@@ -150,19 +284,325 @@ def analyze_row(img: Image.Image, y_coord: int) -> List[Tuple[int, int]]:
     return outages
 
 
+def grid_sample_points() -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Build coordinates of every sample point in the schedule grid.
+
+    Returns:
+        Tuple of (x_coords, y_coords): 48 slot centres and 12 queue row
+        coordinates in ScheduleConfig.QUEUE_COORDINATES order
+    """
+    half = ScheduleConfig.PIXELS_PER_HALF_HOUR
+    x_coords = (ScheduleConfig.START_X + half // 2 +
+                np.arange(ScheduleConfig.TOTAL_HALF_HOURS) * half)
+    y_coords = np.fromiter(ScheduleConfig.QUEUE_COORDINATES.values(), dtype=np.intp)
+    return x_coords, y_coords
+
+
+def image_to_array(img: Image.Image) -> np.ndarray:
+    """
+    Expose decoded image pixels as a (height, width, bands) array.
+
+    Args:
+        img: PIL Image object; non-RGB modes are converted to RGB first
+
+    Returns:
+        Read-only uint8 array backed by the image bytes
+    """
+    if img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGB")
+    buffer = np.frombuffer(img.tobytes(), dtype=np.uint8)
+    return buffer.reshape(img.height, img.width, len(img.getbands()))
+
+
+class SamplingPlan:
+    """
+    Sample point layout of the schedule grid in a concrete image.
+
+    Maps the normalized ScheduleConfig coordinates into the coordinate space
+    of an image of any size, so the grid can be sampled without resampling
+    the whole image first.
+    """
+
+    def __init__(self, x_coords: np.ndarray, y_coords: np.ndarray,
+                 radius_x: int = 0, radius_y: int = 0):
+        """
+        Create a sampling plan.
+
+        Args:
+            x_coords: Source x coordinate of each half-hour slot centre
+            y_coords: Source y coordinate of each queue row
+            radius_x: Horizontal half-size of the averaged neighbourhood
+            radius_y: Vertical half-size of the averaged neighbourhood
+        """
+        self.x_coords = np.asarray(x_coords, dtype=np.intp)
+        self.y_coords = np.asarray(y_coords, dtype=np.intp)
+        self.radius_x = radius_x
+        self.radius_y = radius_y
+
+    @classmethod
+    def for_image_size(cls, size: Tuple[int, int],
+                       geometry: GridGeometry = NOMINAL_GEOMETRY) -> 'SamplingPlan':
+        """
+        Build the plan for an image of the given size.
+
+        Each normalized sample point maps to the source pixel under its centre,
+        the way resize_image would. When the source is larger than the target,
+        the neighbourhood covered by one target pixel is averaged, which
+        approximates the LANCZOS filter inside the uniform grid cells.
+
+        Args:
+            size: Source image (width, height)
+            geometry: Detected grid placement, defaults to the ScheduleConfig
+                coordinates as they are
+
+        Returns:
+            SamplingPlan in source coordinates
+        """
+        width, height = size
+        scale_x = width / ScheduleConfig.TARGET_WIDTH
+        scale_y = height / ScheduleConfig.TARGET_HEIGHT
+        x_coords, y_coords = grid_sample_points()
+        if geometry != NOMINAL_GEOMETRY:
+            grid_scale_x, offset_x, grid_scale_y, offset_y = geometry
+            x_coords = np.rint(offset_x + grid_scale_x * x_coords)
+            y_coords = np.rint(offset_y + grid_scale_y * y_coords)
+
+        source_x = np.clip(np.floor((x_coords + 0.5) * scale_x), 0, width - 1)
+        source_y = np.clip(np.floor((y_coords + 0.5) * scale_y), 0, height - 1)
+        return cls(source_x, source_y, int(scale_x // 2), int(scale_y // 2))
+
+    def bounding_box(self) -> Tuple[int, int, int, int]:
+        """
+        Get the smallest box containing every sampled pixel.
+
+        Returns:
+            Box as (left, upper, right, lower) for Image.crop
+        """
+        return (int(self.x_coords.min()) - self.radius_x,
+                int(self.y_coords.min()) - self.radius_y,
+                int(self.x_coords.max()) + self.radius_x + 1,
+                int(self.y_coords.max()) + self.radius_y + 1)
+
+    def translated(self, left: int, upper: int) -> 'SamplingPlan':
+        """
+        Move the plan into the coordinate space of a cropped image.
+
+        Args:
+            left: X offset of the crop box
+            upper: Y offset of the crop box
+
+        Returns:
+            New SamplingPlan relative to the crop box
+        """
+        return SamplingPlan(self.x_coords - left, self.y_coords - upper,
+                            self.radius_x, self.radius_y)
+
+    def sample(self, img: Image.Image) -> np.ndarray:
+        """
+        Read the sampled pixels, averaging each neighbourhood.
+
+        Only the bounding box of the sample points is converted to an array.
+
+        Args:
+            img: PIL Image object the plan was built for
+
+        Returns:
+            uint8 array of shape (12, 48, 3) with RGB values
+        """
+        left, upper, right, lower = self.bounding_box()
+        left, upper = max(left, 0), max(upper, 0)
+        right, lower = min(right, img.width), min(lower, img.height)
+        pixels = image_to_array(img.crop((left, upper, right, lower)))
+
+        dy = np.arange(-self.radius_y, self.radius_y + 1)
+        dx = np.arange(-self.radius_x, self.radius_x + 1)
+        rows = np.clip(self.y_coords[:, None] + dy - upper, 0, pixels.shape[0] - 1)
+        cols = np.clip(self.x_coords[:, None] + dx - left, 0, pixels.shape[1] - 1)
+
+        samples = pixels[rows[:, None, :, None], cols[None, :, None, :], :3]
+        if samples.shape[2] * samples.shape[3] == 1:
+            return samples[:, :, 0, 0]
+        return np.rint(samples.mean(axis=(2, 3))).astype(np.uint8)
+
+
+def classify_pixels(pixels: np.ndarray,
+                    threshold: int = ScheduleConfig.COLOR_THRESHOLD) -> np.ndarray:
+    """
+    Classify an array of RGB pixels against the queue palette.
+
+    Args:
+        pixels: Array of shape (..., 3) with RGB values
+        threshold: Maximum distance to consider colors matching
+
+    Returns:
+        uint8 array of shape (...) holding NO_OUTAGE or the 1-based index
+        of the closest matching colour in ScheduleConfig.QUEUE_COLORS
+    """
+    return get_classifier(threshold=threshold).classify_array(pixels)
+
+
+def analyze_grid(img: Image.Image, resample: bool = True) -> np.ndarray:
+    """
+    Classify all queue rows and half-hour slots of the schedule in one pass.
+
+    Args:
+        img: PIL Image object to analyze
+        resample: Resize to the target size first; when False the sampling
+            plan is mapped into the native image size instead, which avoids
+            resampling the whole image
+
+    Returns:
+        uint8 matrix of shape (12, 48) in ScheduleConfig.QUEUE_COORDINATES
+        row order; see classify_pixels for the cell values
+    """
+    if resample:
+        img = resize_image(img)
+    plan = SamplingPlan.for_image_size(img.size)
+    return classify_pixels(plan.sample(img))
+
+
+class LoadedSchedule:
+    """Decoded grid band of a schedule image with decode statistics."""
+
+    def __init__(self, image: Image.Image, plan: SamplingPlan,
+                 source_size: Tuple[int, int], decoded_size: Tuple[int, int],
+                 encoded_bytes: int, image_format: Optional[str],
+                 classifier: Optional[PaletteClassifier] = None):
+        """
+        Create a loaded schedule.
+
+        Args:
+            image: Cropped grid band
+            plan: Sampling plan relative to the grid band
+            source_size: Original image (width, height)
+            decoded_size: Image size after reduced-scale decoding
+            encoded_bytes: Number of encoded bytes read
+            image_format: Pillow format name of the source
+            classifier: Classifier of the image's palette, defaults to the
+                configured palette
+        """
+        self.image = image
+        self.plan = plan
+        self.classifier = classifier or get_classifier()
+        self.source_size = source_size
+        self.decoded_size = decoded_size
+        self.encoded_bytes = encoded_bytes
+        self.image_format = image_format
+
+    @property
+    def decoded_pixels(self) -> int:
+        """Number of pixels produced by the decoder."""
+        return self.decoded_size[0] * self.decoded_size[1]
+
+    @property
+    def decoded_bytes(self) -> int:
+        """Size of the decoded pixel buffer in bytes."""
+        return self.decoded_pixels * len(self.image.getbands())
+
+
+Calibrate = Callable[[Image.Image], Tuple[SamplingPlan, PaletteClassifier]]
+"""Builds the sampling plan and the classifier for a decoded image."""
+
+
+def load_schedule_image(source: Union[str, bytes],
+                        calibrate: Optional[Calibrate] = None) -> LoadedSchedule:
+    """
+    Decode only what is needed to analyze a schedule image.
+
+    JPEG files are decoded at the smallest DCT scale that still covers the
+    target size (Pillow draft mode), and the result is cropped to the band
+    of grid rows before any colour conversion.
+
+    Args:
+        source: Image file path or encoded image bytes
+        calibrate: Builds the sampling plan and classifier for the decoded
+            image, e.g. from a calibrated template; defaults to
+            SamplingPlan.for_image_size and the configured palette
+
+    Returns:
+        LoadedSchedule with the grid band and its sampling plan
+    """
+    if isinstance(source, str):
+        with open(source, 'rb') as f:
+            source = f.read()
+
+    with Image.open(io.BytesIO(source)) as img:
+        source_size = img.size
+        image_format = img.format
+        if image_format == 'JPEG':
+            img.draft('RGB', (ScheduleConfig.TARGET_WIDTH, ScheduleConfig.TARGET_HEIGHT))
+
+        if calibrate:
+            plan, classifier = calibrate(img)
+        else:
+            plan, classifier = SamplingPlan.for_image_size(img.size), None
+        left, upper, right, lower = plan.bounding_box()
+        box = (max(left, 0), max(upper, 0), min(right, img.width), min(lower, img.height))
+
+        band = img.crop(box)
+        decoded_size = img.size
+
+    return LoadedSchedule(band, plan.translated(box[0], box[1]), source_size,
+                          decoded_size, len(source), image_format, classifier)
+
+
+def analyze_loaded(loaded: LoadedSchedule) -> np.ndarray:
+    """
+    Classify all queue rows and half-hour slots of a loaded schedule.
+
+    Args:
+        loaded: Result of load_schedule_image
+
+    Returns:
+        uint8 matrix as returned by analyze_grid
+    """
+    return loaded.classifier.classify_array(loaded.plan.sample(loaded.image))
+
+
+def row_to_outages(row: np.ndarray) -> List[Tuple[int, int]]:
+    """
+    Convert one grid matrix row into outage periods.
+
+    Args:
+        row: Sequence of 48 slot values from analyze_grid
+
+    Returns:
+        List of tuples containing (start_index, end_index) for each outage period
+    """
+    padded = np.concatenate(([False], np.asarray(row) != NO_OUTAGE, [False]))
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    return [(int(start), int(end)) for start, end in zip(edges[::2], edges[1::2])]
+
+
+def grid_to_outages(matrix: np.ndarray) -> Dict[str, List[Tuple[int, int]]]:
+    """
+    Convert a grid matrix into outage periods for every queue.
+
+    Args:
+        matrix: Result of analyze_grid
+
+    Returns:
+        Dictionary mapping queue name to its list of (start_index, end_index)
+    """
+    return {
+        queue_name: row_to_outages(row)
+        for queue_name, row in zip(ScheduleConfig.QUEUE_COORDINATES, matrix)
+    }
+
+
 def main() -> None:
     """
     Main function for standalone script execution.
     Analyzes schedule image and prints results for all queues.
     """
-    img = Image.open("img.png")
+    loaded = load_schedule_image("img.png")
+    grid_outages = grid_to_outages(analyze_loaded(loaded))
 
     print("Прогнозовані години відключення електроенергії на 12.01.2026р.")
     print("=" * 60)
 
-    for queue_name, y_coord in ScheduleConfig.QUEUE_COORDINATES.items():
-        outages = analyze_row(img, y_coord)
-
+    for queue_name, outages in grid_outages.items():
         if outages:
             print(f"\n{queue_name}:")
             for start, end in outages:
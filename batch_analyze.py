@@ -0,0 +1,362 @@
+"""
+Batch analysis entry point.
+
+Analyzes a directory or glob of schedule images in parallel and writes
+one JSON line per image. With --watch, keeps watching a folder and analyzes
+new images as they arrive; with --async, streams files and URLs through the
+asyncio ingestion pipeline; with --diff, reports what changed between two
+revisions of a day's schedule.
+"""
+
+import argparse
+import json
+import os
+import sys
+from contextlib import nullcontext
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from src.pipeline.batch import collect_images, load_date_mapping, resolve_date, run_batch
+from src.pipeline.diff import ScheduleDiff, diff_image_with_schedule, diff_images
+from src.pipeline.ingest import (DEFAULT_QUEUE_SIZE, DEFAULT_READERS, URL_PREFIXES,
+                                 ArchiveSink, CalendarSink, IngestionPipeline, JsonlSink)
+from src.pipeline.watch import FolderWatcher
+from src.storage.archive import open_archive
+from src.storage.processed_log import ProcessedLog
+from src.storage.result_cache import ResultCache, default_cache_dir
+from src.utils.calendar_export import CalendarExporter
+from src.utils.profiling import Profiler
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    Parse command line arguments.
+
+    Args:
+        argv: Argument list, defaults to sys.argv
+
+    Returns:
+        Parsed arguments namespace
+    """
+    parser = argparse.ArgumentParser(
+        description="Пакетний аналіз графіків відключень"
+    )
+    parser.add_argument('sources', nargs='*',
+                        help="Папки, файли або glob-шаблони зображень "
+                             "(з --async також URL-адреси)")
+    parser.add_argument('--watch', metavar='DIR',
+                        help="Стежити за папкою і аналізувати нові зображення")
+    parser.add_argument('--state',
+                        help="Журнал оброблених зображень для --watch "
+                             "(за замовчуванням DIR/.processed.log)")
+    parser.add_argument('--settle', type=float, default=2.0,
+                        help="Скільки секунд файл має не змінюватись перед аналізом")
+    parser.add_argument('--poll', action='store_true',
+                        help="Опитувати папку замість inotify")
+    parser.add_argument('--async', dest='async_mode', action='store_true',
+                        help="Асинхронний конвеєр з обмеженими чергами "
+                             "(результати в порядку завершення)")
+    parser.add_argument('--queue-size', type=int, default=DEFAULT_QUEUE_SIZE,
+                        help="Місткість черг між етапами для --async")
+    parser.add_argument('--readers', type=int, default=DEFAULT_READERS,
+                        help="Кількість одночасних читань файлів і URL для --async")
+    parser.add_argument('--threads', action='store_true',
+                        help="Аналізувати в потоках замість процесів для --async")
+    parser.add_argument('--stats', action='store_true',
+                        help="Вивести пропускну здатність і глибину черг для --async")
+    parser.add_argument('--diff', nargs='+', metavar='IMAGE',
+                        help="Порівняти редакції графіка за день: СТАРЕ НОВЕ або "
+                             "лише НОВЕ проти дня з --archive")
+    parser.add_argument('-o', '--output',
+                        help="Файл JSONL для результатів (за замовчуванням stdout)")
+    parser.add_argument('--dates',
+                        help="JSON-файл з відповідністю {файл: РРРР-ММ-ДД}")
+    parser.add_argument('--date',
+                        help="Дата за замовчуванням (РРРР-ММ-ДД)")
+    parser.add_argument('-w', '--workers', type=int, default=None,
+                        help="Кількість процесів (за замовчуванням - усі ядра)")
+    parser.add_argument('--chunk-size', type=int, default=4,
+                        help="Кількість зображень на одне завдання процесу")
+    parser.add_argument('--cache-dir', default=default_cache_dir(),
+                        help="Папка кешу результатів")
+    parser.add_argument('--archive',
+                        help="Файл архіву для збереження результатів: SQLite або "
+                             "бінарний з розширенням .bin")
+    parser.add_argument('--ics-dir',
+                        help="Папка для календарів .ics (один файл на чергу)")
+    parser.add_argument('--ics-combined',
+                        help="Файл .ics з відключеннями всіх черг")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Не використовувати кеш результатів")
+    parser.add_argument('--profile', action='store_true',
+                        help="Вивести час і виділення пам'яті кожного етапу (p50/p95/макс)")
+    args = parser.parse_args(argv)
+    if not args.sources and not args.watch and not args.diff:
+        parser.error("вкажіть зображення, --watch або --diff")
+    if args.diff and len(args.diff) > 2:
+        parser.error("--diff приймає одне або два зображення")
+    if args.diff and len(args.diff) == 1 and not args.archive:
+        parser.error("для --diff з одним зображенням вкажіть --archive")
+    return args
+
+
+def export_changes(diff: ScheduleDiff, ics_dir: Optional[str],
+                   ics_combined: Optional[str]) -> bool:
+    """
+    Update the calendars of the sub-queues that changed in a day.
+
+    Args:
+        diff: Changes of the day
+        ics_dir: Optional directory of per-queue calendars
+        ics_combined: Optional combined calendar file
+
+    Returns:
+        True if every calendar was updated
+    """
+    changed = diff.changed_queues
+    if not changed:
+        return True
+    ok = True
+    for destination, combined in ((ics_dir, False), (ics_combined, True)):
+        if destination:
+            success, message = CalendarExporter.export_many([diff.new], destination, combined,
+                                                            queue_ids=changed)
+            if not success:
+                print(f"Помилка експорту календаря: {message}", file=sys.stderr)
+                ok = False
+    return ok
+
+
+def diff_revisions(args: argparse.Namespace,
+                   date_mapping: Optional[Dict[str, str]],
+                   cache_dir: Optional[str],
+                   profiler: Optional[Profiler]) -> int:
+    """
+    Report the changes between two revisions of a day's schedule.
+
+    The earlier revision is the first image, or the archived day when only
+    one image is given. Only changed sub-queues are exported to calendars;
+    the archive receives the new revision.
+
+    Args:
+        args: Parsed arguments
+        date_mapping: Optional mapping of file names or paths to YYYY-MM-DD
+        cache_dir: Result cache directory or None
+        profiler: Optional profiler receiving the stage timings
+
+    Returns:
+        Process exit code
+    """
+    new_path = args.diff[-1]
+    date_str = resolve_date(new_path, date_mapping, args.date)
+    if not date_str:
+        print("Дату графіка не вказано", file=sys.stderr)
+        return 1
+    date_obj = datetime.strptime(date_str, '%Y-%m-%d').date()
+    cache = ResultCache(cache_dir) if cache_dir else None
+
+    archive = open_archive(args.archive) if args.archive else None
+    try:
+        with profiler.track(new_path) if profiler is not None else nullcontext():
+            if len(args.diff) == 2:
+                diff = diff_images(args.diff[0], new_path, date_obj, cache)
+            else:
+                diff = diff_image_with_schedule(archive.get_day(date_obj), new_path,
+                                                date_obj, cache)
+        if archive is not None and diff.changed_queues:
+            archive.store_day(diff.new, new_path)
+    finally:
+        if archive is not None:
+            archive.close()
+
+    report = json.dumps(diff.to_dict(), ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output:
+            output.write(report + '\n')
+    else:
+        print(report)
+
+    print(f"Змінено черг: {len(diff.changed_queues)}, слотів: {diff.changed_slots}, "
+          f"класифіковано рядків: {diff.rows_classified}", file=sys.stderr)
+    ok = export_changes(diff, args.ics_dir, args.ics_combined)
+    if profiler is not None:
+        print(profiler.format_report(), file=sys.stderr)
+    return 0 if ok else 1
+
+
+def watch_folder(args: argparse.Namespace,
+                 date_mapping: Optional[Dict[str, str]],
+                 cache_dir: Optional[str],
+                 profiler: Optional[Profiler]) -> int:
+    """
+    Analyze images arriving in a folder until interrupted.
+
+    Args:
+        args: Parsed arguments
+        date_mapping: Optional mapping of file names or paths to YYYY-MM-DD
+        cache_dir: Result cache directory or None
+        profiler: Optional profiler receiving the stage timings of every image
+
+    Returns:
+        Process exit code
+    """
+    def export_diff(diff: ScheduleDiff) -> None:
+        export_changes(diff, args.ics_dir, args.ics_combined)
+
+    state = args.state or os.path.join(args.watch, '.processed.log')
+    archive = open_archive(args.archive) if args.archive else None
+    output = open(args.output, 'a', encoding='utf-8') if args.output else sys.stdout
+    watcher = None
+    try:
+        with ProcessedLog(state) as log:
+            watcher = FolderWatcher(
+                args.watch, output, log, date_mapping, args.date, args.workers, cache_dir,
+                archive, None, export_diff if args.ics_dir or args.ics_combined else None,
+                settle_seconds=args.settle, polling=args.poll, profiler=profiler
+            )
+            print(f"Стежу за папкою: {args.watch}", file=sys.stderr)
+            watcher.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        if archive is not None:
+            archive.close()
+
+    if watcher is not None:
+        print(f"Оброблено: {watcher.processed}, повторів: {watcher.skipped}, "
+              f"помилок: {watcher.failed}", file=sys.stderr)
+        for path, error in watcher.log.failures().items():
+            print(f"Не вдалося проаналізувати {path}: {error}", file=sys.stderr)
+    if profiler is not None:
+        print(profiler.format_report(), file=sys.stderr)
+    return 0
+
+
+def run_pipeline(args: argparse.Namespace,
+                 date_mapping: Optional[Dict[str, str]],
+                 cache_dir: Optional[str],
+                 profiler: Optional[Profiler]) -> int:
+    """
+    Analyze files and URLs with the asyncio ingestion pipeline.
+
+    Args:
+        args: Parsed arguments
+        date_mapping: Optional mapping of file names or paths to YYYY-MM-DD
+        cache_dir: Result cache directory or None
+        profiler: Optional profiler receiving the stage timings of every image
+
+    Returns:
+        Process exit code
+    """
+    urls = [source for source in args.sources if source.startswith(URL_PREFIXES)]
+    sources = collect_images([source for source in args.sources
+                              if not source.startswith(URL_PREFIXES)]) + urls
+    if not sources:
+        print("Зображення не знайдено", file=sys.stderr)
+        return 1
+
+    archive = open_archive(args.archive) if args.archive else None
+    output = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    calendars = [CalendarSink(destination, combined)
+                 for destination, combined in ((args.ics_dir, False), (args.ics_combined, True))
+                 if destination]
+    sinks = [JsonlSink(output), *calendars]
+    if archive is not None:
+        sinks.append(ArchiveSink(archive))
+
+    pipeline = IngestionPipeline(sinks, date_mapping, args.date, args.workers, args.readers,
+                                 args.queue_size, cache_dir, args.threads, profiler)
+    try:
+        stats = pipeline.run(sources)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        if archive is not None:
+            archive.close()
+
+    print(f"Оброблено: {stats.processed}, помилок: {stats.failed}", file=sys.stderr)
+    for calendar in calendars:
+        for message in calendar.errors:
+            print(f"Помилка експорту календаря: {message}", file=sys.stderr)
+    if args.stats:
+        print(stats.format_report(), file=sys.stderr)
+    if profiler is not None:
+        print(profiler.format_report(), file=sys.stderr)
+    return 1 if stats.failed else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Run batch analysis from the command line.
+
+    Args:
+        argv: Argument list, defaults to sys.argv
+
+    Returns:
+        Process exit code
+    """
+    args = parse_args(argv)
+    date_mapping = load_date_mapping(args.dates) if args.dates else None
+
+    cache_dir = None
+    if not args.no_cache:
+        # Open once up front so stale namespaces are pruned before workers start.
+        cache_dir = ResultCache(args.cache_dir).root
+
+    profiler = Profiler() if args.profile else None
+
+    if args.diff:
+        return diff_revisions(args, date_mapping, cache_dir, profiler)
+    if args.watch:
+        return watch_folder(args, date_mapping, cache_dir, profiler)
+    if args.async_mode:
+        return run_pipeline(args, date_mapping, cache_dir, profiler)
+
+    paths = collect_images(args.sources)
+    if not paths:
+        print("Зображення не знайдено", file=sys.stderr)
+        return 1
+
+    schedules = []
+    on_schedule = schedules.append if args.ics_dir or args.ics_combined else None
+
+    archive = open_archive(args.archive) if args.archive else None
+    try:
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as output:
+                processed, failed = run_batch(paths, output, date_mapping, args.date,
+                                              args.workers, args.chunk_size, cache_dir,
+                                              archive, on_schedule, profiler)
+        else:
+            processed, failed = run_batch(paths, sys.stdout, date_mapping, args.date,
+                                          args.workers, args.chunk_size, cache_dir,
+                                          archive, on_schedule, profiler)
+    finally:
+        if archive is not None:
+            archive.close()
+
+    print(f"Оброблено: {processed}, помилок: {failed}", file=sys.stderr)
+
+    exports = [(args.ics_dir, False), (args.ics_combined, True)]
+    for destination, combined in exports:
+        if not destination:
+            continue
+        if profiler is not None:
+            with profiler.track(destination):
+                success, message = CalendarExporter.export_many(schedules, destination, combined)
+        else:
+            success, message = CalendarExporter.export_many(schedules, destination, combined)
+        if not success:
+            print(f"Помилка експорту календаря: {message}", file=sys.stderr)
+            return 1
+        print(f"Календар збережено: {message}", file=sys.stderr)
+
+    if profiler is not None:
+        print(profiler.format_report(), file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,14 @@
+"""
+Benchmark entry point.
+
+Measures throughput, per-stage latency, peak memory and accuracy of the
+analysis pipeline on synthetic schedule images.
+"""
+
+import sys
+
+from src.bench.suite import main
+
+
+if __name__ == "__main__":
+    sys.exit(main())
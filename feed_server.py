@@ -0,0 +1,68 @@
+"""
+Feed server entry point.
+
+Publishes per-queue .ics and .json feeds from a schedule archive over HTTP
+for calendar subscriptions.
+"""
+
+import argparse
+import sys
+from typing import List, Optional
+
+from src.server.feeds import DEFAULT_WINDOW_DAYS, FeedCache
+from src.server.http_server import FeedServer
+from src.storage.archive import open_archive
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    Parse command line arguments.
+
+    Args:
+        argv: Argument list, defaults to sys.argv
+
+    Returns:
+        Parsed arguments namespace
+    """
+    parser = argparse.ArgumentParser(
+        description="Сервер підписки на графіки відключень"
+    )
+    parser.add_argument('archive',
+                        help="Файл архіву з результатами (SQLite або .bin)")
+    parser.add_argument('--host', default='127.0.0.1',
+                        help="Адреса сервера")
+    parser.add_argument('--port', type=int, default=8080,
+                        help="Порт сервера")
+    parser.add_argument('--window-days', type=int, default=DEFAULT_WINDOW_DAYS,
+                        help="Кількість минулих днів у стрічці за замовчуванням")
+    parser.add_argument('--quiet', action='store_true',
+                        help="Не виводити журнал запитів")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Run the feed server until interrupted.
+
+    Args:
+        argv: Argument list, defaults to sys.argv
+
+    Returns:
+        Process exit code
+    """
+    args = parse_args(argv)
+
+    with open_archive(args.archive, read_only=True) as archive:
+        feeds = FeedCache(archive, args.window_days)
+        with FeedServer((args.host, args.port), feeds, args.quiet) as server:
+            host, port = server.server_address[:2]
+            print(f"Сервер запущено: http://{host}:{port}/", file=sys.stderr)
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
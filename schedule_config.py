@@ -0,0 +1,95 @@
+"""
+Layout and palette configuration of schedule images.
+
+Kept apart from the image analysis code so the schedule model and the UI
+can use it without loading the imaging libraries.
+"""
+
+import hashlib
+
+
+class ScheduleConfig:
+    """Configuration constants for schedule image analysis."""
+
+    TARGET_WIDTH: int = 1280
+    TARGET_HEIGHT: int = 335
+    START_X: int = 128
+    END_X: int = 1270
+    PIXELS_PER_HALF_HOUR: int = 24
+    TOTAL_HALF_HOURS: int = 48
+    COLOR_THRESHOLD: int = 50
+    # Opt-in: detect the grid position per layout template instead of
+    # trusting the coordinates below, and learn the template's outage colours
+    # and thresholds from its grid cells; bump the version when detection
+    # or the template fingerprint changes.
+    AUTO_CALIBRATE: bool = False
+    LEARN_PALETTE: bool = False
+    CALIBRATION_VERSION: int = 3
+
+    QUEUE_COLORS = {
+        (254, 255, 3): "Черга 1",
+        (146, 210, 74): "Черга 2",
+        (253, 193, 0): "Черга 3",
+        (0, 178, 237): "Черга 4",
+        (236, 126, 49): "Черга 5",
+        (179, 126, 218): "Черга 6"
+    }
+
+    QUEUE_COORDINATES = {
+        "Черга 1-1": 90,
+        "Черга 1-2": 109,
+        "Черга 2-1": 127,
+        "Черга 2-2": 146,
+        "Черга 3-1": 170,
+        "Черга 3-2": 190,
+        "Черга 4-1": 214,
+        "Черга 4-2": 233,
+        "Черга 5-1": 255,
+        "Черга 5-2": 275,
+        "Черга 6-1": 298,
+        "Черга 6-2": 315,
+    }
+
+    @classmethod
+    def fingerprint(cls) -> str:
+        """
+        Build a stable fingerprint of the active analysis configuration.
+
+        Covers grid geometry, palette and threshold, so stored results can be
+        invalidated whenever any of them changes.
+
+        Returns:
+            Hex digest identifying the configuration
+        """
+        parts = (
+            (cls.TARGET_WIDTH, cls.TARGET_HEIGHT),
+            (cls.START_X, cls.END_X, cls.PIXELS_PER_HALF_HOUR, cls.TOTAL_HALF_HOURS),
+            cls.COLOR_THRESHOLD,
+            (cls.AUTO_CALIBRATE, cls.LEARN_PALETTE, cls.CALIBRATION_VERSION),
+            tuple(cls.QUEUE_COLORS.items()),
+            tuple(cls.QUEUE_COORDINATES.items()),
+        )
+        return hashlib.sha256(repr(parts).encode('utf-8')).hexdigest()[:16]
+
+
+NO_OUTAGE: int = 0
+"""Grid matrix value for a slot without an outage colour."""
+
+
+def time_to_string(half_hour_index: int) -> str:
+    """
+    Convert half-hour index to time string.
+
+    Args:
+        half_hour_index: Index representing 30-minute interval (0-48)
+
+    Returns:
+        Formatted time string (HH:MM)
+    """
+    hours = half_hour_index // 2
+    minutes = 30 if half_hour_index % 2 else 0
+
+    if hours == 24:
+        return "24:00"
+
+    return f"{hours:02d}:{minutes:02d}"
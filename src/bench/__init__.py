@@ -0,0 +1,19 @@
+"""
+Benchmark module.
+
+Contains the synthetic schedule image generator, the pipeline benchmark
+suite and the application start-up benchmark.
+"""
+
+from src.lazy_imports import lazy_exports
+
+_EXPORTS = {
+    "generate_case": "src.bench.synthetic",
+    "random_outage_matrix": "src.bench.synthetic",
+    "render_schedule": "src.bench.synthetic",
+    "run_benchmark": "src.bench.suite",
+    "run_startup_benchmark": "src.bench.startup",
+}
+
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
@@ -0,0 +1,83 @@
+"""
+Application start-up benchmark.
+
+Starts the GUI in fresh interpreters and measures how long importing the
+main window takes and how long it takes until the first frame is drawn.
+Also reports which heavy libraries were loaded on the way, since those
+should only be imported on first analysis or export.
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+# Libraries the start-up path must not load
+HEAVY_MODULES = ("PIL", "icalendar", "pytz", "numpy")
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import tkinter as tk
+from src.ui.main_window import ScheduleAnalyzerUI
+imported = time.perf_counter()
+first_frame = None
+try:
+    root = tk.Tk()
+    ScheduleAnalyzerUI(root)
+    root.update()
+    first_frame = time.perf_counter()
+    root.destroy()
+except tk.TclError:
+    pass
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "first_frame_ms": None if first_frame is None else (first_frame - start) * 1000,
+    "heavy_modules": [name for name in %r if name in sys.modules],
+}))
+""" % (HEAVY_MODULES,)
+
+
+def _run_probe() -> Dict[str, Any]:
+    """Start one fresh interpreter and collect its start-up timings."""
+    started = time.perf_counter()
+    completed = subprocess.run([sys.executable, "-c", _PROBE], cwd=REPO_ROOT,
+                               capture_output=True, text=True, check=True)
+    wall = time.perf_counter() - started
+    probe = json.loads(completed.stdout.strip().splitlines()[-1])
+    probe["process_ms"] = wall * 1000
+    return probe
+
+
+def _median(values: List[float]) -> Optional[float]:
+    return statistics.median(values) if values else None
+
+
+def run_startup_benchmark(runs: int) -> Dict[str, Any]:
+    """
+    Measure application start-up in fresh interpreters.
+
+    Args:
+        runs: Number of interpreter starts
+
+    Returns:
+        JSON-ready dictionary with median import, first-frame and whole
+        process times in milliseconds (first frame is None without a
+        display) and the heavy libraries loaded during start-up
+    """
+    probes = [_run_probe() for _ in range(runs)]
+    frames = [probe["first_frame_ms"] for probe in probes
+              if probe["first_frame_ms"] is not None]
+    heavy = sorted({name for probe in probes for name in probe["heavy_modules"]})
+    return {
+        "runs": runs,
+        "import_ms": _median([probe["import_ms"] for probe in probes]),
+        "first_frame_ms": _median(frames),
+        "process_ms": _median([probe["process_ms"] for probe in probes]),
+        "heavy_modules": heavy,
+    }
@@ -0,0 +1,376 @@
+"""
+Performance and accuracy benchmark suite for the analysis pipeline.
+
+Runs every pipeline stage on synthetic schedule images with known ground
+truth and reports throughput, per-stage latency, peak memory and
+classification accuracy. Results are saved as JSON for comparison between
+runs.
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pytz
+from PIL import Image
+
+from analyze_schedule import (ScheduleConfig, analyze_grid, analyze_loaded, analyze_row,
+                              get_classifier, load_schedule_image, resize_image)
+from src.bench.startup import run_startup_benchmark
+from src.bench.synthetic import generate_case
+from src.core.schedule import QUEUE_NAMES, DaySchedule, mask_from_intervals
+from src.pipeline.analysis import analyze_image_bytes
+from src.utils.calendar_export import CalendarExporter
+from src.utils.ics_writer import write_calendar
+from src.utils.result_builder import build_queue_result
+
+
+BenchCase = Tuple[bytes, np.ndarray]
+
+
+class StageStats:
+    """Latency samples and peak traced memory of one benchmark stage."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.durations: List[float] = []
+        self.peak_bytes = 0
+
+    def measure(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run a function once, recording its duration and peak allocation.
+
+        Args:
+            func: Stage function
+            *args: Arguments passed to the function
+
+        Returns:
+            Return value of the function
+        """
+        tracemalloc.reset_peak()
+        start_traced = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        result = func(*args)
+        self.durations.append(time.perf_counter() - start)
+        self.peak_bytes = max(self.peak_bytes,
+                              tracemalloc.get_traced_memory()[1] - start_traced)
+        return result
+
+    def summary(self) -> Dict[str, float]:
+        """Latency percentiles in milliseconds and peak memory in KiB."""
+        ordered = sorted(self.durations)
+        return {
+            "count": len(ordered),
+            "mean_ms": statistics.fmean(ordered) * 1000,
+            "p50_ms": _percentile(ordered, 0.50) * 1000,
+            "p95_ms": _percentile(ordered, 0.95) * 1000,
+            "max_ms": ordered[-1] * 1000,
+            "peak_kib": self.peak_bytes / 1024,
+        }
+
+
+def _percentile(ordered: Sequence[float], fraction: float) -> float:
+    index = min(int(round(fraction * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def _accuracy(matrix: np.ndarray, truth: np.ndarray) -> float:
+    return float(((matrix != 0) == (truth != 0)).mean())
+
+
+def _legacy_rows(img: Image.Image) -> np.ndarray:
+    matrix = np.zeros((len(QUEUE_NAMES), ScheduleConfig.TOTAL_HALF_HOURS), dtype=np.uint8)
+    for row, y_coord in enumerate(ScheduleConfig.QUEUE_COORDINATES.values()):
+        for start, end in analyze_row(img, y_coord):
+            matrix[row, start:end] = 1
+    return matrix
+
+
+def _summarize_queues(schedule: DaySchedule) -> List[Dict[str, Any]]:
+    return [
+        build_queue_result(name, schedule.intervals(index), schedule.date)
+        for index, name in enumerate(QUEUE_NAMES)
+    ]
+
+
+def _export_busiest_queue(results: List[Dict[str, Any]], filename: str) -> None:
+    busiest = max(results, key=lambda item: item["total_outage_time"]["total_minutes"])
+    CalendarExporter.export_to_ics(busiest, datetime(2026, 1, 12), filename)
+
+
+def build_cases(count: int, sizes: Sequence[Tuple[int, int]],
+                jpeg_quality: Optional[int], noise: float, seed: int) -> List[BenchCase]:
+    """
+    Generate the synthetic benchmark inputs.
+
+    Args:
+        count: Number of images per size
+        sizes: Image sizes to render
+        jpeg_quality: JPEG quality, or None for PNG
+        noise: Standard deviation of Gaussian pixel noise
+        seed: Base random seed
+
+    Returns:
+        List of (encoded image bytes, ground-truth matrix)
+    """
+    return [
+        generate_case(seed + index, size, jpeg_quality, noise)
+        for size in sizes
+        for index in range(count)
+    ]
+
+
+def run_benchmark(cases: List[BenchCase]) -> Dict[str, Any]:
+    """
+    Run every pipeline stage on the benchmark cases.
+
+    Args:
+        cases: Result of build_cases
+
+    Returns:
+        JSON-ready dictionary with stage statistics, throughput and accuracy
+    """
+    stage_names = ("decode_full", "resize_image", "analyze_row_x12", "analyze_grid",
+                   "load_schedule_image", "analyze_loaded", "queue_summary",
+                   "export_to_ics", "pipeline_total")
+    stages = {name: StageStats(name) for name in stage_names}
+    legacy_accuracy, pipeline_accuracy = [], []
+
+    # Build the lookup table up front so it is not charged to the first image.
+    get_classifier()
+    tracemalloc.start()
+    pipeline_start = time.perf_counter()
+    pipeline_time = 0.0
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        ics_path = os.path.join(tmp_dir, 'bench.ics')
+
+        for data, truth in cases:
+            def decode_full() -> Image.Image:
+                img = Image.open(io.BytesIO(data))
+                img.load()
+                return img
+
+            img = stages["decode_full"].measure(decode_full)
+            resized = stages["resize_image"].measure(resize_image, img)
+            legacy = stages["analyze_row_x12"].measure(_legacy_rows, resized)
+            stages["analyze_grid"].measure(analyze_grid, resized)
+            legacy_accuracy.append(_accuracy(legacy, truth))
+
+            loaded = stages["load_schedule_image"].measure(load_schedule_image, data)
+            matrix = stages["analyze_loaded"].measure(analyze_loaded, loaded)
+            pipeline_accuracy.append(_accuracy(matrix, truth))
+
+            schedule = DaySchedule.from_matrix(datetime(2026, 1, 12), matrix)
+            results = stages["queue_summary"].measure(_summarize_queues, schedule)
+            stages["export_to_ics"].measure(_export_busiest_queue, results, ics_path)
+
+            started = time.perf_counter()
+            stages["pipeline_total"].measure(analyze_image_bytes, data)
+            pipeline_time += time.perf_counter() - started
+
+    total_time = time.perf_counter() - pipeline_start
+    tracemalloc.stop()
+
+    return {
+        "created_at": datetime.now().isoformat(timespec='seconds'),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "images": len(cases),
+        "images_per_second": len(cases) / pipeline_time if pipeline_time else 0.0,
+        "suite_seconds": total_time,
+        "stages": {name: stats.summary() for name, stats in stages.items()},
+        "accuracy": {
+            "legacy_resize_rows": statistics.fmean(legacy_accuracy),
+            "pipeline": statistics.fmean(pipeline_accuracy),
+            "pipeline_min": min(pipeline_accuracy),
+        },
+    }
+
+
+def run_ics_benchmark(days: int, seed: int = 0) -> Dict[str, Any]:
+    """
+    Compare the icalendar exporter with the streaming writer.
+
+    Builds one multi-day calendar per sub-queue from random schedules with
+    both serializers and checks that the output bytes are identical.
+
+    Args:
+        days: Number of consecutive days per calendar
+        seed: Random seed of the schedules
+
+    Returns:
+        JSON-ready dictionary with timings, event count and byte equality
+    """
+    rng = random.Random(seed)
+    start = datetime(2026, 1, 1)
+    feeds = []
+    for name in QUEUE_NAMES:
+        feed = []
+        for offset in range(days):
+            date_obj = start + timedelta(days=offset)
+            slots = sorted(rng.sample(range(0, 42, 7), 3))
+            mask = mask_from_intervals([(slot, slot + rng.randint(1, 6)) for slot in slots])
+            feed.append((date_obj, DaySchedule(date_obj, [mask]).outage_list(0)))
+        feeds.append((name, feed))
+
+    tz = pytz.timezone(CalendarExporter.TIMEZONE)
+    tree_time = stream_time = 0.0
+    identical = True
+    events = 0
+
+    for name, feed in feeds:
+        started = time.perf_counter()
+        cal = CalendarExporter._create_calendar(name)
+        for date_obj, outages in feed:
+            for outage in outages:
+                cal.add_component(CalendarExporter._create_event(outage, date_obj, name, tz))
+        tree_bytes = cal.to_ical()
+        tree_time += time.perf_counter() - started
+
+        started = time.perf_counter()
+        buffer = io.BytesIO()
+        events += write_calendar(buffer, name, feed)
+        stream_time += time.perf_counter() - started
+
+        identical &= buffer.getvalue() == tree_bytes
+
+    return {
+        "events": events,
+        "icalendar_seconds": tree_time,
+        "streaming_seconds": stream_time,
+        "speedup": tree_time / stream_time if stream_time else 0.0,
+        "identical": identical,
+    }
+
+
+def format_report(results: Dict[str, Any],
+                  baseline: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Format benchmark results as a text table.
+
+    Args:
+        results: Result of run_benchmark
+        baseline: Optional earlier results to compare p50 latency against
+
+    Returns:
+        Multi-line report
+    """
+    lines = [
+        f"Зображень: {results['images']}, "
+        f"пропускна здатність: {results['images_per_second']:.1f} зобр/с",
+        f"Точність: конвеєр {results['accuracy']['pipeline']:.4f} "
+        f"(мін. {results['accuracy']['pipeline_min']:.4f}), "
+        f"resize + analyze_row {results['accuracy']['legacy_resize_rows']:.4f}",
+        "",
+        f"{'Етап':<22}{'p50 мс':>10}{'p95 мс':>10}{'макс мс':>10}{'пік КіБ':>12}"
+        + (f"{'зміна p50':>12}" if baseline else ""),
+    ]
+
+    for name, stats in results["stages"].items():
+        line = (f"{name:<22}{stats['p50_ms']:>10.3f}{stats['p95_ms']:>10.3f}"
+                f"{stats['max_ms']:>10.3f}{stats['peak_kib']:>12.1f}")
+        previous = (baseline or {}).get("stages", {}).get(name)
+        if previous and previous["p50_ms"]:
+            change = (stats["p50_ms"] / previous["p50_ms"] - 1) * 100
+            line += f"{change:>+11.1f}%"
+        lines.append(line)
+
+    ics = results.get("ics")
+    if ics:
+        lines += [
+            "",
+            f"ICS: {ics['events']} подій, icalendar {ics['icalendar_seconds']:.3f} с, "
+            f"потоковий запис {ics['streaming_seconds']:.3f} с "
+            f"(x{ics['speedup']:.1f}), ідентично: {'так' if ics['identical'] else 'ні'}",
+        ]
+
+    startup = results.get("startup")
+    if startup:
+        lines += ["", f"Час запуску, медіана (процесів: {startup['runs']}):"]
+        previous = (baseline or {}).get("startup", {})
+        for key, label in (("import_ms", "імпорт вікна"),
+                           ("first_frame_ms", "перший кадр"),
+                           ("process_ms", "процес цілком")):
+            value = startup[key]
+            if value is None:
+                lines.append(f"  {label:<20}{'немає дисплея':>14}")
+                continue
+            line = f"  {label:<20}{value:>11.1f} мс"
+            if previous.get(key):
+                line += f"{(value / previous[key] - 1) * 100:>+11.1f}%"
+            lines.append(line)
+        lines.append("  Важкі модулі при запуску: "
+                     + (", ".join(startup["heavy_modules"]) or "немає"))
+
+    return "\n".join(lines)
+
+
+def parse_size(value: str) -> Tuple[int, int]:
+    """Parse a WIDTHxHEIGHT size string."""
+    width, height = value.lower().split('x')
+    return int(width), int(height)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Run the benchmark suite from the command line.
+
+    Args:
+        argv: Argument list, defaults to sys.argv
+
+    Returns:
+        Process exit code
+    """
+    parser = argparse.ArgumentParser(description="Бенчмарк конвеєра аналізу графіків")
+    parser.add_argument('--count', type=int, default=20,
+                        help="Кількість зображень кожного розміру")
+    parser.add_argument('--sizes', default="1280x335,2560x670,5120x1340",
+                        help="Розміри зображень через кому (ШxВ)")
+    parser.add_argument('--jpeg-quality', type=int, default=85,
+                        help="Якість JPEG (0 - PNG без втрат)")
+    parser.add_argument('--noise', type=float, default=3.0,
+                        help="Стандартне відхилення шуму пікселів")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--ics-days', type=int, default=0,
+                        help="Порівняти експорт ICS на календарях з такою кількістю днів")
+    parser.add_argument('--startup', type=int, default=0, metavar='N',
+                        help="Виміряти запуск застосунку в N нових процесах")
+    parser.add_argument('-o', '--output', help="Зберегти результати у JSON-файл")
+    parser.add_argument('--baseline', help="JSON-файл попереднього запуску для порівняння")
+    args = parser.parse_args(argv)
+
+    sizes = [parse_size(size) for size in args.sizes.split(',')]
+    cases = build_cases(args.count, sizes, args.jpeg_quality or None, args.noise, args.seed)
+    results = run_benchmark(cases)
+    if args.ics_days:
+        results["ics"] = run_ics_benchmark(args.ics_days, args.seed)
+    if args.startup:
+        results["startup"] = run_startup_benchmark(args.startup)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    print(format_report(results, baseline))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    return 0
+
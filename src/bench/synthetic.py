@@ -0,0 +1,153 @@
+"""
+Synthetic schedule image generator with known ground truth.
+
+Renders schedule images in the ScheduleConfig layout from an outage matrix
+at any resolution, optionally with noise and JPEG compression.
+"""
+
+import io
+import random
+from typing import Optional, Tuple
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from analyze_schedule import NO_OUTAGE, ScheduleConfig
+
+
+BACKGROUND_COLOR = (255, 255, 255)
+GRID_COLOR = (190, 190, 190)
+HEADER_COLOR = (47, 84, 150)
+HEADER_TEXT_COLOR = (255, 255, 255)
+HEADER_HEIGHT = 60
+ROW_HALF_HEIGHT = 8
+
+
+def random_outage_matrix(rng: random.Random, density: float = 0.4) -> np.ndarray:
+    """
+    Generate a random ground-truth outage matrix.
+
+    Outages are drawn as runs of consecutive slots; each queue row uses the
+    palette colour of its queue.
+
+    Args:
+        rng: Random number generator
+        density: Approximate fraction of slots with an outage
+
+    Returns:
+        uint8 matrix of shape (12, 48) in the analyze_grid format
+    """
+    rows = len(ScheduleConfig.QUEUE_COORDINATES)
+    slots = ScheduleConfig.TOTAL_HALF_HOURS
+    matrix = np.full((rows, slots), NO_OUTAGE, dtype=np.uint8)
+
+    for row in range(rows):
+        slot = 0
+        while slot < slots:
+            length = rng.randint(1, 8)
+            if rng.random() < density:
+                matrix[row, slot:slot + length] = row // 2 + 1
+            slot += length
+
+    return matrix
+
+
+def render_schedule(matrix: np.ndarray,
+                    size: Tuple[int, int] = (ScheduleConfig.TARGET_WIDTH,
+                                             ScheduleConfig.TARGET_HEIGHT),
+                    noise: float = 0.0,
+                    rng: Optional[random.Random] = None) -> Image.Image:
+    """
+    Render a schedule image for an outage matrix.
+
+    Geometry is scaled from the normalized ScheduleConfig layout directly to
+    the requested size, so no resampling artefacts are introduced.
+
+    Args:
+        matrix: Ground-truth matrix in the analyze_grid format
+        size: Output image (width, height)
+        noise: Standard deviation of Gaussian pixel noise
+        rng: Random number generator for the noise
+
+    Returns:
+        RGB image
+    """
+    width, height = size
+    scale_x = width / ScheduleConfig.TARGET_WIDTH
+    scale_y = height / ScheduleConfig.TARGET_HEIGHT
+    palette = list(ScheduleConfig.QUEUE_COLORS)
+    half = ScheduleConfig.PIXELS_PER_HALF_HOUR
+
+    img = Image.new('RGB', size, BACKGROUND_COLOR)
+    draw = ImageDraw.Draw(img)
+    draw.rectangle([0, 0, width - 1, round(HEADER_HEIGHT * scale_y) - 1], fill=HEADER_COLOR)
+    for hour in range(0, 24, 2):
+        x = (ScheduleConfig.START_X + hour * 2 * half + 2) * scale_x
+        draw.text((x, 35 * scale_y), f"{hour:02d}", fill=HEADER_TEXT_COLOR)
+
+    for row, (queue_name, y) in enumerate(ScheduleConfig.QUEUE_COORDINATES.items()):
+        draw.text((20 * scale_x, (y - 6) * scale_y), queue_name.split()[-1], fill=(0, 0, 0))
+        top = round((y - ROW_HALF_HEIGHT) * scale_y)
+        bottom = round((y + ROW_HALF_HEIGHT + 1) * scale_y) - 1
+        for slot, value in enumerate(matrix[row]):
+            if value == NO_OUTAGE:
+                continue
+            left = round((ScheduleConfig.START_X + slot * half) * scale_x)
+            right = round((ScheduleConfig.START_X + (slot + 1) * half) * scale_x) - 1
+            draw.rectangle([left, top, right, bottom], fill=palette[value - 1])
+
+    for slot in range(ScheduleConfig.TOTAL_HALF_HOURS + 1):
+        x = round((ScheduleConfig.START_X + slot * half) * scale_x)
+        draw.line([x, HEADER_HEIGHT * scale_y, x, height - 1], fill=GRID_COLOR)
+
+    if noise > 0:
+        seed = (rng or random.Random()).randrange(2 ** 32)
+        pixels = np.asarray(img, dtype=np.float32)
+        pixels += np.random.default_rng(seed).normal(0.0, noise, pixels.shape)
+        img = Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8), 'RGB')
+
+    return img
+
+
+def encode_image(img: Image.Image, jpeg_quality: Optional[int] = None) -> bytes:
+    """
+    Encode an image the way schedules are distributed.
+
+    Args:
+        img: Image to encode
+        jpeg_quality: JPEG quality 1-95, or None for lossless PNG
+
+    Returns:
+        Encoded image bytes
+    """
+    buffer = io.BytesIO()
+    if jpeg_quality:
+        img.save(buffer, 'JPEG', quality=jpeg_quality)
+    else:
+        img.save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+def generate_case(seed: int,
+                  size: Tuple[int, int] = (ScheduleConfig.TARGET_WIDTH,
+                                           ScheduleConfig.TARGET_HEIGHT),
+                  jpeg_quality: Optional[int] = None,
+                  noise: float = 0.0,
+                  density: float = 0.4) -> Tuple[bytes, np.ndarray]:
+    """
+    Generate an encoded schedule image together with its ground truth.
+
+    Args:
+        seed: Seed making the case reproducible
+        size: Output image (width, height)
+        jpeg_quality: JPEG quality, or None for PNG
+        noise: Standard deviation of Gaussian pixel noise
+        density: Approximate fraction of slots with an outage
+
+    Returns:
+        Tuple of (encoded image bytes, ground-truth matrix)
+    """
+    rng = random.Random(seed)
+    matrix = random_outage_matrix(rng, density)
+    img = render_schedule(matrix, size, noise, rng)
+    return encode_image(img, jpeg_quality), matrix
@@ -0,0 +1,28 @@
+"""
+Core schedule model module.
+
+Contains the compact bitmask representation of outage schedules, the
+comparison table of per-day queue summaries and the automatic grid and
+palette calibration.
+"""
+
+from src.lazy_imports import lazy_exports
+
+_EXPORTS = {
+    "QUEUE_NAMES": "src.core.schedule",
+    "ComparisonTable": "src.core.comparison",
+    "DaySchedule": "src.core.schedule",
+    "GridCalibrator": "src.core.calibration",
+    "ScheduleSeries": "src.core.schedule",
+    "TemplateCalibration": "src.core.calibration",
+    "detect_geometry": "src.core.calibration",
+    "get_calibrator": "src.core.calibration",
+    "learn_palette": "src.core.palette",
+    "mask_intervals": "src.core.schedule",
+    "mask_minutes": "src.core.schedule",
+    "queue_id": "src.core.schedule",
+    "queue_name": "src.core.schedule",
+}
+
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
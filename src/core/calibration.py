@@ -0,0 +1,438 @@
+"""
+Automatic grid calibration for schedule images.
+
+Detects where the schedule grid actually is in an image: the half-hour
+columns from the periodic vertical grid lines and the queue rows from the
+bands of palette colours. The outage palette is then learned from the grid
+cells. Both are cached per layout template, identified by a perceptual hash
+of the queue label column, so images made from the same template skip
+detection and go straight to sampling and the table lookup. The cache file
+is shared between processes: a miss first merges what other processes saved.
+"""
+
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from analyze_schedule import (NOMINAL_GEOMETRY, NO_OUTAGE, GridGeometry, PaletteClassifier,
+                              SamplingPlan, ScheduleConfig, get_classifier, grid_sample_points)
+from src.core.palette import MAX_COLOR_SHIFT, Palette, learn_palette, nominal_palette
+
+
+# Top fraction of the image used as the header: above the first queue row,
+# even when the grid is shifted down a little
+HEADER_FRACTION = 0.2
+# Left fraction of the image below the header holding the queue labels; it
+# carries no date or outage colours, unlike the header and the grid
+LABEL_FRACTION = 0.08
+LABEL_HASH_SIZE = (8, 32)
+
+SCALE_RANGE = 0.15
+SCALE_STEP_X = 0.002
+SCALE_STEP_Y = 0.005
+MAX_OFFSET_X = 120
+MAX_OFFSET_Y = 30
+
+# Whole slots the first grid line is searched for around the best comb fit,
+# and the number of consecutive lines that must start there
+ANCHOR_SLOTS = MAX_OFFSET_X // ScheduleConfig.PIXELS_PER_HALF_HOUR
+ANCHOR_RUN = 3
+# Detected lines must be this many times stronger than the typical column
+MIN_LINE_CONTRAST = 3.0
+# Fraction of grid pixels in palette colours needed to place the rows
+MIN_ROW_COVERAGE = 0.05
+
+
+def layout_fingerprint(img: Image.Image) -> str:
+    """
+    Identify the layout template of a schedule image.
+
+    Combines the image size with an average hash of the downscaled queue
+    label column. The header with the date and the grid with the day's
+    outages are left out, so every day drawn on a template maps to the same
+    fingerprint; the hash also ignores JPEG noise.
+
+    Args:
+        img: Decoded schedule image
+
+    Returns:
+        Fingerprint string, e.g. "1280x335-3f00ffe0..."
+    """
+    width, height = img.size
+    top = min(int(height * HEADER_FRACTION), height - 1)
+    labels = img.crop((0, top, max(int(width * LABEL_FRACTION), 1), height))
+    small = np.asarray(labels.convert('L').resize(LABEL_HASH_SIZE, Image.Resampling.BOX),
+                       dtype=np.float32)
+    bits = np.packbits((small > small.mean()).reshape(-1))
+    return f"{width}x{height}-{bits.tobytes().hex()}"
+
+
+def _line_positions() -> np.ndarray:
+    """Template x coordinates of the vertical lines between half-hour slots."""
+    half = ScheduleConfig.PIXELS_PER_HALF_HOUR
+    return ScheduleConfig.START_X + half * np.arange(ScheduleConfig.TOTAL_HALF_HOURS + 1)
+
+
+def _row_positions() -> Tuple[np.ndarray, np.ndarray]:
+    """Template y coordinates of the queue row centres and the gaps between them."""
+    rows = np.fromiter(ScheduleConfig.QUEUE_COORDINATES.values(), dtype=np.float64)
+    return rows, (rows[:-1] + rows[1:]) / 2
+
+
+def _column_profile(gray: np.ndarray) -> np.ndarray:
+    """Vertical edge strength of every column below the header, widened by a pixel."""
+    top = int(gray.shape[0] * HEADER_FRACTION)
+    edges = np.abs(np.diff(gray[top:], axis=1)).mean(axis=0)
+    profile = np.zeros(gray.shape[1] + 2)
+    profile[1:-2] = edges
+    return np.maximum(np.maximum(profile[:-2], profile[1:-1]), profile[2:])
+
+
+def _detect_columns(gray: np.ndarray) -> Tuple[float, float]:
+    """
+    Fit the vertical grid lines.
+
+    Returns:
+        Tuple of (scale_x, offset_x), nominal when no grid lines are found
+    """
+    profile = _column_profile(gray)
+    width = len(profile)
+    lines = _line_positions()
+
+    scales = np.arange(1 - SCALE_RANGE, 1 + SCALE_RANGE + 1e-9, SCALE_STEP_X)
+    offsets = np.arange(-MAX_OFFSET_X, MAX_OFFSET_X + 1)
+    # Lines outside the image score zero through the padding
+    padded = np.concatenate((profile, np.zeros(1)))
+    scores = np.empty((len(scales), len(offsets)))
+    for index, scale in enumerate(scales):
+        positions = np.rint(offsets[:, None] + scale * lines).astype(np.intp)
+        positions[(positions < 0) | (positions >= width)] = width
+        scores[index] = padded[positions].sum(axis=-1)
+
+    best_scale, best_offset = np.unravel_index(scores.argmax(), scores.shape)
+    scale, offset = float(scales[best_scale]), float(offsets[best_offset])
+
+    # A comb shifted by whole slots matches almost as well; anchor it at the
+    # first line, i.e. the first tooth without a line one slot before that
+    # starts a run of lines. The run skips isolated edges such as the queue
+    # labels left of the grid.
+    step = scale * ScheduleConfig.PIXELS_PER_HALF_HOUR
+    shifts = np.arange(-ANCHOR_SLOTS - 1, ANCHOR_SLOTS + ANCHOR_RUN)
+    teeth = np.rint(offset + scale * lines[0] + step * shifts).astype(np.intp)
+    strengths = np.where((teeth >= 0) & (teeth < width), profile[np.clip(teeth, 0, width - 1)], 0)
+
+    grid_teeth = np.rint(offset + scale * lines).astype(np.intp)
+    grid_teeth = grid_teeth[(grid_teeth >= 0) & (grid_teeth < width)]
+    typical = float(np.median(profile)) + 1e-6
+    line_strength = float(np.median(profile[grid_teeth])) if len(grid_teeth) else 0.0
+    if line_strength < MIN_LINE_CONTRAST * typical:
+        return NOMINAL_GEOMETRY[0], NOMINAL_GEOMETRY[1]
+
+    is_line = strengths >= line_strength / 2
+    for index in range(1, len(shifts) - ANCHOR_RUN + 1):
+        if not is_line[index - 1] and is_line[index:index + ANCHOR_RUN].all():
+            offset += float(shifts[index]) * step
+            break
+    return scale, offset
+
+
+def _detect_rows(ids: np.ndarray, scale_x: float, offset_x: float) -> Tuple[float, float]:
+    """
+    Fit the queue row bands.
+
+    Args:
+        ids: Palette classification of the target-size image
+        scale_x: Detected horizontal scale
+        offset_x: Detected horizontal offset
+
+    Returns:
+        Tuple of (scale_y, offset_y), nominal when too few cells are coloured
+    """
+    height, width = ids.shape
+    lines = _line_positions()
+    left = int(np.clip(offset_x + scale_x * lines[0], 0, width - 1))
+    right = int(np.clip(offset_x + scale_x * lines[-1], left + 1, width))
+    coverage = (ids[:, left:right] != NO_OUTAGE).mean(axis=1)
+    if coverage.max(initial=0) < MIN_ROW_COVERAGE:
+        return NOMINAL_GEOMETRY[2], NOMINAL_GEOMETRY[3]
+
+    rows, gaps = _row_positions()
+    scales = np.arange(1 - SCALE_RANGE, 1 + SCALE_RANGE + 1e-9, SCALE_STEP_Y)
+    offsets = np.arange(-MAX_OFFSET_Y, MAX_OFFSET_Y + 1)
+
+    def sample(points: np.ndarray) -> np.ndarray:
+        positions = np.rint(offsets[None, :, None] + scales[:, None, None] * points)
+        positions = positions.astype(np.intp)
+        inside = (positions >= 0) & (positions < height)
+        return np.where(inside, coverage[np.clip(positions, 0, height - 1)], 0).sum(axis=-1)
+
+    # Prefer the placement closest to the template among equal fits
+    penalty = 1e-3 * (np.abs(scales - 1)[:, None] * height + np.abs(offsets)[None, :])
+    scores = sample(rows) - sample(gaps) - penalty
+    best_scale, best_offset = np.unravel_index(scores.argmax(), scores.shape)
+    return float(scales[best_scale]), float(offsets[best_offset])
+
+
+def _target_pixels(img: Image.Image) -> np.ndarray:
+    """RGB array of a copy of the image resized to the target size."""
+    if img.mode not in ('RGB', 'RGBA', 'L'):
+        img = img.convert('RGB')
+    # Resize before converting, and shrink large images by whole factors first
+    target = img.resize((ScheduleConfig.TARGET_WIDTH, ScheduleConfig.TARGET_HEIGHT),
+                        Image.Resampling.BILINEAR, reducing_gap=3.0)
+    return np.asarray(target.convert('RGB'))
+
+
+def _fit_geometry(pixels: np.ndarray) -> GridGeometry:
+    """Fit both grid axes on a target-size RGB array."""
+    gray = pixels.astype(np.float32).mean(axis=-1)
+    scale_x, offset_x = _detect_columns(gray)
+    # Match the palette loosely, so rows are found before the palette is learned
+    ids = get_classifier(threshold=MAX_COLOR_SHIFT).classify_array(pixels)
+    scale_y, offset_y = _detect_rows(ids, scale_x, offset_x)
+    return scale_x, offset_x, scale_y, offset_y
+
+
+def detect_geometry(img: Image.Image) -> GridGeometry:
+    """
+    Detect the grid placement of a schedule image.
+
+    Works on a copy resized to the target size; each axis falls back to the
+    ScheduleConfig coordinates when its evidence is too weak.
+
+    Args:
+        img: Decoded schedule image
+
+    Returns:
+        Grid geometry in target pixels
+    """
+    return _fit_geometry(_target_pixels(img))
+
+
+def geometry_is_valid(geometry: GridGeometry) -> bool:
+    """Check that every sample point of a geometry lies inside the target image."""
+    scale_x, offset_x, scale_y, offset_y = geometry
+    x_coords, y_coords = grid_sample_points()
+    x_coords = offset_x + scale_x * x_coords
+    y_coords = offset_y + scale_y * y_coords
+    return (x_coords.min() >= 0 and x_coords.max() < ScheduleConfig.TARGET_WIDTH and
+            y_coords.min() >= 0 and y_coords.max() < ScheduleConfig.TARGET_HEIGHT)
+
+
+class TemplateCalibration:
+    """Grid geometry and outage palette detected for one layout template."""
+
+    __slots__ = ('geometry', 'palette', 'thresholds')
+
+    def __init__(self, geometry: GridGeometry = NOMINAL_GEOMETRY,
+                 palette: Optional[Palette] = None,
+                 thresholds: Optional[Tuple[int, ...]] = None):
+        """
+        Create a calibration.
+
+        Args:
+            geometry: Grid placement in target pixels
+            palette: Outage colours, defaults to ScheduleConfig.QUEUE_COLORS
+            thresholds: Matching threshold of every colour, defaults to
+                ScheduleConfig.COLOR_THRESHOLD for all
+        """
+        default_palette, default_thresholds = nominal_palette()
+        self.geometry = geometry
+        self.palette = palette or default_palette
+        self.thresholds = thresholds or default_thresholds
+
+    def classifier(self) -> PaletteClassifier:
+        """Get the shared lookup-table classifier of this palette."""
+        return get_classifier(self.palette, self.thresholds)
+
+    def to_json(self) -> Dict[str, Any]:
+        """Convert to a JSON-serializable dictionary."""
+        return {"geometry": list(self.geometry),
+                "palette": [list(color) for color in self.palette],
+                "thresholds": list(self.thresholds)}
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> 'TemplateCalibration':
+        """
+        Restore a calibration saved with to_json.
+
+        Raises:
+            KeyError, TypeError, ValueError: If the data is malformed
+        """
+        geometry = tuple(float(value) for value in data["geometry"])
+        palette = tuple(tuple(int(channel) for channel in color) for color in data["palette"])
+        thresholds = tuple(int(value) for value in data["thresholds"])
+        if len(geometry) != 4 or len(palette) != len(thresholds):
+            raise ValueError("Пошкоджений запис калібрування")
+        return cls(geometry, palette, thresholds)
+
+
+def calibrate_template(img: Image.Image) -> TemplateCalibration:
+    """
+    Detect the grid geometry and, if enabled, the palette of an image.
+
+    Args:
+        img: Decoded schedule image
+
+    Returns:
+        TemplateCalibration; invalid geometries fall back to the nominal one
+    """
+    pixels = _target_pixels(img)
+    geometry = _fit_geometry(pixels)
+    if not geometry_is_valid(geometry):
+        geometry = NOMINAL_GEOMETRY
+    if not ScheduleConfig.LEARN_PALETTE:
+        return TemplateCalibration(geometry)
+    palette, thresholds = learn_palette(pixels, geometry)
+    return TemplateCalibration(geometry, palette, thresholds)
+
+
+class GridCalibrator:
+    """Calibrates grid geometry and palette once per layout template and reuses them."""
+
+    FILE_NAME = 'calibration.json'
+
+    def __init__(self, directory: Optional[str] = None, max_entries: int = 256):
+        """
+        Create a calibrator.
+
+        Args:
+            directory: Optional directory where detected geometries are
+                persisted between runs
+            max_entries: Maximum number of remembered templates
+        """
+        self.path = os.path.join(directory, self.FILE_NAME) if directory else None
+        self.max_entries = max_entries
+        self._calibrations: 'OrderedDict[str, TemplateCalibration]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._loaded_mtime: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        if self.path:
+            self._refresh()
+
+    def _refresh(self) -> None:
+        """Merge calibrations saved by other processes since the last read."""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return
+        if mtime == self._loaded_mtime:
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                stored = {key: TemplateCalibration.from_json(data)
+                          for key, data in json.load(f).items()}
+        except (OSError, KeyError, ValueError, TypeError, AttributeError):
+            return
+        self._loaded_mtime = mtime
+        for key, calibration in stored.items():
+            self._calibrations.setdefault(key, calibration)
+        while len(self._calibrations) > self.max_entries:
+            self._calibrations.popitem(last=False)
+
+    def _save(self) -> None:
+        self._refresh()
+        directory = os.path.dirname(self.path)
+        try:
+            fd, temp_path = tempfile.mkstemp(suffix='.tmp', dir=directory)
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({key: calibration.to_json()
+                           for key, calibration in self._calibrations.items()}, f)
+            os.replace(temp_path, self.path)
+            self._loaded_mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
+    def _lookup(self, key: str) -> Optional[TemplateCalibration]:
+        calibration = self._calibrations.get(key)
+        if calibration is None and self.path:
+            # Another worker may have calibrated this template meanwhile
+            self._refresh()
+            calibration = self._calibrations.get(key)
+        if calibration is not None:
+            self._calibrations.move_to_end(key)
+            self.hits += 1
+        return calibration
+
+    def calibration(self, img: Image.Image) -> TemplateCalibration:
+        """
+        Get the calibration of an image's template, detecting it for new templates.
+
+        Args:
+            img: Decoded schedule image
+
+        Returns:
+            TemplateCalibration of the layout template
+        """
+        key = layout_fingerprint(img)
+        with self._lock:
+            calibration = self._lookup(key)
+            if calibration is not None:
+                return calibration
+
+        calibration = calibrate_template(img)
+
+        with self._lock:
+            self.misses += 1
+            self._calibrations[key] = calibration
+            if len(self._calibrations) > self.max_entries:
+                self._calibrations.popitem(last=False)
+            if self.path:
+                self._save()
+        return calibration
+
+    def geometry(self, img: Image.Image) -> GridGeometry:
+        """
+        Get the grid geometry of an image, detecting it for new templates.
+
+        Args:
+            img: Decoded schedule image
+
+        Returns:
+            Grid geometry in target pixels
+        """
+        return self.calibration(img).geometry
+
+    def calibrate(self, img: Image.Image) -> Tuple[SamplingPlan, PaletteClassifier]:
+        """
+        Build the sampling plan and classifier of an image.
+
+        Usable as the calibrate argument of load_schedule_image.
+
+        Args:
+            img: Decoded schedule image
+
+        Returns:
+            Tuple of (SamplingPlan in the coordinates of the image, classifier)
+        """
+        calibration = self.calibration(img)
+        return (SamplingPlan.for_image_size(img.size, calibration.geometry),
+                calibration.classifier())
+
+
+@lru_cache(maxsize=8)
+def get_calibrator(directory: Optional[str] = None) -> GridCalibrator:
+    """
+    Get the shared calibrator of this process.
+
+    Args:
+        directory: Optional directory where geometries are persisted
+
+    Returns:
+        Memoized GridCalibrator instance
+    """
+    return GridCalibrator(directory)
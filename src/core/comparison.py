@@ -0,0 +1,177 @@
+"""
+Columnar table of per-day sub-queue summaries for comparison views.
+
+Every (day, sub-queue) pair is one row held in flat numpy columns: the day
+ordinal, sub-queue id, outage count, outage minutes and the slot bitmask.
+Filtering and sorting work on these numeric columns and produce an index
+of visible rows, so a view only has to read the rows it draws.
+"""
+
+from datetime import date
+from typing import Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.core.schedule import QUEUE_COUNT, SLOTS_PER_DAY, DaySchedule
+
+# Row of the table: (day, queue_id, outage count, outage minutes, bitmask)
+ComparisonRow = Tuple[date, int, int, int, int]
+
+SORT_KEYS = ('day', 'queue', 'count', 'minutes')
+
+
+class ComparisonTable:
+    """Growable table of sub-queue summaries with a filtered, sorted view."""
+
+    __slots__ = ('_days', '_queues', '_counts', '_minutes', '_masks', '_size',
+                 '_order', '_sort_key', '_descending', '_queue_ids', '_min_minutes')
+
+    INITIAL_CAPACITY = QUEUE_COUNT * 32
+
+    def __init__(self):
+        self._days = np.empty(self.INITIAL_CAPACITY, dtype=np.int32)
+        self._queues = np.empty(self.INITIAL_CAPACITY, dtype=np.int16)
+        self._counts = np.empty(self.INITIAL_CAPACITY, dtype=np.int16)
+        self._minutes = np.empty(self.INITIAL_CAPACITY, dtype=np.int16)
+        self._masks = np.empty(self.INITIAL_CAPACITY, dtype=np.uint64)
+        self._size = 0
+        self._order = np.empty(0, dtype=np.intp)
+        self._sort_key = 'day'
+        self._descending = False
+        self._queue_ids: Optional[np.ndarray] = None
+        self._min_minutes = 0
+
+    def __len__(self) -> int:
+        """Number of rows passing the filter."""
+        return len(self._order)
+
+    @property
+    def total(self) -> int:
+        """Number of stored rows."""
+        return self._size
+
+    @property
+    def sort_key(self) -> Tuple[str, bool]:
+        """Current sort column and whether it is descending."""
+        return self._sort_key, self._descending
+
+    def _reserve(self, size: int) -> None:
+        capacity = len(self._days)
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        for name in ('_days', '_queues', '_counts', '_minutes', '_masks'):
+            column = getattr(self, name)
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            setattr(self, name, grown)
+
+    def add_days(self, schedules: Iterable[DaySchedule]) -> int:
+        """
+        Append the sub-queue summaries of day schedules and refresh the view.
+
+        Args:
+            schedules: Day schedules, in any date order
+
+        Returns:
+            Number of appended days
+        """
+        schedules = list(schedules)
+        rows = len(schedules) * QUEUE_COUNT
+        self._reserve(self._size + rows)
+        end = self._size + rows
+
+        ids = range(QUEUE_COUNT)
+        self._days[self._size:end] = np.repeat(
+            [schedule.date.toordinal() for schedule in schedules], QUEUE_COUNT)
+        self._queues[self._size:end] = np.tile(np.arange(QUEUE_COUNT), len(schedules))
+        self._counts[self._size:end] = [schedule.outage_count(queue_id)
+                                        for schedule in schedules for queue_id in ids]
+        self._minutes[self._size:end] = [schedule.total_minutes(queue_id)
+                                         for schedule in schedules for queue_id in ids]
+        self._masks[self._size:end] = [mask for schedule in schedules
+                                       for mask in schedule.masks]
+        self._size = end
+        self._refresh()
+        return len(schedules)
+
+    def set_filter(self, queue_ids: Optional[Sequence[int]] = None,
+                   min_minutes: int = 0) -> None:
+        """
+        Restrict the view to some sub-queues and a minimum outage time.
+
+        Args:
+            queue_ids: Sub-queue ids to keep, or None for all
+            min_minutes: Keep rows with at least this many outage minutes
+        """
+        self._queue_ids = None if queue_ids is None else np.asarray(queue_ids)
+        self._min_minutes = min_minutes
+        self._refresh()
+
+    def sort(self, key: str, descending: bool = False) -> None:
+        """
+        Order the view by a column; ties are ordered by day and sub-queue.
+
+        Args:
+            key: One of SORT_KEYS
+            descending: Whether the column is sorted in descending order
+
+        Raises:
+            ValueError: If the key is not a known column
+        """
+        if key not in SORT_KEYS:
+            raise ValueError(f"Невідомий стовпець сортування: {key}")
+        self._sort_key = key
+        self._descending = descending
+        self._refresh()
+
+    def _refresh(self) -> None:
+        size = self._size
+        keep = np.ones(size, dtype=bool)
+        if self._queue_ids is not None:
+            keep &= np.isin(self._queues[:size], self._queue_ids)
+        if self._min_minutes:
+            keep &= self._minutes[:size] >= self._min_minutes
+        rows = np.flatnonzero(keep)
+
+        days, queues = self._days[rows], self._queues[rows]
+        if self._sort_key == 'day':
+            keys = [queues, days]
+        elif self._sort_key == 'queue':
+            keys = [days, queues]
+        else:
+            column = self._counts if self._sort_key == 'count' else self._minutes
+            keys = [queues, days, column[rows]]
+        if self._descending:
+            keys[-1] = -keys[-1].astype(np.int64)
+        self._order = rows[np.lexsort(keys)]
+
+    def row(self, index: int) -> ComparisonRow:
+        """
+        Get a visible row.
+
+        Args:
+            index: Position in the filtered, sorted view
+
+        Returns:
+            Tuple of (day, queue_id, outage count, outage minutes, bitmask)
+        """
+        row = self._order[index]
+        return (date.fromordinal(int(self._days[row])), int(self._queues[row]),
+                int(self._counts[row]), int(self._minutes[row]), int(self._masks[row]))
+
+    def slots(self, start: int, stop: int) -> np.ndarray:
+        """
+        Get the outage slots of a range of visible rows.
+
+        Args:
+            start: First view position, inclusive
+            stop: Last view position, exclusive
+
+        Returns:
+            Boolean array of shape (rows, SLOTS_PER_DAY)
+        """
+        masks = self._masks[self._order[start:stop]]
+        shifts = np.arange(SLOTS_PER_DAY, dtype=np.uint64)
+        return ((masks[:, None] >> shifts) & np.uint64(1)).astype(bool)
@@ -0,0 +1,172 @@
+"""
+Palette learning for schedule images.
+
+Learns the outage colours a layout template actually uses from the grid
+cells of one image: the colour histogram of every queue's rows is clustered
+around its dominant colour, which becomes that queue's palette entry, and
+the spread of the cluster sets the entry's matching threshold. Entries
+without enough evidence keep the ScheduleConfig colour and threshold.
+"""
+
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from analyze_schedule import GridGeometry, ScheduleConfig
+
+
+Palette = Tuple[Tuple[int, int, int], ...]
+
+# Histogram bins of 16x16x16 colours
+HISTOGRAM_SHIFT = 4
+# Learned colours may differ this much from the configured ones
+MAX_COLOR_SHIFT = 80
+# Cell pixels this close to the background colour are not outage colours
+MIN_BACKGROUND_DISTANCE = 60
+CLUSTER_RADIUS = 40
+# Roughly the interior of one half-hour cell in target pixels
+MIN_CLUSTER_PIXELS = 120
+# Pixels kept clear of the grid lines and of the row edges
+LINE_MARGIN = 3
+ROW_BAND = 4
+
+# Threshold = spread * factor + margin, clamped to the range below
+SPREAD_FACTOR = 2.0
+THRESHOLD_MARGIN = 12
+MIN_THRESHOLD = 40
+MAX_THRESHOLD = 90
+
+
+def nominal_palette() -> Tuple[Palette, Tuple[int, ...]]:
+    """
+    Get the configured palette with the shared threshold for every colour.
+
+    Returns:
+        Tuple of (colours, thresholds) in ScheduleConfig.QUEUE_COLORS order
+    """
+    palette = tuple(tuple(color) for color in ScheduleConfig.QUEUE_COLORS)
+    return palette, (ScheduleConfig.COLOR_THRESHOLD,) * len(palette)
+
+
+def _row_groups() -> List[List[int]]:
+    """Indices of the grid rows drawn in each palette colour, e.g. 1-1 and 1-2."""
+    groups: List[List[int]] = [[] for _ in ScheduleConfig.QUEUE_COLORS]
+    color_names = list(ScheduleConfig.QUEUE_COLORS.values())
+    for row, queue_name in enumerate(ScheduleConfig.QUEUE_COORDINATES):
+        group_name = queue_name.rsplit('-', 1)[0]
+        if group_name in color_names:
+            groups[color_names.index(group_name)].append(row)
+    return groups
+
+
+def _cell_columns(width: int, geometry: GridGeometry) -> np.ndarray:
+    """Boolean mask of target columns inside grid cells, away from the lines."""
+    scale_x, offset_x = geometry[0], geometry[1]
+    half = ScheduleConfig.PIXELS_PER_HALF_HOUR
+    lines = offset_x + scale_x * (
+        ScheduleConfig.START_X + half * np.arange(ScheduleConfig.TOTAL_HALF_HOURS + 1))
+    columns = np.arange(width)
+    nearest = np.abs(columns[:, None] - lines[None, :]).min(axis=1)
+    return (columns > lines[0]) & (columns < lines[-1]) & (nearest > LINE_MARGIN * scale_x)
+
+
+def _row_pixels(pixels: np.ndarray, rows: List[int], columns: np.ndarray,
+                geometry: GridGeometry) -> np.ndarray:
+    """Cell pixels of the given grid rows as an (n, 3) int32 array."""
+    scale_y, offset_y = geometry[2], geometry[3]
+    centres = list(ScheduleConfig.QUEUE_COORDINATES.values())
+    band = max(int(ROW_BAND * scale_y), 1)
+    parts = []
+    for row in rows:
+        y = int(round(offset_y + scale_y * centres[row]))
+        top, bottom = max(y - band, 0), min(y + band + 1, pixels.shape[0])
+        parts.append(pixels[top:bottom][:, columns, :3].reshape(-1, 3))
+    if not parts:
+        return np.empty((0, 3), dtype=np.int32)
+    return np.concatenate(parts).astype(np.int32)
+
+
+def _bin_codes(colors: np.ndarray) -> np.ndarray:
+    levels = 256 >> HISTOGRAM_SHIFT
+    quantized = colors >> HISTOGRAM_SHIFT
+    return (quantized[:, 0] * levels + quantized[:, 1]) * levels + quantized[:, 2]
+
+
+def _distances(colors: np.ndarray, color: np.ndarray) -> np.ndarray:
+    return np.sqrt(((colors - color) ** 2).sum(axis=-1))
+
+
+def _background(colors: np.ndarray, palette: Palette) -> np.ndarray:
+    """Most frequent cell colour that is not close to any palette colour."""
+    codes = _bin_codes(colors)
+    counts = np.bincount(codes)
+    reference = np.array(palette, dtype=np.int32)
+    for code in np.argsort(counts)[::-1]:
+        if counts[code] == 0:
+            break
+        color = colors[codes == code].mean(axis=0)
+        if _distances(reference, color).min() > MAX_COLOR_SHIFT:
+            return color
+    return np.full(3, 255.0)
+
+
+def _learn_color(colors: np.ndarray, nominal: np.ndarray,
+                 background: np.ndarray) -> Tuple[Optional[np.ndarray], float]:
+    """
+    Find the dominant non-background colour of one queue's cells.
+
+    Returns:
+        Tuple of (colour, p95 distance of its cluster), or (None, 0) when
+        the cells hold too little of a plausible outage colour
+    """
+    colors = colors[_distances(colors, background) >= MIN_BACKGROUND_DISTANCE]
+    if len(colors) < MIN_CLUSTER_PIXELS:
+        return None, 0.0
+
+    codes = _bin_codes(colors)
+    seed = colors[codes == np.bincount(codes).argmax()].mean(axis=0)
+    cluster = colors[_distances(colors, seed) < CLUSTER_RADIUS]
+    center = np.median(cluster, axis=0)
+    cluster = colors[_distances(colors, center) < CLUSTER_RADIUS]
+    if len(cluster) < MIN_CLUSTER_PIXELS:
+        return None, 0.0
+
+    center = np.rint(np.median(cluster, axis=0))
+    if (_distances(center, nominal) > MAX_COLOR_SHIFT or
+            _distances(center, background) < MIN_BACKGROUND_DISTANCE):
+        return None, 0.0
+    return center, float(np.percentile(_distances(cluster, center), 95))
+
+
+def learn_palette(pixels: np.ndarray,
+                  geometry: GridGeometry) -> Tuple[Palette, Tuple[int, ...]]:
+    """
+    Learn the outage colours and thresholds used by a schedule image.
+
+    Args:
+        pixels: RGB array of the image resized to the target size
+        geometry: Grid placement of the image
+
+    Returns:
+        Tuple of (colours, thresholds) in ScheduleConfig.QUEUE_COLORS order;
+        entries without enough evidence keep their configured values
+    """
+    palette, thresholds = nominal_palette()
+    columns = _cell_columns(pixels.shape[1], geometry)
+    groups = [_row_pixels(pixels, rows, columns, geometry) for rows in _row_groups()]
+    if not any(len(colors) for colors in groups):
+        return palette, thresholds
+
+    background = _background(np.concatenate(groups), palette)
+    learned_palette, learned_thresholds = list(palette), list(thresholds)
+    for index, colors in enumerate(groups):
+        nominal = np.array(palette[index], dtype=np.float64)
+        center, spread = _learn_color(colors, nominal, background)
+        if center is None:
+            continue
+        threshold = SPREAD_FACTOR * spread + THRESHOLD_MARGIN
+        # Keep the sphere clear of the background colour
+        threshold = min(threshold, float(_distances(center, background)) / 2)
+        learned_palette[index] = tuple(int(value) for value in center)
+        learned_thresholds[index] = int(np.clip(round(threshold), MIN_THRESHOLD, MAX_THRESHOLD))
+    return tuple(learned_palette), tuple(learned_thresholds)
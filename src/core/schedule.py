@@ -0,0 +1,310 @@
+"""
+Compact bitmask model of daily power outage schedules.
+
+Each sub-queue's day is stored as a 48-bit integer where bit i is set when
+half-hour slot i has an outage. Sub-queues are identified by integer ids in
+ScheduleConfig.QUEUE_COORDINATES order; names and "HH:MM" strings are only
+produced when converting to or from JSON. numpy is only imported to convert
+analysis matrices, so the model itself loads fast.
+"""
+
+from array import array
+from datetime import date, datetime, timedelta
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from schedule_config import NO_OUTAGE, ScheduleConfig, time_to_string
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+SLOTS_PER_DAY: int = ScheduleConfig.TOTAL_HALF_HOURS
+MINUTES_PER_SLOT: int = 24 * 60 // SLOTS_PER_DAY
+FULL_DAY_MASK: int = (1 << SLOTS_PER_DAY) - 1
+
+QUEUE_NAMES: Tuple[str, ...] = tuple(ScheduleConfig.QUEUE_COORDINATES)
+QUEUE_COUNT: int = len(QUEUE_NAMES)
+_QUEUE_IDS: Dict[str, int] = {name: queue_id for queue_id, name in enumerate(QUEUE_NAMES)}
+
+
+def queue_id(queue_name: str) -> int:
+    """
+    Get the integer id of a sub-queue.
+
+    Args:
+        queue_name: Sub-queue name such as "Черга 3-2"
+
+    Returns:
+        Index of the sub-queue in ScheduleConfig.QUEUE_COORDINATES
+
+    Raises:
+        KeyError: If the name is not a known sub-queue
+    """
+    return _QUEUE_IDS[queue_name]
+
+
+def queue_name(queue_id: int) -> str:
+    """
+    Get the display name of a sub-queue.
+
+    Args:
+        queue_id: Sub-queue id
+
+    Returns:
+        Sub-queue name such as "Черга 3-2"
+    """
+    return QUEUE_NAMES[queue_id]
+
+
+def queue_number(queue_id: int) -> Tuple[int, int]:
+    """
+    Get the (queue, sub-queue) numbers of a sub-queue id.
+
+    Args:
+        queue_id: Sub-queue id
+
+    Returns:
+        Tuple of (main_number, sub_number), e.g. (3, 2) for "Черга 3-2"
+    """
+    return queue_id // 2 + 1, queue_id % 2 + 1
+
+
+def mask_from_intervals(intervals: Sequence[Tuple[int, int]]) -> int:
+    """
+    Build a bitmask from half-hour intervals.
+
+    Args:
+        intervals: List of (start_index, end_index) periods
+
+    Returns:
+        Bitmask with the covered slots set
+    """
+    mask = 0
+    for start, end in intervals:
+        mask |= ((1 << (end - start)) - 1) << start
+    return mask & FULL_DAY_MASK
+
+
+def mask_intervals(mask: int) -> List[Tuple[int, int]]:
+    """
+    Extract contiguous outage periods from a bitmask.
+
+    Args:
+        mask: Bitmask of outage slots
+
+    Returns:
+        List of tuples containing (start_index, end_index) for each period
+    """
+    intervals = []
+    while mask:
+        start = (mask & -mask).bit_length() - 1
+        run = mask >> start
+        length = ((run + 1) & ~run).bit_length() - 1
+        intervals.append((start, start + length))
+        mask &= ~(((1 << length) - 1) << start)
+    return intervals
+
+
+def mask_minutes(mask: int) -> int:
+    """
+    Get the total outage duration of a bitmask.
+
+    Args:
+        mask: Bitmask of outage slots
+
+    Returns:
+        Total outage time in minutes
+    """
+    return mask.bit_count() * MINUTES_PER_SLOT
+
+
+def _parse_time_index(time_str: str, is_end: bool = False) -> int:
+    hour, minute = map(int, time_str.split(':'))
+    index = (hour * 60 + minute) // MINUTES_PER_SLOT
+    # An outage ending at "00:00" runs until midnight
+    return SLOTS_PER_DAY if is_end and index == 0 else index
+
+
+class DaySchedule:
+    """Outage bitmasks of all sub-queues for one day."""
+
+    __slots__ = ('date', 'masks')
+
+    def __init__(self, date_obj: date, masks: Optional[Sequence[int]] = None):
+        """
+        Create a day schedule.
+
+        Args:
+            date_obj: Schedule date
+            masks: One bitmask per sub-queue id, defaults to no outages
+        """
+        if isinstance(date_obj, datetime):
+            date_obj = date_obj.date()
+        self.date = date_obj
+        self.masks: Tuple[int, ...] = tuple(masks) if masks is not None else (0,) * QUEUE_COUNT
+
+    @classmethod
+    def from_matrix(cls, date_obj: date, matrix: 'np.ndarray') -> 'DaySchedule':
+        """
+        Build a day schedule from an outage matrix.
+
+        Args:
+            date_obj: Schedule date
+            matrix: Result of analyze_grid
+
+        Returns:
+            DaySchedule with one bitmask per matrix row
+        """
+        import numpy as np
+
+        bits = np.asarray(matrix) != NO_OUTAGE
+        packed = np.packbits(bits, axis=1, bitorder='little')
+        return cls(date_obj, [int.from_bytes(row.tobytes(), 'little') for row in packed])
+
+    def intervals(self, queue_id: int) -> List[Tuple[int, int]]:
+        """Outage periods of a sub-queue as (start_index, end_index) tuples."""
+        return mask_intervals(self.masks[queue_id])
+
+    def total_minutes(self, queue_id: int) -> int:
+        """Total outage minutes of a sub-queue."""
+        return mask_minutes(self.masks[queue_id])
+
+    def outage_count(self, queue_id: int) -> int:
+        """Number of separate outage periods of a sub-queue."""
+        mask = self.masks[queue_id]
+        return (mask & ~(mask << 1)).bit_count()
+
+    def outage_list(self, queue_id: int) -> List[Dict[str, str]]:
+        """Outage periods of a sub-queue as {"start", "end"} time strings."""
+        return [
+            {"start": time_to_string(start), "end": time_to_string(end)}
+            for start, end in self.intervals(queue_id)
+        ]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert to a JSON-ready dictionary.
+
+        Returns:
+            Dictionary with ISO date and outage lists keyed by sub-queue name
+        """
+        return {
+            "date": self.date.isoformat(),
+            "queues": {
+                queue_name(queue_id): self.outage_list(queue_id)
+                for queue_id in range(QUEUE_COUNT)
+            }
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'DaySchedule':
+        """
+        Build a day schedule from the result of to_dict.
+
+        Args:
+            data: Dictionary with ISO date and outage lists
+
+        Returns:
+            Parsed DaySchedule
+        """
+        masks = [0] * QUEUE_COUNT
+        for name, outages in data.get("queues", {}).items():
+            masks[queue_id(name)] = mask_from_intervals([
+                (_parse_time_index(outage['start']), _parse_time_index(outage['end'], True))
+                for outage in outages
+            ])
+        return cls(date.fromisoformat(data["date"]), masks)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, DaySchedule):
+            return NotImplemented
+        return self.date == other.date and self.masks == other.masks
+
+    def __repr__(self) -> str:
+        return f"DaySchedule({self.date.isoformat()}, {list(map(hex, self.masks))})"
+
+
+class ScheduleSeries:
+    """
+    Day schedules for a range of consecutive dates in one flat array.
+
+    Masks are stored as unsigned 64-bit values, QUEUE_COUNT per day, so a
+    full year of all sub-queues takes about 35 KB.
+    """
+
+    __slots__ = ('start', 'masks')
+
+    def __init__(self, start: date, masks: Optional[array] = None):
+        """
+        Create a series.
+
+        Args:
+            start: Date of the first day
+            masks: Flat array('Q') of bitmasks, QUEUE_COUNT per day
+        """
+        if isinstance(start, datetime):
+            start = start.date()
+        self.start = start
+        self.masks = masks if masks is not None else array('Q')
+
+    def __len__(self) -> int:
+        return len(self.masks) // QUEUE_COUNT
+
+    @property
+    def end(self) -> date:
+        """Date after the last stored day."""
+        return self.start + timedelta(days=len(self))
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the stored masks."""
+        return len(self.masks) * self.masks.itemsize
+
+    def _offset(self, date_obj: date) -> int:
+        return (date_obj - self.start).days * QUEUE_COUNT
+
+    def set_day(self, day: DaySchedule) -> None:
+        """
+        Store a day, growing the series with empty days if needed.
+
+        Args:
+            day: Schedule to store; must not precede the series start
+        """
+        offset = self._offset(day.date)
+        if offset < 0:
+            raise ValueError("Дата раніше за початок серії")
+        if offset >= len(self.masks):
+            self.masks.extend([0] * (offset + QUEUE_COUNT - len(self.masks)))
+        self.masks[offset:offset + QUEUE_COUNT] = array('Q', day.masks)
+
+    def get_day(self, date_obj: date) -> DaySchedule:
+        """
+        Get the schedule of a stored day.
+
+        Args:
+            date_obj: Day within the series
+
+        Returns:
+            DaySchedule, empty for days outside the series
+        """
+        offset = self._offset(date_obj)
+        if offset < 0 or offset >= len(self.masks):
+            return DaySchedule(date_obj)
+        return DaySchedule(date_obj, self.masks[offset:offset + QUEUE_COUNT])
+
+    def days(self) -> Iterator[DaySchedule]:
+        """Iterate over all stored days in date order."""
+        for index in range(len(self)):
+            yield self.get_day(self.start + timedelta(days=index))
+
+    def total_minutes(self, queue_id: int) -> int:
+        """
+        Get the total outage minutes of a sub-queue over the series.
+
+        Args:
+            queue_id: Sub-queue id
+
+        Returns:
+            Sum of outage minutes over all stored days
+        """
+        return sum(mask_minutes(mask) for mask in self.masks[queue_id::QUEUE_COUNT])
@@ -0,0 +1,39 @@
+"""
+Lazy re-exports for package __init__ modules.
+
+Packages list their public names with the submodule defining each one; the
+submodule is imported on first access. Importing one submodule then no
+longer loads the dependencies of its siblings, which keeps the application
+start fast.
+"""
+
+from importlib import import_module
+from typing import Any, Callable, Dict, List, Tuple
+
+
+def lazy_exports(package: str, exports: Dict[str, str]
+                 ) -> Tuple[Callable[[str], Any], Callable[[], List[str]]]:
+    """
+    Build the module-level __getattr__ and __dir__ of a package.
+
+    Args:
+        package: Package name, i.e. __name__ of its __init__ module
+        exports: Mapping of public name to the module that defines it
+
+    Returns:
+        Tuple of (__getattr__, __dir__) functions
+    """
+    namespace = import_module(package).__dict__
+
+    def __getattr__(name: str) -> Any:
+        module = exports.get(name)
+        if module is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(import_module(module), name)
+        namespace[name] = value
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(namespace) | set(exports))
+
+    return __getattr__, __dir__
@@ -0,0 +1,27 @@
+"""
+Headless processing pipeline module.
+
+Contains cached single-image analysis, per-session analysis state, batch
+analysis of schedule images outside the GUI, watch-folder ingestion, the
+asyncio ingestion pipeline and change detection between schedule revisions.
+"""
+
+from src.lazy_imports import lazy_exports
+
+_EXPORTS = {
+    "AnalysisSession": "src.pipeline.session",
+    "FolderWatcher": "src.pipeline.watch",
+    "IngestionPipeline": "src.pipeline.ingest",
+    "PipelineStats": "src.pipeline.ingest",
+    "ScheduleDiff": "src.pipeline.diff",
+    "analyze_file": "src.pipeline.analysis",
+    "analyze_image_bytes": "src.pipeline.analysis",
+    "analyze_image_record": "src.pipeline.batch",
+    "collect_images": "src.pipeline.batch",
+    "diff_image_with_schedule": "src.pipeline.diff",
+    "diff_images": "src.pipeline.diff",
+    "run_batch": "src.pipeline.batch",
+}
+
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
@@ -0,0 +1,85 @@
+"""
+Single-image analysis with optional result caching.
+
+Shared by the UI and the batch tools so an already-seen image costs only a
+hash and a small cache read.
+"""
+
+from typing import Callable, Optional
+
+import numpy as np
+
+from analyze_schedule import ScheduleConfig, analyze_loaded, load_schedule_image
+from src.core.calibration import get_calibrator
+from src.storage.result_cache import ResultCache, hash_image_bytes
+from src.utils.profiling import stage
+
+
+StageCallback = Callable[[str], None]
+
+
+def _ignore_stage(stage: str) -> None:
+    pass
+
+
+def analyze_image_bytes(data: bytes, cache: Optional[ResultCache] = None,
+                        on_stage: Optional[StageCallback] = None) -> np.ndarray:
+    """
+    Analyze encoded image bytes, consulting the cache first.
+
+    When ScheduleConfig.AUTO_CALIBRATE is set, the grid position and palette
+    are detected once per layout template and remembered next to the cached
+    results.
+
+    Args:
+        data: Raw image file contents
+        cache: Optional result cache
+        on_stage: Called with 'decode' and 'classify' before each stage;
+            may raise to abort the analysis
+
+    Returns:
+        Outage matrix as returned by analyze_loaded
+    """
+    image_hash = None
+    if cache is not None:
+        with stage('cache_get'):
+            image_hash = hash_image_bytes(data)
+            matrix = cache.get(image_hash)
+        if matrix is not None:
+            return matrix
+
+    on_stage = on_stage or _ignore_stage
+    on_stage('decode')
+    calibrate = None
+    if ScheduleConfig.AUTO_CALIBRATE:
+        calibrate = get_calibrator(cache.directory if cache is not None else None).calibrate
+    with stage('decode'):
+        loaded = load_schedule_image(data, calibrate)
+    on_stage('classify')
+    with stage('classify'):
+        matrix = analyze_loaded(loaded)
+
+    if cache is not None:
+        with stage('cache_put'):
+            cache.put(image_hash, matrix)
+    return matrix
+
+
+def analyze_file(path: str, cache: Optional[ResultCache] = None,
+                 on_stage: Optional[StageCallback] = None) -> np.ndarray:
+    """
+    Analyze a schedule image file, consulting the cache first.
+
+    Args:
+        path: Image file path
+        cache: Optional result cache
+        on_stage: Called with 'read', 'decode' and 'classify' before each
+            stage; may raise to abort the analysis
+
+    Returns:
+        Outage matrix as returned by analyze_loaded
+    """
+    (on_stage or _ignore_stage)('read')
+    with stage('read'), open(path, 'rb') as f:
+        data = f.read()
+    return analyze_image_bytes(data, cache, on_stage)
@@ -0,0 +1,343 @@
+"""
+Batch analysis of schedule images.
+
+Analyzes many schedule images in parallel worker processes and streams one
+JSON record per image, using the same per-queue result shape as the UI.
+"""
+
+import glob
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+import numpy as np
+
+from src.core.schedule import QUEUE_NAMES, DaySchedule
+from src.pipeline.analysis import analyze_file, analyze_image_bytes
+from src.storage.archive import Archive
+from src.storage.result_cache import ResultCache
+from src.utils.profiling import Profiler, StageProfile, stage
+from src.utils.result_builder import build_queue_result
+
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.gif')
+
+DATE_PATTERNS = (
+    (re.compile(r'(\d{4})-(\d{2})-(\d{2})'), '{0}-{1}-{2}'),
+    (re.compile(r'(\d{2})\.(\d{2})\.(\d{4})'), '{2}-{1}-{0}'),
+    (re.compile(r'(?<!\d)(\d{4})(\d{2})(\d{2})(?!\d)'), '{0}-{1}-{2}'),
+)
+
+ARCHIVE_BATCH_SIZE = 256
+
+BatchTask = Tuple[str, Optional[str], Optional[str]]
+# (source name, date string, encoded image bytes, result cache directory)
+BytesTask = Tuple[str, Optional[str], bytes, Optional[str]]
+AnalysisResult = Tuple[Dict[str, Any], Optional[DaySchedule]]
+
+_worker_caches: Dict[str, ResultCache] = {}
+
+
+def collect_images(sources: Iterable[str]) -> List[str]:
+    """
+    Expand directories and glob patterns into a sorted list of image paths.
+
+    Args:
+        sources: Directory paths, file paths or glob patterns
+
+    Returns:
+        Sorted list of unique image file paths
+    """
+    paths = set()
+    for source in sources:
+        if os.path.isdir(source):
+            candidates = (os.path.join(source, name) for name in os.listdir(source))
+        else:
+            candidates = glob.glob(source, recursive=True)
+
+        for candidate in candidates:
+            if os.path.isfile(candidate) and candidate.lower().endswith(IMAGE_EXTENSIONS):
+                paths.add(candidate)
+
+    return sorted(paths)
+
+
+def load_date_mapping(filename: str) -> Dict[str, str]:
+    """
+    Load image-to-date mapping from a JSON file.
+
+    Args:
+        filename: Path to JSON object mapping file names or paths to YYYY-MM-DD
+
+    Returns:
+        Dictionary mapping file name or path to date string
+    """
+    with open(filename, 'r', encoding='utf-8') as f:
+        mapping = json.load(f)
+
+    if not isinstance(mapping, dict):
+        raise ValueError("Файл дат має містити JSON-об'єкт {файл: РРРР-ММ-ДД}")
+    return {str(key): str(value) for key, value in mapping.items()}
+
+
+def resolve_date(path: str,
+                 mapping: Optional[Dict[str, str]] = None,
+                 default: Optional[str] = None) -> Optional[str]:
+    """
+    Find the schedule date for an image.
+
+    Looks up the full path, then the file name in the mapping, then a date
+    embedded in the file name, and finally falls back to the default.
+
+    Args:
+        path: Image file path
+        mapping: Optional mapping of file names or paths to YYYY-MM-DD
+        default: Fallback date string in YYYY-MM-DD format
+
+    Returns:
+        Date string in YYYY-MM-DD format or None if unknown
+    """
+    mapping = mapping or {}
+    name = os.path.basename(path)
+
+    for key in (path, os.path.normpath(path), name):
+        if key in mapping:
+            return mapping[key]
+
+    for pattern, template in DATE_PATTERNS:
+        match = pattern.search(name)
+        if match:
+            return template.format(*match.groups())
+
+    return default
+
+
+def _get_worker_cache(cache_dir: Optional[str]) -> Optional[ResultCache]:
+    """Open the result cache once per worker process."""
+    if not cache_dir:
+        return None
+    if cache_dir not in _worker_caches:
+        _worker_caches[cache_dir] = ResultCache(cache_dir)
+    return _worker_caches[cache_dir]
+
+
+def analyze_source(name: str, date_str: Optional[str],
+                   analyze: Callable[[], np.ndarray]) -> AnalysisResult:
+    """
+    Analyze one image into its record and, on success, its day schedule.
+
+    Failures are reported in the record instead of being raised.
+
+    Args:
+        name: Image path or URL reported in the record
+        date_str: Date string in YYYY-MM-DD format
+        analyze: Produces the outage matrix of the image
+
+    Returns:
+        Tuple of (result record, day schedule or None on failure)
+    """
+    record: Dict[str, Any] = {"image": name}
+    schedule = None
+
+    try:
+        if not date_str:
+            raise ValueError("Дату графіка не вказано")
+        date_obj = datetime.strptime(date_str, '%Y-%m-%d')
+
+        matrix = analyze()
+        with stage('to_schedule'):
+            schedule = DaySchedule.from_matrix(date_obj, matrix)
+
+        with stage('build_result'):
+            analyzed_at = datetime.now()
+            record["date"] = date_obj.strftime('%d.%m.%Y')
+            record["queues"] = [
+                build_queue_result(queue_name, schedule.intervals(index), date_obj, analyzed_at)
+                for index, queue_name in enumerate(QUEUE_NAMES)
+            ]
+    except Exception as e:
+        record["error"] = str(e)
+        schedule = None
+
+    return record, schedule
+
+
+def analyze_task(task: BatchTask) -> AnalysisResult:
+    """
+    Analyze one image file into its record and, on success, its day schedule.
+
+    Runs inside worker processes, so failures are reported in the record
+    instead of being raised.
+
+    Args:
+        task: Tuple of (image path, date string in YYYY-MM-DD format,
+            result cache directory or None)
+
+    Returns:
+        Tuple of (result record, day schedule or None on failure)
+    """
+    path, date_str, cache_dir = task
+    return analyze_source(path, date_str,
+                          lambda: analyze_file(path, _get_worker_cache(cache_dir)))
+
+
+def analyze_bytes_task(task: BytesTask) -> AnalysisResult:
+    """
+    Analyze already read image bytes like analyze_task.
+
+    Args:
+        task: Tuple of (image path or URL, date string in YYYY-MM-DD format,
+            encoded image bytes, result cache directory or None)
+
+    Returns:
+        Tuple of (result record, day schedule or None on failure)
+    """
+    name, date_str, data, cache_dir = task
+    return analyze_source(name, date_str,
+                          lambda: analyze_image_bytes(data, _get_worker_cache(cache_dir)))
+
+
+def profiled_call(func: Callable[[Any], AnalysisResult],
+                  task: Any) -> Tuple[Dict[str, Any], Optional[DaySchedule], StageProfile]:
+    """
+    Run an analysis task while timing every stage.
+
+    Args:
+        func: Task function such as analyze_task
+        task: Its task tuple; the first item labels the profile
+
+    Returns:
+        Tuple of (result record, day schedule or None, stage profile)
+    """
+    profiler = Profiler()
+    with profiler.track(task[0]) as profile:
+        record, schedule = func(task)
+    return record, schedule, profile
+
+
+def profiled_analyze_task(task: BatchTask) -> Tuple[Dict[str, Any], Optional[DaySchedule],
+                                                    StageProfile]:
+    """
+    Analyze one image like analyze_task while timing every stage.
+
+    Args:
+        task: Tuple of (image path, date string in YYYY-MM-DD format,
+            result cache directory or None)
+
+    Returns:
+        Tuple of (result record, day schedule or None, stage profile)
+    """
+    return profiled_call(analyze_task, task)
+
+
+def analyze_image_record(task: BatchTask) -> Dict[str, Any]:
+    """
+    Analyze one image into a JSON-ready record.
+
+    Runs inside worker processes, so failures are reported in the record
+    instead of being raised.
+
+    Args:
+        task: Tuple of (image path, date string in YYYY-MM-DD format,
+            result cache directory or None)
+
+    Returns:
+        Dictionary with image path, date and per-queue results, or an error
+    """
+    return analyze_task(task)[0]
+
+
+def iter_batch(tasks: List[BatchTask],
+               workers: Optional[int] = None,
+               chunk_size: int = 4,
+               profiler: Optional[Profiler] = None
+               ) -> Iterator[Tuple[Dict[str, Any], Optional[DaySchedule]]]:
+    """
+    Analyze images in parallel and yield results in input order.
+
+    Args:
+        tasks: List of (image path, date string, cache directory) tuples
+        workers: Number of worker processes, defaults to CPU count;
+            1 analyzes in the current process
+        chunk_size: Number of images sent to a worker at once
+        profiler: Optional profiler receiving the stage timings of every image
+
+    Yields:
+        Tuple of (result record, day schedule or None on failure) per image
+    """
+    workers = workers or os.cpu_count() or 1
+    workers = min(workers, max(len(tasks), 1))
+    func = analyze_task if profiler is None else profiled_analyze_task
+
+    if workers == 1:
+        results = map(func, tasks)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        results = executor.map(func, tasks, chunksize=max(chunk_size, 1))
+
+    try:
+        for result in results:
+            if profiler is not None:
+                profiler.add(result[2])
+            yield result[0], result[1]
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+
+def run_batch(paths: List[str],
+              output: TextIO,
+              date_mapping: Optional[Dict[str, str]] = None,
+              default_date: Optional[str] = None,
+              workers: Optional[int] = None,
+              chunk_size: int = 4,
+              cache_dir: Optional[str] = None,
+              archive: Optional[Archive] = None,
+              on_schedule: Optional[Callable[[DaySchedule], None]] = None,
+              profiler: Optional[Profiler] = None) -> Tuple[int, int]:
+    """
+    Analyze images and stream one JSONL record per image.
+
+    Args:
+        paths: Image file paths
+        output: Text stream receiving JSON lines
+        date_mapping: Optional mapping of file names or paths to YYYY-MM-DD
+        default_date: Fallback date string in YYYY-MM-DD format
+        workers: Number of worker processes, defaults to CPU count
+        chunk_size: Number of images sent to a worker at once
+        cache_dir: Optional result cache directory shared by all workers
+        archive: Optional archive receiving every analyzed day
+        on_schedule: Optional callback receiving every analyzed day
+        profiler: Optional profiler receiving the stage timings of every image
+
+    Returns:
+        Tuple of (processed count, failed count)
+    """
+    tasks = [(path, resolve_date(path, date_mapping, default_date), cache_dir)
+             for path in paths]
+    processed = failed = 0
+    pending: List[DaySchedule] = []
+
+    for record, schedule in iter_batch(tasks, workers, chunk_size, profiler):
+        output.write(json.dumps(record, ensure_ascii=False) + '\n')
+        output.flush()
+        processed += 1
+        if schedule is None:
+            failed += 1
+            continue
+        if on_schedule is not None:
+            on_schedule(schedule)
+        if archive is not None:
+            pending.append(schedule)
+            if len(pending) >= ARCHIVE_BATCH_SIZE:
+                archive.store_days(pending)
+                pending.clear()
+
+    if archive is not None and pending:
+        archive.store_days(pending)
+
+    return processed, failed
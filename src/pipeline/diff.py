@@ -0,0 +1,236 @@
+"""
+Change detection between two revisions of the same day's schedule.
+
+Compares a corrected schedule image with an earlier image or an archived
+day and reports which sub-queues and half-hour slots changed. When both
+images share the layout template and classifier, rows whose sampled pixels
+are identical keep their earlier classification and only the other rows are
+classified again.
+"""
+
+from datetime import date
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+from analyze_schedule import (PaletteClassifier, SamplingPlan, ScheduleConfig, get_classifier,
+                              load_schedule_image)
+from schedule_config import time_to_string
+from src.core.calibration import get_calibrator, layout_fingerprint
+from src.core.schedule import QUEUE_COUNT, QUEUE_NAMES, DaySchedule, mask_intervals
+from src.storage.result_cache import ResultCache
+from src.utils.profiling import stage
+
+
+def _slot_ranges(mask: int) -> List[Dict[str, str]]:
+    return [{"start": time_to_string(start), "end": time_to_string(end)}
+            for start, end in mask_intervals(mask)]
+
+
+class ScheduleDiff:
+    """Slot-level differences between two revisions of a day schedule."""
+
+    __slots__ = ('old', 'new', 'rows_classified')
+
+    def __init__(self, old: Optional[DaySchedule], new: DaySchedule,
+                 rows_classified: int = 0):
+        """
+        Create a diff.
+
+        Args:
+            old: Earlier revision, or None when it is unknown; every
+                sub-queue then counts as changed
+            new: Current revision
+            rows_classified: Number of grid rows classified to build the
+                current revision
+        """
+        self.old = old
+        self.new = new
+        self.rows_classified = rows_classified
+
+    @property
+    def date(self) -> date:
+        """Schedule date."""
+        return self.new.date
+
+    def _old_mask(self, queue_id: int) -> int:
+        return self.old.masks[queue_id] if self.old is not None else 0
+
+    def added(self, queue_id: int) -> int:
+        """Bitmask of slots that became outages in a sub-queue."""
+        return self.new.masks[queue_id] & ~self._old_mask(queue_id)
+
+    def removed(self, queue_id: int) -> int:
+        """Bitmask of slots that are no longer outages in a sub-queue."""
+        return self._old_mask(queue_id) & ~self.new.masks[queue_id]
+
+    @property
+    def changed_queues(self) -> List[int]:
+        """Ids of the sub-queues whose outages changed."""
+        if self.old is None:
+            return list(range(QUEUE_COUNT))
+        return [queue_id for queue_id in range(QUEUE_COUNT)
+                if self.old.masks[queue_id] != self.new.masks[queue_id]]
+
+    @property
+    def changed_slots(self) -> int:
+        """Number of (sub-queue, slot) cells that changed."""
+        return sum((self._old_mask(queue_id) ^ self.new.masks[queue_id]).bit_count()
+                   for queue_id in range(QUEUE_COUNT))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert to a JSON-ready dictionary.
+
+        Returns:
+            Dictionary with the ISO date and, for every changed sub-queue, the
+            added and removed slot ranges and its current outages
+        """
+        changed = self.changed_queues
+        return {
+            "date": self.date.isoformat(),
+            "baseline": self.old is not None,
+            "changed": [
+                {
+                    "queue": QUEUE_NAMES[queue_id],
+                    "added": _slot_ranges(self.added(queue_id)),
+                    "removed": _slot_ranges(self.removed(queue_id)),
+                    "outages": self.new.outage_list(queue_id),
+                }
+                for queue_id in changed
+            ],
+            "unchanged": QUEUE_COUNT - len(changed),
+            "changed_slots": self.changed_slots,
+            "rows_classified": self.rows_classified,
+        }
+
+
+class SampledImage:
+    """Grid sample pixels of one schedule image and their classification."""
+
+    __slots__ = ('layout', 'pixels', 'classifier', 'matrix')
+
+    def __init__(self, layout: str, pixels: np.ndarray, classifier: PaletteClassifier):
+        """
+        Create a sampled image.
+
+        Args:
+            layout: Layout fingerprint of the image
+            pixels: (rows, slots, 3) uint8 grid sample pixels
+            classifier: Classifier of the image's palette
+        """
+        self.layout = layout
+        self.pixels = pixels
+        self.classifier = classifier
+        self.matrix: Optional[np.ndarray] = None
+
+    def shares_grid(self, other: 'SampledImage') -> bool:
+        """Whether both images were sampled on the same template and palette."""
+        return (self.layout == other.layout
+                and self.pixels.shape == other.pixels.shape
+                and (self.classifier is other.classifier
+                     or (self.classifier.palette == other.classifier.palette
+                         and self.classifier.thresholds == other.classifier.thresholds)))
+
+
+def sample_image(source: Union[str, bytes],
+                 cache: Optional[ResultCache] = None) -> SampledImage:
+    """
+    Decode a schedule image and read its grid sample pixels.
+
+    Args:
+        source: Image file path or encoded image bytes
+        cache: Optional result cache whose directory keeps the calibrations
+
+    Returns:
+        SampledImage that is not classified yet
+    """
+    layouts = []
+    calibrator = None
+    if ScheduleConfig.AUTO_CALIBRATE:
+        calibrator = get_calibrator(cache.directory if cache is not None else None)
+
+    def calibrate(img):
+        layouts.append(layout_fingerprint(img))
+        if calibrator is not None:
+            return calibrator.calibrate(img)
+        return SamplingPlan.for_image_size(img.size), get_classifier()
+
+    with stage('decode'):
+        loaded = load_schedule_image(source, calibrate)
+        pixels = loaded.plan.sample(loaded.image)
+    return SampledImage(layouts[0], pixels, loaded.classifier)
+
+
+def classify_sampled(current: SampledImage,
+                     previous: Optional[SampledImage] = None) -> int:
+    """
+    Classify a sampled image, reusing rows of an earlier revision.
+
+    Rows are reused when both images share the grid and the row's sample
+    pixels are identical; all other rows are classified.
+
+    Args:
+        current: Image to classify; its matrix is set
+        previous: Classified earlier revision of the same day
+
+    Returns:
+        Number of classified rows
+    """
+    if (previous is not None and previous.matrix is not None
+            and current.shares_grid(previous)):
+        rows = np.any(current.pixels != previous.pixels, axis=(1, 2))
+        matrix = previous.matrix.copy()
+    else:
+        rows = np.ones(len(current.pixels), dtype=bool)
+        matrix = np.empty(current.pixels.shape[:2], dtype=np.uint8)
+
+    with stage('classify'):
+        if rows.any():
+            matrix[rows] = current.classifier.classify_array(current.pixels[rows])
+    current.matrix = matrix
+    return int(rows.sum())
+
+
+def diff_images(old_source: Union[str, bytes], new_source: Union[str, bytes],
+                date_obj: date, cache: Optional[ResultCache] = None) -> ScheduleDiff:
+    """
+    Compare two revisions of a day's schedule image.
+
+    Args:
+        old_source: Earlier image file path or encoded bytes
+        new_source: Current image file path or encoded bytes
+        date_obj: Schedule date
+        cache: Optional result cache whose directory keeps the calibrations
+
+    Returns:
+        ScheduleDiff of the two revisions
+    """
+    old = sample_image(old_source, cache)
+    classify_sampled(old)
+    new = sample_image(new_source, cache)
+    rows = classify_sampled(new, old)
+    with stage('to_schedule'):
+        return ScheduleDiff(DaySchedule.from_matrix(date_obj, old.matrix),
+                            DaySchedule.from_matrix(date_obj, new.matrix), rows)
+
+
+def diff_image_with_schedule(previous: Optional[DaySchedule], source: Union[str, bytes],
+                             date_obj: date,
+                             cache: Optional[ResultCache] = None) -> ScheduleDiff:
+    """
+    Compare a schedule image with an earlier result, e.g. from an archive.
+
+    Args:
+        previous: Earlier revision, or None when the day is not known
+        source: Current image file path or encoded bytes
+        date_obj: Schedule date
+        cache: Optional result cache whose directory keeps the calibrations
+
+    Returns:
+        ScheduleDiff of the earlier result and the image
+    """
+    current = sample_image(source, cache)
+    rows = classify_sampled(current)
+    with stage('to_schedule'):
+        return ScheduleDiff(previous, DaySchedule.from_matrix(date_obj, current.matrix), rows)
@@ -0,0 +1,484 @@
+"""
+Asynchronous ingestion pipeline for schedule images.
+
+Connects a source of image paths or URLs, reader threads, a pool of
+analysis workers and the output sinks with bounded asyncio queues. Reads
+overlap with analysis, and a slow sink fills its queue so the stages before
+it wait instead of buffering images in memory.
+"""
+
+import asyncio
+import json
+import os
+import time
+import urllib.request
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import (Any, AsyncIterable, Dict, Iterable, List, Optional, Sequence, TextIO,
+                    Tuple, Union)
+
+from src.core.schedule import DaySchedule
+from src.pipeline.batch import (ARCHIVE_BATCH_SIZE, AnalysisResult, analyze_bytes_task,
+                                profiled_call, resolve_date)
+from src.storage.archive import Archive
+from src.utils.calendar_export import CalendarExporter
+from src.utils.profiling import Profiler
+
+
+URL_PREFIXES = ('http://', 'https://')
+URL_TIMEOUT = 30.0
+
+DEFAULT_QUEUE_SIZE = 16
+DEFAULT_READERS = 4
+# Every calendar update rewrites the queue files, so days are exported in batches
+CALENDAR_BATCH_SIZE = 256
+
+_DONE = object()
+
+
+def read_source(name: str) -> bytes:
+    """
+    Read the encoded image of a file path or an HTTP(S) URL.
+
+    Args:
+        name: Image file path or URL
+
+    Returns:
+        Encoded image bytes
+    """
+    if name.startswith(URL_PREFIXES):
+        with urllib.request.urlopen(name, timeout=URL_TIMEOUT) as response:
+            return response.read()
+    with open(name, 'rb') as f:
+        return f.read()
+
+
+class JsonlSink:
+    """Writes one JSON line per analyzed image."""
+
+    def __init__(self, output: TextIO):
+        """
+        Create a JSONL sink.
+
+        Args:
+            output: Text stream receiving JSON lines
+        """
+        self.output = output
+
+    def write(self, record: Dict[str, Any], schedule: Optional[DaySchedule]) -> None:
+        """Write the record of one image."""
+        self.output.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self.output.flush()
+
+    def close(self) -> None:
+        """Nothing to flush; the caller owns the stream."""
+
+
+class ArchiveSink:
+    """Stores analyzed days in the archive in batches."""
+
+    def __init__(self, archive: Archive, batch_size: int = ARCHIVE_BATCH_SIZE):
+        """
+        Create an archive sink.
+
+        Args:
+            archive: Archive receiving the days
+            batch_size: Number of days written per transaction
+        """
+        self.archive = archive
+        self.batch_size = batch_size
+        self._pending: List[DaySchedule] = []
+
+    def write(self, record: Dict[str, Any], schedule: Optional[DaySchedule]) -> None:
+        """Queue the day of one image, writing a batch when full."""
+        if schedule is None:
+            return
+        self._pending.append(schedule)
+        if len(self._pending) >= self.batch_size:
+            self.close()
+
+    def close(self) -> None:
+        """Write the remaining days."""
+        if self._pending:
+            self.archive.store_days(self._pending)
+            self._pending.clear()
+
+
+class CalendarSink:
+    """Updates .ics calendars with the analyzed days in batches."""
+
+    def __init__(self, destination: str, combined: bool = False,
+                 batch_size: int = CALENDAR_BATCH_SIZE):
+        """
+        Create a calendar sink.
+
+        Args:
+            destination: Directory of per-queue calendars, or the combined file
+            combined: Write one calendar with all queues
+            batch_size: Number of days exported per calendar update
+        """
+        self.destination = destination
+        self.combined = combined
+        self.batch_size = batch_size
+        self.errors: List[str] = []
+        self._pending: List[DaySchedule] = []
+
+    def write(self, record: Dict[str, Any], schedule: Optional[DaySchedule]) -> None:
+        """Queue the day of one image, updating the calendars when the batch is full."""
+        if schedule is None:
+            return
+        self._pending.append(schedule)
+        if len(self._pending) >= self.batch_size:
+            self.close()
+
+    def close(self) -> None:
+        """Export the remaining days."""
+        if not self._pending:
+            return
+        success, message = CalendarExporter.export_many(self._pending, self.destination,
+                                                        self.combined)
+        self._pending.clear()
+        if not success:
+            self.errors.append(message)
+
+
+Sink = Union[JsonlSink, ArchiveSink, CalendarSink]
+
+
+class StageStats:
+    """Work counters of one pipeline stage."""
+
+    __slots__ = ('name', 'workers', 'items', 'busy_seconds', 'blocked_seconds')
+
+    def __init__(self, name: str, workers: int):
+        self.name = name
+        self.workers = workers
+        self.items = 0
+        # Time spent on items, and time spent waiting for room downstream
+        self.busy_seconds = 0.0
+        self.blocked_seconds = 0.0
+
+
+class QueueStats:
+    """Depth samples of one bounded queue, taken on every put and get."""
+
+    __slots__ = ('name', 'capacity', 'max_depth', 'depth_total', 'samples')
+
+    def __init__(self, name: str, capacity: int):
+        self.name = name
+        self.capacity = capacity
+        self.max_depth = 0
+        self.depth_total = 0
+        self.samples = 0
+
+    def sample(self, depth: int) -> None:
+        """Record the current depth."""
+        self.max_depth = max(self.max_depth, depth)
+        self.depth_total += depth
+        self.samples += 1
+
+    @property
+    def mean_depth(self) -> float:
+        """Average sampled depth."""
+        return self.depth_total / self.samples if self.samples else 0.0
+
+
+class PipelineStats:
+    """Throughput and queue depths of one pipeline run."""
+
+    def __init__(self):
+        self.stages: Dict[str, StageStats] = {}
+        self.queues: Dict[str, QueueStats] = {}
+        self.processed = 0
+        self.failed = 0
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the run started, up to its end."""
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def throughput(self) -> float:
+        """Images written to the sinks per second."""
+        elapsed = self.elapsed
+        return self.processed / elapsed if elapsed > 0 else 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Summarize the run.
+
+        Returns:
+            Dictionary with counts, throughput, per-stage utilization and
+            per-queue depths
+        """
+        elapsed = self.elapsed
+        return {
+            "processed": self.processed,
+            "failed": self.failed,
+            "elapsed_s": elapsed,
+            "images_per_s": self.throughput,
+            "stages": {
+                name: {
+                    "workers": stats.workers,
+                    "items": stats.items,
+                    "busy_s": stats.busy_seconds,
+                    "blocked_s": stats.blocked_seconds,
+                    "utilization": (stats.busy_seconds / (elapsed * stats.workers)
+                                    if elapsed > 0 else 0.0),
+                }
+                for name, stats in self.stages.items()
+            },
+            "queues": {
+                name: {
+                    "capacity": stats.capacity,
+                    "max_depth": stats.max_depth,
+                    "mean_depth": stats.mean_depth,
+                }
+                for name, stats in self.queues.items()
+            },
+        }
+
+    def format_report(self) -> str:
+        """
+        Format the run statistics as a text table.
+
+        Returns:
+            Report with one line per stage and per queue
+        """
+        summary = self.summary()
+        lines = [f"Конвеєр: {self.processed} зобр. за {summary['elapsed_s']:.2f} с "
+                 f"({summary['images_per_s']:.1f} зобр/с), помилок: {self.failed}",
+                 f"{'етап':<12}{'потоків':>9}{'елементів':>11}{'зайнято с':>11}"
+                 f"{'чекав с':>10}{'завант.':>9}"]
+        for name, stats in summary['stages'].items():
+            lines.append(f"{name:<12}{stats['workers']:>9}{stats['items']:>11}"
+                         f"{stats['busy_s']:>11.2f}{stats['blocked_s']:>10.2f}"
+                         f"{stats['utilization']:>9.0%}")
+        lines.append(f"{'черга':<12}{'місткість':>11}{'макс':>7}{'середня':>10}")
+        for name, stats in summary['queues'].items():
+            lines.append(f"{name:<12}{stats['capacity']:>11}{stats['max_depth']:>7}"
+                         f"{stats['mean_depth']:>10.1f}")
+        return '\n'.join(lines)
+
+
+class _StatsQueue:
+    """Bounded asyncio queue that samples its depth and measures blocked puts."""
+
+    def __init__(self, stats: QueueStats):
+        self.stats = stats
+        self._queue: asyncio.Queue = asyncio.Queue(stats.capacity)
+
+    async def put(self, item: Any, stage: Optional[StageStats] = None) -> None:
+        start = time.perf_counter()
+        await self._queue.put(item)
+        if stage is not None:
+            stage.blocked_seconds += time.perf_counter() - start
+        self.stats.sample(self._queue.qsize())
+
+    async def get(self) -> Any:
+        item = await self._queue.get()
+        self.stats.sample(self._queue.qsize())
+        return item
+
+
+async def _as_async(source: Union[Iterable[str], AsyncIterable[str]]) -> AsyncIterable[str]:
+    if hasattr(source, '__aiter__'):
+        async for name in source:
+            yield name
+    else:
+        for name in source:
+            yield name
+
+
+class IngestionPipeline:
+    """Source -> read -> analyze -> sinks, connected by bounded queues."""
+
+    def __init__(self, sinks: Sequence[Sink],
+                 date_mapping: Optional[Dict[str, str]] = None,
+                 default_date: Optional[str] = None,
+                 workers: Optional[int] = None,
+                 readers: int = DEFAULT_READERS,
+                 queue_size: int = DEFAULT_QUEUE_SIZE,
+                 cache_dir: Optional[str] = None,
+                 use_threads: bool = False,
+                 profiler: Optional[Profiler] = None):
+        """
+        Configure the pipeline.
+
+        Args:
+            sinks: Outputs receiving every analyzed image, in this order
+            date_mapping: Optional mapping of file names or paths to YYYY-MM-DD
+            default_date: Fallback date string in YYYY-MM-DD format
+            workers: Number of analysis workers, defaults to CPU count
+            readers: Number of concurrent file or URL reads
+            queue_size: Capacity of every queue between stages
+            cache_dir: Optional result cache directory shared by all workers
+            use_threads: Analyze in threads instead of worker processes
+            profiler: Optional profiler receiving the stage timings of every image
+        """
+        self.sinks = list(sinks)
+        self.date_mapping = date_mapping
+        self.default_date = default_date
+        self.workers = workers or os.cpu_count() or 1
+        self.readers = max(readers, 1)
+        self.queue_size = max(queue_size, 1)
+        self.cache_dir = cache_dir
+        self.use_threads = use_threads
+        self.profiler = profiler
+        self.stats = PipelineStats()
+
+    def run(self, source: Union[Iterable[str], AsyncIterable[str]]) -> PipelineStats:
+        """
+        Run the pipeline to completion in a new event loop.
+
+        Args:
+            source: Image paths or URLs
+
+        Returns:
+            Statistics of the run
+        """
+        return asyncio.run(self.run_async(source))
+
+    async def run_async(self, source: Union[Iterable[str], AsyncIterable[str]]
+                        ) -> PipelineStats:
+        """
+        Run the pipeline until the source is exhausted.
+
+        Results reach the sinks in completion order, not source order.
+
+        Args:
+            source: Image paths or URLs, possibly arriving over time
+
+        Returns:
+            Statistics of the run
+        """
+        self.stats = stats = PipelineStats()
+        names = self._queue('names')
+        loaded = self._queue('loaded')
+        analyzed = self._queue('analyzed')
+        read_stage = self._stage('read', self.readers)
+        analyze_stage = self._stage('analyze', self.workers)
+        sink_stage = self._stage('sinks', 1)
+
+        io_executor = ThreadPoolExecutor(self.readers, thread_name_prefix='ingest-read')
+        sink_executor = ThreadPoolExecutor(1, thread_name_prefix='ingest-sink')
+        if self.use_threads:
+            analysis_executor: Executor = ThreadPoolExecutor(
+                self.workers, thread_name_prefix='ingest-analyze')
+        else:
+            analysis_executor = ProcessPoolExecutor(self.workers)
+
+        async def feed() -> None:
+            async for name in _as_async(source):
+                await names.put(name)
+
+        async def close_after(tasks: List['asyncio.Task'], queue: _StatsQueue,
+                              count: int) -> None:
+            await asyncio.gather(*tasks)
+            for _ in range(count):
+                await queue.put(_DONE)
+
+        spawn = asyncio.ensure_future
+        readers = [spawn(self._read(names, loaded, read_stage, io_executor))
+                   for _ in range(self.readers)]
+        analyzers = [spawn(self._analyze(loaded, analyzed, analyze_stage, analysis_executor))
+                     for _ in range(self.workers)]
+        tasks = [
+            spawn(close_after([spawn(feed())], names, self.readers)),
+            spawn(close_after(readers, loaded, self.workers)),
+            spawn(close_after(analyzers, analyzed, 1)),
+            spawn(self._write(analyzed, sink_stage, sink_executor)),
+        ]
+        try:
+            await asyncio.gather(*tasks)
+            await asyncio.get_running_loop().run_in_executor(sink_executor, self._close_sinks)
+        except BaseException:
+            for task in tasks + readers + analyzers:
+                task.cancel()
+            await asyncio.gather(*tasks, *readers, *analyzers, return_exceptions=True)
+            raise
+        finally:
+            analysis_executor.shutdown(wait=True, cancel_futures=True)
+            io_executor.shutdown(wait=True, cancel_futures=True)
+            sink_executor.shutdown(wait=True)
+            stats.finished = time.perf_counter()
+        return stats
+
+    def _queue(self, name: str) -> _StatsQueue:
+        stats = QueueStats(name, self.queue_size)
+        self.stats.queues[name] = stats
+        return _StatsQueue(stats)
+
+    def _stage(self, name: str, workers: int) -> StageStats:
+        stats = StageStats(name, workers)
+        self.stats.stages[name] = stats
+        return stats
+
+    async def _read(self, names: _StatsQueue, loaded: _StatsQueue, stage: StageStats,
+                    executor: Executor) -> None:
+        """Read encoded images; read failures travel on as error records."""
+        loop = asyncio.get_running_loop()
+        while True:
+            name = await names.get()
+            if name is _DONE:
+                return
+            start = time.perf_counter()
+            try:
+                data: Union[bytes, Exception] = await loop.run_in_executor(
+                    executor, read_source, name)
+            except Exception as e:
+                data = e
+            stage.busy_seconds += time.perf_counter() - start
+            stage.items += 1
+            await loaded.put((name, data), stage)
+
+    async def _analyze(self, loaded: _StatsQueue, analyzed: _StatsQueue, stage: StageStats,
+                       executor: Executor) -> None:
+        """Decode and classify images in the worker pool."""
+        loop = asyncio.get_running_loop()
+        func = (analyze_bytes_task if self.profiler is None
+                else partial(profiled_call, analyze_bytes_task))
+        while True:
+            item = await loaded.get()
+            if item is _DONE:
+                return
+            name, data = item
+            start = time.perf_counter()
+            if isinstance(data, Exception):
+                result: Tuple[Any, ...] = ({"image": name, "error": str(data)}, None)
+            else:
+                task = (name, resolve_date(name, self.date_mapping, self.default_date),
+                        data, self.cache_dir)
+                result = await loop.run_in_executor(executor, func, task)
+            stage.busy_seconds += time.perf_counter() - start
+            stage.items += 1
+            if self.profiler is not None and len(result) > 2:
+                self.profiler.add(result[2])
+            await analyzed.put(result[:2], stage)
+
+    async def _write(self, analyzed: _StatsQueue, stage: StageStats,
+                     executor: Executor) -> None:
+        """Hand results to the sinks one at a time on the sink thread."""
+        loop = asyncio.get_running_loop()
+        while True:
+            result = await analyzed.get()
+            if result is _DONE:
+                return
+            start = time.perf_counter()
+            await loop.run_in_executor(executor, self._write_sinks, result)
+            stage.busy_seconds += time.perf_counter() - start
+            stage.items += 1
+
+    def _write_sinks(self, result: AnalysisResult) -> None:
+        record, schedule = result
+        for sink in self.sinks:
+            sink.write(record, schedule)
+        self.stats.processed += 1
+        if schedule is None:
+            self.stats.failed += 1
+
+    def _close_sinks(self) -> None:
+        for sink in self.sinks:
+            sink.close()
@@ -0,0 +1,98 @@
+"""
+Per-session analysis state of the currently selected schedule image.
+
+Keeps the analyzed outage masks of one file in memory so switching queues
+or comparing all queues does not re-run the image pipeline.
+"""
+
+import os
+import threading
+from datetime import date
+from typing import Optional, Tuple
+
+from src.core.schedule import DaySchedule
+from src.pipeline.analysis import StageCallback, analyze_file
+from src.storage.result_cache import ResultCache
+
+
+FileKey = Tuple[str, int, int]
+
+
+class AnalysisSession:
+    """Analysis result of one image file, valid while the file is unchanged."""
+
+    def __init__(self, cache: Optional[ResultCache] = None):
+        """
+        Create an empty session.
+
+        Args:
+            cache: Optional on-disk result cache used on a session miss
+        """
+        self.cache = cache
+        self._lock = threading.Lock()
+        self._key: Optional[FileKey] = None
+        self._masks: Optional[Tuple[int, ...]] = None
+
+    @staticmethod
+    def file_key(path: str) -> FileKey:
+        """
+        Identify a file version by path, modification time and size.
+
+        Args:
+            path: Image file path
+
+        Returns:
+            Tuple of (absolute path, mtime in nanoseconds, size in bytes)
+        """
+        stat = os.stat(path)
+        return os.path.abspath(path), stat.st_mtime_ns, stat.st_size
+
+    def get(self, path: str, date_obj: date) -> Optional[DaySchedule]:
+        """
+        Get the schedule if this exact file version was already analyzed.
+
+        Args:
+            path: Image file path
+            date_obj: Schedule date
+
+        Returns:
+            DaySchedule or None if the file is new, changed or missing
+        """
+        try:
+            key = self.file_key(path)
+        except OSError:
+            return None
+
+        with self._lock:
+            if key != self._key:
+                return None
+            return DaySchedule(date_obj, self._masks)
+
+    def load(self, path: str, date_obj: date,
+             on_stage: Optional[StageCallback] = None) -> DaySchedule:
+        """
+        Get the schedule, analyzing the file if the session does not hold it.
+
+        Args:
+            path: Image file path
+            date_obj: Schedule date
+            on_stage: Stage callback passed to analyze_file
+
+        Returns:
+            DaySchedule of all sub-queues
+        """
+        key = self.file_key(path)
+        with self._lock:
+            if key == self._key:
+                return DaySchedule(date_obj, self._masks)
+
+        schedule = DaySchedule.from_matrix(date_obj, analyze_file(path, self.cache, on_stage))
+
+        with self._lock:
+            self._key, self._masks = key, schedule.masks
+        return schedule
+
+    def invalidate(self) -> None:
+        """Forget the held analysis result."""
+        with self._lock:
+            self._key, self._masks = None, None
@@ -0,0 +1,375 @@
+"""
+Watch-folder ingestion of schedule images.
+
+Watches a directory for new images (inotify on Linux, directory polling
+elsewhere), waits until each file stops changing, skips content that was
+already processed and analyzes the rest in a bounded process pool.
+"""
+
+import ctypes
+import ctypes.util
+import json
+import os
+import select
+import signal
+import struct
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import date
+from typing import Any, Callable, Deque, Dict, List, Optional, TextIO, Tuple
+
+from src.core.schedule import DaySchedule
+from src.pipeline.batch import (IMAGE_EXTENSIONS, analyze_task, profiled_analyze_task,
+                                resolve_date)
+from src.pipeline.diff import ScheduleDiff
+from src.storage.archive import Archive
+from src.storage.processed_log import FileStat, ProcessedLog
+from src.storage.result_cache import hash_image_bytes
+from src.utils.profiling import Profiler
+
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+def is_image_file(path: str) -> bool:
+    """Check whether a path has a supported image extension."""
+    return path.lower().endswith(IMAGE_EXTENSIONS)
+
+
+def _file_stat(path: str) -> Optional[FileStat]:
+    """Get (size, mtime_ns) of a regular file, or None if it is gone."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+class PollingSource:
+    """Reports changed files by comparing directory snapshots."""
+
+    def __init__(self, directory: str):
+        """
+        Take the initial snapshot of a directory.
+
+        Args:
+            directory: Directory to watch
+        """
+        self.directory = directory
+        self._snapshot = self._scan()
+
+    def _scan(self) -> Dict[str, FileStat]:
+        snapshot = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.is_file() and is_image_file(entry.name):
+                    stat = entry.stat()
+                    snapshot[entry.path] = (stat.st_size, stat.st_mtime_ns)
+        return snapshot
+
+    def wait(self, timeout: float, stop: threading.Event) -> List[str]:
+        """
+        Wait and report files that appeared or changed since the last call.
+
+        Args:
+            timeout: Seconds to wait before scanning
+            stop: Event that ends the wait early
+
+        Returns:
+            Paths of new or modified files
+        """
+        if stop.wait(timeout):
+            return []
+        snapshot = self._scan()
+        changed = [path for path, stat in snapshot.items()
+                   if self._snapshot.get(path) != stat]
+        self._snapshot = snapshot
+        return changed
+
+    def close(self) -> None:
+        """Release resources; nothing to do for polling."""
+
+
+class InotifySource:
+    """Reports changed files using Linux inotify through ctypes."""
+
+    def __init__(self, directory: str):
+        """
+        Start watching a directory.
+
+        Args:
+            directory: Directory to watch
+
+        Raises:
+            OSError: If inotify is not available
+        """
+        if not sys.platform.startswith('linux'):
+            raise OSError("inotify доступний лише в Linux")
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+
+        self.directory = directory
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+        if libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(errno, "inotify_add_watch")
+
+    def wait(self, timeout: float, stop: threading.Event) -> List[str]:
+        """
+        Wait for file events.
+
+        Args:
+            timeout: Maximum seconds to wait
+            stop: Unused; the caller checks it between waits
+
+        Returns:
+            Paths of files that were created, written or moved in
+        """
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return []
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        changed = []
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            _, _, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            if name:
+                path = os.path.join(self.directory, os.fsdecode(name))
+                if is_image_file(path):
+                    changed.append(path)
+        return changed
+
+    def close(self) -> None:
+        """Stop watching."""
+        os.close(self._fd)
+
+
+def _ignore_interrupts() -> None:
+    """Leave Ctrl+C handling to the watcher process, not its workers."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def open_source(directory: str, polling: bool = False) -> Any:
+    """
+    Open the most efficient change source for a directory.
+
+    Args:
+        directory: Directory to watch
+        polling: Force directory polling
+
+    Returns:
+        InotifySource where available, otherwise PollingSource
+    """
+    if not polling:
+        try:
+            return InotifySource(directory)
+        except (OSError, AttributeError):
+            pass
+    return PollingSource(directory)
+
+
+class FolderWatcher:
+    """Long-running ingestion of schedule images dropped into a directory."""
+
+    # Wait between checks while files are settling or being analyzed
+    BUSY_INTERVAL = 0.2
+
+    def __init__(self, directory: str,
+                 output: TextIO,
+                 log: ProcessedLog,
+                 date_mapping: Optional[Dict[str, str]] = None,
+                 default_date: Optional[str] = None,
+                 workers: Optional[int] = None,
+                 cache_dir: Optional[str] = None,
+                 archive: Optional[Archive] = None,
+                 on_schedule: Optional[Callable[[DaySchedule], None]] = None,
+                 on_change: Optional[Callable[[ScheduleDiff], None]] = None,
+                 settle_seconds: float = 2.0,
+                 poll_interval: float = 1.0,
+                 polling: bool = False,
+                 profiler: Optional[Profiler] = None):
+        """
+        Configure the watcher.
+
+        Args:
+            directory: Directory receiving schedule images
+            output: Text stream receiving one JSON line per analyzed image
+            log: Persistent log of processed images
+            date_mapping: Optional mapping of file names or paths to YYYY-MM-DD
+            default_date: Fallback date string in YYYY-MM-DD format
+            workers: Number of worker processes, defaults to CPU count
+            cache_dir: Optional result cache directory shared by all workers
+            archive: Optional archive receiving every analyzed day
+            on_schedule: Optional callback receiving every analyzed day
+            on_change: Optional callback receiving the changes of every
+                analyzed day against its previous revision, read from the
+                archive or remembered from earlier images of this run
+            settle_seconds: How long a file must stay unchanged before analysis
+            poll_interval: Seconds between checks when idle
+            polling: Force directory polling instead of inotify
+            profiler: Optional profiler receiving the stage timings of every image
+        """
+        self.directory = directory
+        self.output = output
+        self.log = log
+        self.date_mapping = date_mapping
+        self.default_date = default_date
+        self.workers = workers or os.cpu_count() or 1
+        self.cache_dir = cache_dir
+        self.archive = archive
+        self.on_schedule = on_schedule
+        self.on_change = on_change
+        self.settle_seconds = settle_seconds
+        self.poll_interval = poll_interval
+        self.polling = polling
+        self.profiler = profiler
+        self.max_in_flight = self.workers * 2
+
+        self._pending: Dict[str, Tuple[FileStat, float]] = {}
+        self._ready: Deque[Tuple[str, FileStat]] = deque()
+        self._in_flight: Dict[Future, Tuple[str, FileStat, str]] = {}
+        # Content hash being analyzed -> other files with the same content
+        self._duplicates: Dict[str, List[Tuple[str, FileStat]]] = {}
+        self._revisions: Dict[date, DaySchedule] = {}
+        self.processed = 0
+        self.skipped = 0
+        self.failed = 0
+
+    def run(self, stop: Optional[threading.Event] = None) -> None:
+        """
+        Watch and analyze until the stop event is set.
+
+        Args:
+            stop: Event ending the loop; runs until interrupted if omitted
+        """
+        stop = stop or threading.Event()
+        source = open_source(self.directory, self.polling)
+        try:
+            with ProcessPoolExecutor(max_workers=self.workers,
+                                     initializer=_ignore_interrupts) as executor:
+                with os.scandir(self.directory) as entries:
+                    for entry in entries:
+                        if entry.is_file() and is_image_file(entry.name):
+                            self._observe(entry.path)
+
+                while not stop.is_set():
+                    busy = self._pending or self._ready or self._in_flight
+                    timeout = self.BUSY_INTERVAL if busy else self.poll_interval
+                    for path in source.wait(timeout, stop):
+                        self._observe(path)
+                    self._settle()
+                    self._submit(executor)
+                    self._collect(block=False)
+
+                self._collect(block=True)
+        finally:
+            source.close()
+
+    def _observe(self, path: str) -> None:
+        """Start tracking a new or modified file unless it was processed."""
+        stat = _file_stat(path)
+        if stat is None or self.log.known_stat(path) == stat:
+            return
+        previous = self._pending.get(path)
+        if previous is None or previous[0] != stat:
+            self._pending[path] = (stat, time.monotonic())
+
+    def _settle(self) -> None:
+        """Move files that stopped changing from pending to ready."""
+        now = time.monotonic()
+        for path, (stat, changed_at) in list(self._pending.items()):
+            current = _file_stat(path)
+            if current is None:
+                del self._pending[path]
+            elif current != stat:
+                self._pending[path] = (current, now)
+            elif current[0] > 0 and now - changed_at >= self.settle_seconds:
+                del self._pending[path]
+                self._ready.append((path, current))
+
+    def _submit(self, executor: ProcessPoolExecutor) -> None:
+        """Hash ready files and submit new content while below the limit."""
+        while self._ready and len(self._in_flight) < self.max_in_flight:
+            path, stat = self._ready.popleft()
+            try:
+                with open(path, 'rb') as f:
+                    digest = hash_image_bytes(f.read())
+            except OSError:
+                continue
+
+            if self.log.seen(digest):
+                self.log.record(digest, path, stat)
+                self.skipped += 1
+                continue
+            if digest in self._duplicates:
+                # Settled with the result of the analysis already running
+                self._duplicates[digest].append((path, stat))
+                continue
+
+            task = (path, resolve_date(path, self.date_mapping, self.default_date),
+                    self.cache_dir)
+            func = analyze_task if self.profiler is None else profiled_analyze_task
+            future = executor.submit(func, task)
+            self._in_flight[future] = (path, stat, digest)
+            self._duplicates[digest] = []
+
+    def _previous_revision(self, schedule: DaySchedule) -> Optional[DaySchedule]:
+        """Get the last known revision of a day and remember the new one."""
+        if self.archive is not None:
+            return self.archive.get_day(schedule.date)
+        previous = self._revisions.get(schedule.date)
+        self._revisions[schedule.date] = schedule
+        return previous
+
+    def _collect(self, block: bool) -> None:
+        """Write results of finished analyses to the outputs."""
+        for future in list(self._in_flight):
+            if not block and not future.done():
+                continue
+            path, stat, digest = self._in_flight.pop(future)
+            duplicates = self._duplicates.pop(digest)
+            result = future.result()
+            record, schedule = result[0], result[1]
+            if self.profiler is not None:
+                self.profiler.add(result[2])
+
+            self.output.write(json.dumps(record, ensure_ascii=False) + '\n')
+            self.output.flush()
+            self.processed += 1
+            if schedule is None:
+                # Failed files stay unprocessed and are analyzed again when
+                # they change or the watcher restarts
+                self.failed += 1
+                for failed_path, failed_stat in [(path, stat), *duplicates]:
+                    self.log.record_failure(digest, failed_path, failed_stat,
+                                            record.get("error", ""))
+                continue
+
+            if self.on_change is not None:
+                self.on_change(ScheduleDiff(self._previous_revision(schedule), schedule))
+            if self.archive is not None:
+                self.archive.store_day(schedule, path)
+            if self.on_schedule is not None:
+                self.on_schedule(schedule)
+            self.log.record(digest, path, stat)
+            for duplicate_path, duplicate_stat in duplicates:
+                self.log.record(digest, duplicate_path, duplicate_stat)
+                self.skipped += 1
@@ -0,0 +1,18 @@
+"""
+Feed server module.
+
+Contains the cache of rendered per-queue feeds and the HTTP server that
+publishes them for calendar subscriptions.
+"""
+
+from src.lazy_imports import lazy_exports
+
+_EXPORTS = {
+    "FeedCache": "src.server.feeds",
+    "FeedRequestHandler": "src.server.http_server",
+    "FeedServer": "src.server.http_server",
+    "RenderedFeed": "src.server.feeds",
+}
+
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
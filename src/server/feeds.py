@@ -0,0 +1,183 @@
+"""
+Rendered outage feeds for calendar subscriptions.
+
+Renders per-queue .ics and .json feeds from the schedule archive and keeps
+the encoded bytes together with their HTTP validators, so repeated polls are
+answered without rendering the calendar again.
+"""
+
+import hashlib
+import io
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta, timezone
+from email.utils import format_datetime
+from typing import Dict, Mapping, Optional, Sequence, Tuple
+
+from src.core.schedule import QUEUE_NAMES
+from src.storage.archive import Archive
+from src.utils.ics_writer import write_calendar
+from src.utils.result_builder import build_queue_result
+
+
+CONTENT_TYPES: Dict[str, str] = {
+    'ics': 'text/calendar; charset=utf-8',
+    'json': 'application/json; charset=utf-8',
+}
+
+# URL token of every sub-queue, e.g. "3-2" for "Черга 3-2"
+FEED_QUEUES: Dict[str, int] = {name.split()[-1]: queue_id
+                               for queue_id, name in enumerate(QUEUE_NAMES)}
+
+DEFAULT_WINDOW_DAYS = 28
+MAX_WINDOW_DAYS = 366
+
+
+class RenderedFeed:
+    """Encoded feed body with its HTTP validators."""
+
+    __slots__ = ('body', 'content_type', 'etag', 'last_modified', 'modified_timestamp')
+
+    def __init__(self, body: bytes, content_type: str, last_modified: Optional[datetime]):
+        """
+        Wrap a rendered feed.
+
+        Args:
+            body: Encoded feed
+            content_type: Value of the Content-Type header
+            last_modified: Latest archive update of the feed's days, if any
+        """
+        self.body = body
+        self.content_type = content_type
+        self.etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        if last_modified is not None:
+            utc = last_modified.astimezone(timezone.utc).replace(microsecond=0)
+            self.last_modified: Optional[str] = format_datetime(utc, usegmt=True)
+            self.modified_timestamp: Optional[float] = utc.timestamp()
+        else:
+            self.last_modified = None
+            self.modified_timestamp = None
+
+
+class FeedCache:
+    """Renders archive feeds on first request and serves cached bytes after."""
+
+    # How often the archive is checked for new writes
+    REVALIDATE_SECONDS = 1.0
+
+    def __init__(self, archive: Archive,
+                 window_days: int = DEFAULT_WINDOW_DAYS,
+                 max_entries: int = 256):
+        """
+        Create a feed cache.
+
+        Args:
+            archive: Archive with the analyzed schedules
+            window_days: Number of past days in the default feed window
+            max_entries: Maximum number of rendered feeds kept in memory
+        """
+        self.archive = archive
+        self.window_days = window_days
+        self.max_entries = max_entries
+        self._feeds: 'OrderedDict[Tuple[int, str, date, date], RenderedFeed]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._revision: Optional[Tuple[int, int]] = None
+        self._checked_at = 0.0
+        self.renders = 0
+
+    def window(self, query: Mapping[str, Sequence[str]]) -> Tuple[date, date]:
+        """
+        Resolve the date window of a request.
+
+        Defaults to the last window_days days up to tomorrow.
+
+        Args:
+            query: Parsed query string with optional 'from' and 'to' ISO dates
+
+        Returns:
+            Tuple of (first day, last day)
+
+        Raises:
+            ValueError: If a date is malformed or the window is too long
+        """
+        today = date.today()
+        start = today - timedelta(days=self.window_days)
+        end = today + timedelta(days=1)
+        try:
+            if 'from' in query:
+                start = date.fromisoformat(query['from'][0])
+            if 'to' in query:
+                end = date.fromisoformat(query['to'][0])
+        except ValueError:
+            raise ValueError("Неправильний формат дати. Використовуйте РРРР-ММ-ДД") from None
+        if start > end or (end - start).days >= MAX_WINDOW_DAYS:
+            raise ValueError("Некоректний період")
+        return start, end
+
+    def get(self, queue_id: int, fmt: str, start: date, end: date) -> RenderedFeed:
+        """
+        Get a rendered feed, rendering it only when the archive changed.
+
+        Args:
+            queue_id: Sub-queue id
+            fmt: Feed format, 'ics' or 'json'
+            start: First day, inclusive
+            end: Last day, inclusive
+
+        Returns:
+            Rendered feed
+        """
+        key = (queue_id, fmt, start, end)
+        with self._lock:
+            self._revalidate()
+            feed = self._feeds.get(key)
+            if feed is not None:
+                self._feeds.move_to_end(key)
+                return feed
+
+            feed = self._render(queue_id, fmt, start, end)
+            self._feeds[key] = feed
+            if len(self._feeds) > self.max_entries:
+                self._feeds.popitem(last=False)
+            return feed
+
+    def invalidate(self) -> None:
+        """Drop all rendered feeds."""
+        with self._lock:
+            self._feeds.clear()
+
+    def _revalidate(self) -> None:
+        """Drop rendered feeds if the archive was written since the last check."""
+        now = time.monotonic()
+        if now - self._checked_at < self.REVALIDATE_SECONDS:
+            return
+        self._checked_at = now
+        revision = self.archive.revision()
+        if revision != self._revision:
+            self._revision = revision
+            self._feeds.clear()
+
+    def _render(self, queue_id: int, fmt: str, start: date, end: date) -> RenderedFeed:
+        queue_name = QUEUE_NAMES[queue_id]
+        days = list(self.archive.iter_days(start, end))
+        last_modified = self.archive.last_updated(start, end)
+        self.renders += 1
+
+        if fmt == 'ics':
+            output = io.BytesIO()
+            write_calendar(output, queue_name,
+                           ((day.date, day.outage_list(queue_id)) for day in days))
+            body = output.getvalue()
+        else:
+            body = json.dumps({
+                "queue": queue_name,
+                "from": start.isoformat(),
+                "to": end.isoformat(),
+                "days": [build_queue_result(queue_name, day.intervals(queue_id), day.date,
+                                            analyzed_at=last_modified)
+                         for day in days]
+            }, ensure_ascii=False, indent=2).encode('utf-8')
+
+        return RenderedFeed(body, CONTENT_TYPES[fmt], last_modified)
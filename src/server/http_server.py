@@ -0,0 +1,134 @@
+"""
+HTTP subscription server for outage feeds.
+
+Serves /<queue>.ics and /<queue>.json (e.g. /3-2.ics) from the schedule
+archive with ETag and Last-Modified validation, so polling calendar clients
+mostly receive 304 responses. Optional ?from=YYYY-MM-DD&to=YYYY-MM-DD
+parameters select the date window.
+"""
+
+import json
+from email.utils import parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from src.core.schedule import QUEUE_NAMES
+from src.server.feeds import CONTENT_TYPES, FEED_QUEUES, FeedCache, RenderedFeed
+
+
+CACHE_CONTROL = 'public, max-age=60'
+
+
+class FeedRequestHandler(BaseHTTPRequestHandler):
+    """Handles feed requests of a FeedServer."""
+
+    protocol_version = 'HTTP/1.1'
+    server_version = 'ScheduleAnalyzerFeeds/1.0'
+
+    server: 'FeedServer'
+
+    def do_GET(self) -> None:
+        self._serve(send_body=True)
+
+    def do_HEAD(self) -> None:
+        self._serve(send_body=False)
+
+    def _serve(self, send_body: bool) -> None:
+        url = urlsplit(self.path)
+        name = url.path.lstrip('/')
+
+        if name in ('', 'index.json'):
+            self._send_body(200, CONTENT_TYPES['json'], self.server.index, send_body)
+            return
+
+        token, _, fmt = name.rpartition('.')
+        queue_id = FEED_QUEUES.get(token)
+        if queue_id is None or fmt not in CONTENT_TYPES:
+            self._send_error(404, "Стрічку не знайдено", send_body)
+            return
+
+        try:
+            start, end = self.server.feeds.window(parse_qs(url.query))
+        except ValueError as e:
+            self._send_error(400, str(e), send_body)
+            return
+
+        feed = self.server.feeds.get(queue_id, fmt, start, end)
+        if self._not_modified(feed):
+            self.send_response(304)
+            self._send_validators(feed)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', feed.content_type)
+        self.send_header('Content-Length', str(len(feed.body)))
+        self._send_validators(feed)
+        self.end_headers()
+        if send_body:
+            self.wfile.write(feed.body)
+
+    def _not_modified(self, feed: RenderedFeed) -> bool:
+        """Check the conditional request headers against a feed."""
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            tags = [tag.strip() for tag in if_none_match.split(',')]
+            return '*' in tags or any(tag.removeprefix('W/') == feed.etag for tag in tags)
+
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since and feed.modified_timestamp is not None:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            return since.tzinfo is not None and feed.modified_timestamp <= since.timestamp()
+        return False
+
+    def _send_validators(self, feed: RenderedFeed) -> None:
+        self.send_header('ETag', feed.etag)
+        if feed.last_modified is not None:
+            self.send_header('Last-Modified', feed.last_modified)
+        self.send_header('Cache-Control', CACHE_CONTROL)
+
+    def _send_body(self, status: int, content_type: str, body: bytes, send_body: bool) -> None:
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def _send_error(self, status: int, message: str, send_body: bool) -> None:
+        body = json.dumps({"error": message}, ensure_ascii=False).encode('utf-8')
+        self._send_body(status, CONTENT_TYPES['json'], body, send_body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+class FeedServer(ThreadingHTTPServer):
+    """Threaded HTTP server sharing one FeedCache between all requests."""
+
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(self, address: Tuple[str, int], feeds: FeedCache, quiet: bool = False):
+        """
+        Bind the server.
+
+        Args:
+            address: (host, port) to listen on; port 0 picks a free port
+            feeds: Feed cache backed by the schedule archive
+            quiet: Do not log every request to stderr
+        """
+        super().__init__(address, FeedRequestHandler)
+        self.feeds = feeds
+        self.quiet = quiet
+        self.index = json.dumps({
+            "feeds": [
+                {"queue": QUEUE_NAMES[queue_id], "ics": f"/{token}.ics", "json": f"/{token}.json"}
+                for token, queue_id in FEED_QUEUES.items()
+            ]
+        }, ensure_ascii=False, indent=2).encode('utf-8')
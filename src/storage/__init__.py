@@ -0,0 +1,22 @@
+"""
+Persistent storage module.
+
+Contains the on-disk cache of analyzed schedule grids, the SQLite and
+memory-mapped binary archives of analyzed schedules and the log of
+processed images.
+"""
+
+from src.lazy_imports import lazy_exports
+
+_EXPORTS = {
+    "BinaryArchive": "src.storage.binary_archive",
+    "ProcessedLog": "src.storage.processed_log",
+    "ResultCache": "src.storage.result_cache",
+    "ScheduleArchive": "src.storage.archive",
+    "default_cache_dir": "src.storage.result_cache",
+    "hash_image_bytes": "src.storage.result_cache",
+    "open_archive": "src.storage.archive",
+}
+
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
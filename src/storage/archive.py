@@ -0,0 +1,280 @@
+"""
+SQLite archive of analyzed outage schedules.
+
+Stores one outage bitmask per (date, sub-queue) with precomputed minutes,
+indexed for fast range queries over months or years of schedules.
+"""
+
+import sqlite3
+from datetime import date, datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from src.core.schedule import QUEUE_COUNT, DaySchedule, mask_minutes
+from src.storage.binary_archive import BINARY_EXTENSION, BinaryArchive
+
+
+class ScheduleArchive:
+    """Persistent archive of day schedules backed by SQLite."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS outages (
+            day TEXT NOT NULL,
+            queue_id INTEGER NOT NULL,
+            mask INTEGER NOT NULL,
+            minutes INTEGER NOT NULL,
+            source TEXT,
+            updated_at TEXT NOT NULL,
+            PRIMARY KEY (day, queue_id)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_outages_queue_day ON outages (queue_id, day);
+    """
+
+    def __init__(self, path: str = ':memory:'):
+        """
+        Open or create an archive.
+
+        Args:
+            path: SQLite database file, or ':memory:' for a temporary archive
+        """
+        self.path = path
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.executescript(self.SCHEMA)
+        self._writes = 0
+
+    def __enter__(self) -> 'ScheduleArchive':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self.connection.close()
+
+    @staticmethod
+    def _day_key(date_obj: date) -> str:
+        if isinstance(date_obj, datetime):
+            date_obj = date_obj.date()
+        return date_obj.isoformat()
+
+    def store_days(self, schedules: Iterable[DaySchedule],
+                   source: Optional[str] = None) -> int:
+        """
+        Insert or replace many day schedules in one transaction.
+
+        Args:
+            schedules: Day schedules to store
+            source: Optional origin label, e.g. the image path
+
+        Returns:
+            Number of stored days
+        """
+        updated_at = datetime.now().isoformat(timespec='seconds')
+        rows = []
+        days = 0
+        for schedule in schedules:
+            day = self._day_key(schedule.date)
+            rows.extend(
+                (day, queue_id, mask, mask_minutes(mask), source, updated_at)
+                for queue_id, mask in enumerate(schedule.masks)
+            )
+            days += 1
+
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO outages "
+                "(day, queue_id, mask, minutes, source, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+        self._writes += 1
+        return days
+
+    def store_day(self, schedule: DaySchedule, source: Optional[str] = None) -> None:
+        """
+        Insert or replace a single day schedule.
+
+        Args:
+            schedule: Day schedule to store
+            source: Optional origin label, e.g. the image path
+        """
+        self.store_days([schedule], source)
+
+    def get_day(self, date_obj: date) -> Optional[DaySchedule]:
+        """
+        Load the schedule of one day.
+
+        Args:
+            date_obj: Day to load
+
+        Returns:
+            DaySchedule or None if the day is not archived
+        """
+        rows = self.connection.execute(
+            "SELECT queue_id, mask FROM outages WHERE day = ?",
+            (self._day_key(date_obj),)
+        ).fetchall()
+        if not rows:
+            return None
+
+        masks = [0] * QUEUE_COUNT
+        for queue_id, mask in rows:
+            masks[queue_id] = mask
+        return DaySchedule(date_obj, masks)
+
+    def iter_days(self, start: date, end: date) -> Iterator[DaySchedule]:
+        """
+        Iterate over archived days in a date range.
+
+        Args:
+            start: First day, inclusive
+            end: Last day, inclusive
+
+        Yields:
+            DaySchedule for every archived day in date order
+        """
+        cursor = self.connection.execute(
+            "SELECT day, queue_id, mask FROM outages "
+            "WHERE day BETWEEN ? AND ? ORDER BY day",
+            (self._day_key(start), self._day_key(end))
+        )
+
+        current_day, masks = None, None
+        for day, queue_id, mask in cursor:
+            if day != current_day:
+                if current_day is not None:
+                    yield DaySchedule(date.fromisoformat(current_day), masks)
+                current_day, masks = day, [0] * QUEUE_COUNT
+            masks[queue_id] = mask
+
+        if current_day is not None:
+            yield DaySchedule(date.fromisoformat(current_day), masks)
+
+    def total_minutes_by_queue(self, start: date, end: date) -> Dict[int, int]:
+        """
+        Sum outage minutes per sub-queue over a date range.
+
+        Args:
+            start: First day, inclusive
+            end: Last day, inclusive
+
+        Returns:
+            Dictionary mapping every sub-queue id to its total outage
+            minutes, 0 when no day in the range is archived
+        """
+        rows = self.connection.execute(
+            "SELECT queue_id, SUM(minutes) FROM outages "
+            "WHERE day BETWEEN ? AND ? GROUP BY queue_id",
+            (self._day_key(start), self._day_key(end))
+        )
+        totals = dict.fromkeys(range(QUEUE_COUNT), 0)
+        totals.update(rows)
+        return totals
+
+    def daily_minutes(self, queue_id: int, start: date, end: date) -> List[Tuple[date, int]]:
+        """
+        Get outage minutes of one sub-queue for each archived day.
+
+        Args:
+            queue_id: Sub-queue id
+            start: First day, inclusive
+            end: Last day, inclusive
+
+        Returns:
+            List of (date, minutes) in date order
+        """
+        rows = self.connection.execute(
+            "SELECT day, minutes FROM outages "
+            "WHERE queue_id = ? AND day BETWEEN ? AND ? ORDER BY day",
+            (queue_id, self._day_key(start), self._day_key(end))
+        )
+        return [(date.fromisoformat(day), minutes) for day, minutes in rows]
+
+    def busiest_days(self, start: date, end: date, limit: int = 10,
+                     queue_id: Optional[int] = None) -> List[Tuple[date, int]]:
+        """
+        Find the days with the most outage minutes.
+
+        Args:
+            start: First day, inclusive
+            end: Last day, inclusive
+            limit: Maximum number of days to return
+            queue_id: Restrict to one sub-queue, or sum over all of them
+
+        Returns:
+            List of (date, minutes) ordered from the most minutes
+        """
+        query = ("SELECT day, SUM(minutes) AS total FROM outages "
+                 "WHERE day BETWEEN ? AND ?")
+        params: list = [self._day_key(start), self._day_key(end)]
+        if queue_id is not None:
+            query += " AND queue_id = ?"
+            params.append(queue_id)
+        query += " GROUP BY day ORDER BY total DESC, day LIMIT ?"
+        params.append(limit)
+
+        rows = self.connection.execute(query, params)
+        return [(date.fromisoformat(day), total) for day, total in rows]
+
+    def date_range(self) -> Optional[Tuple[date, date]]:
+        """
+        Get the first and last archived days.
+
+        Returns:
+            Tuple of (first day, last day) or None for an empty archive
+        """
+        first, last = self.connection.execute(
+            "SELECT MIN(day), MAX(day) FROM outages").fetchone()
+        if first is None:
+            return None
+        return date.fromisoformat(first), date.fromisoformat(last)
+
+    def revision(self) -> Tuple[int, int]:
+        """
+        Get a cheap change marker of the archive.
+
+        Returns:
+            Tuple that differs after any committed write through this
+            connection or another connection to the same file
+        """
+        data_version, = self.connection.execute("PRAGMA data_version").fetchone()
+        return self._writes, data_version
+
+    def last_updated(self, start: date, end: date) -> Optional[datetime]:
+        """
+        Get the latest store time of the days in a date range.
+
+        Args:
+            start: First day, inclusive
+            end: Last day, inclusive
+
+        Returns:
+            Latest update time or None if no day in the range is archived
+        """
+        updated_at, = self.connection.execute(
+            "SELECT MAX(updated_at) FROM outages WHERE day BETWEEN ? AND ?",
+            (self._day_key(start), self._day_key(end))
+        ).fetchone()
+        return datetime.fromisoformat(updated_at) if updated_at else None
+
+
+Archive = Union[ScheduleArchive, BinaryArchive]
+
+
+def open_archive(path: str, read_only: bool = False) -> Archive:
+    """
+    Open an archive in the format given by the file extension.
+
+    Args:
+        path: SQLite database, or a binary archive ending in BINARY_EXTENSION
+        read_only: Open an existing binary archive for reading only; SQLite
+            archives are always opened for writing so WAL readers work
+
+    Returns:
+        BinaryArchive for BINARY_EXTENSION files, ScheduleArchive otherwise
+    """
+    if path.lower().endswith(BINARY_EXTENSION):
+        return BinaryArchive(path, read_only)
+    return ScheduleArchive(path)
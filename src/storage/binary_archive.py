@@ -0,0 +1,419 @@
+"""
+Memory-mapped binary archive of daily outage schedules.
+
+File layout, little-endian:
+    header   HEADER_SIZE bytes: magic, format version, record size, sub-queue
+             and slot counts, first day ordinal, number of days and the
+             ScheduleConfig fingerprint the days were analyzed with
+    records  RECORD_SIZE bytes per consecutive day from the first day: the
+             48-bit mask of every sub-queue as MASK_BYTES little-endian bytes,
+             then the store time in Unix seconds as an int64, 0 for days
+             that were never stored
+
+The record of a day is located from its date alone, so any day or range is
+read in O(1) as a zero-copy numpy view of the mapped file. Days inside the
+range that were never stored are skipped by the day queries and read as days
+without outages in the array queries.
+"""
+
+import mmap
+import os
+import struct
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from schedule_config import ScheduleConfig
+from src.core.schedule import MINUTES_PER_SLOT, QUEUE_COUNT, SLOTS_PER_DAY, DaySchedule
+
+
+MAGIC = b'SCHEDARC'
+FORMAT_VERSION = 2
+HEADER = struct.Struct('<8sHHHHiI16s')
+HEADER_SIZE = 64
+MASK_BYTES = SLOTS_PER_DAY // 8
+RECORD = np.dtype([('masks', np.uint8, (QUEUE_COUNT, MASK_BYTES)), ('stored_at', '<i8')])
+RECORD_SIZE = RECORD.itemsize
+BINARY_EXTENSION = '.bin'
+
+
+def _ordinal(date_obj: date) -> int:
+    if isinstance(date_obj, datetime):
+        date_obj = date_obj.date()
+    return date_obj.toordinal()
+
+
+def _record(schedule: DaySchedule, stored_at: int) -> bytes:
+    return b''.join([*(mask.to_bytes(MASK_BYTES, 'little') for mask in schedule.masks),
+                     stored_at.to_bytes(8, 'little')])
+
+
+class BinaryArchive:
+    """Fixed-width day records in one file, read through mmap."""
+
+    def __init__(self, path: str, read_only: bool = False):
+        """
+        Open or create an archive.
+
+        Args:
+            path: Archive file
+            read_only: Open an existing file for reading only
+
+        Raises:
+            ValueError: If the file is not an archive of a supported version
+                or was written for a different number of sub-queues or slots
+            FileNotFoundError: If a read-only archive does not exist
+        """
+        self.path = path
+        self.read_only = read_only
+        self.start: Optional[date] = None
+        self.day_count = 0
+        self.fingerprint = ScheduleConfig.fingerprint()
+        self._map: Optional[mmap.mmap] = None
+        self._records: Optional[np.ndarray] = None
+        self._writes = 0
+        self._file_stat: Optional[Tuple[int, int]] = None
+
+        # Unbuffered, so header reads see writes of other processes
+        if read_only or (os.path.exists(path) and os.path.getsize(path) > 0):
+            self._file = open(path, 'rb' if read_only else 'r+b', buffering=0)
+            self._read_header()
+        else:
+            self._file = open(path, 'w+b', buffering=0)
+            self._write_header()
+        self._file_stat = self._stat()
+
+    def __enter__(self) -> 'BinaryArchive':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the file; views handed out keep the mapping alive."""
+        self._release_map()
+        self._file.close()
+
+    def _stat(self) -> Tuple[int, int]:
+        stat = os.fstat(self._file.fileno())
+        return stat.st_mtime_ns, stat.st_size
+
+    def _refresh(self) -> None:
+        """Re-read the header when another process wrote to the file."""
+        stat = self._stat()
+        if stat != self._file_stat:
+            self._release_map()
+            self._read_header()
+            self._file_stat = stat
+
+    def _read_header(self) -> None:
+        self._file.seek(0)
+        data = self._file.read(HEADER_SIZE)
+        if len(data) < HEADER_SIZE or not data.startswith(MAGIC):
+            self._file.close()
+            raise ValueError(f"Файл не є бінарним архівом графіків: {self.path}")
+
+        (_, version, record_size, queues, slots,
+         start, day_count, fingerprint) = HEADER.unpack_from(data)
+        if version != FORMAT_VERSION:
+            self._file.close()
+            raise ValueError(f"Непідтримувана версія архіву: {version}")
+        if (record_size, queues, slots) != (RECORD_SIZE, QUEUE_COUNT, SLOTS_PER_DAY):
+            self._file.close()
+            raise ValueError("Архів записано для іншої кількості черг або слотів")
+
+        self.start = date.fromordinal(start) if day_count else None
+        self.day_count = day_count
+        self.fingerprint = fingerprint.decode('ascii')
+
+    def _write_header(self) -> None:
+        start = _ordinal(self.start) if self.start is not None else 0
+        header = HEADER.pack(MAGIC, FORMAT_VERSION, RECORD_SIZE, QUEUE_COUNT, SLOTS_PER_DAY,
+                             start, self.day_count, self.fingerprint.encode('ascii'))
+        self._file.seek(0)
+        self._file.write(header.ljust(HEADER_SIZE, b'\0'))
+
+    def _release_map(self) -> None:
+        self._records = None
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                # Views are still exported; the mapping is freed with them
+                pass
+            self._map = None
+
+    def _view(self) -> np.ndarray:
+        """All records as a structured RECORD view of the mapping."""
+        if self._records is None:
+            if not self.day_count:
+                return np.zeros(0, dtype=RECORD)
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._records = np.frombuffer(self._map, dtype=RECORD, count=self.day_count,
+                                          offset=HEADER_SIZE)
+        return self._records
+
+    def store_days(self, schedules: Iterable[DaySchedule],
+                   source: Optional[str] = None) -> int:
+        """
+        Write or overwrite many day schedules.
+
+        The file grows to cover new days in either direction; days skipped
+        over stay unstored.
+
+        Args:
+            schedules: Day schedules to store; the last one of a date wins
+            source: Ignored, accepted for compatibility with ScheduleArchive
+
+        Returns:
+            Number of stored days
+
+        Raises:
+            ValueError: If the archive was written with another ScheduleConfig
+                or is open for reading only
+        """
+        if self.read_only:
+            raise ValueError("Архів відкрито лише для читання")
+        days = {_ordinal(schedule.date): schedule for schedule in schedules}
+        if not days:
+            return 0
+        self._refresh()
+        fingerprint = ScheduleConfig.fingerprint()
+        if self.day_count and self.fingerprint != fingerprint:
+            raise ValueError("Архів записано з іншою конфігурацією аналізу")
+        self.fingerprint = fingerprint
+
+        first, last = min(days), max(days)
+        self._release_map()
+
+        if self.start is None:
+            self.start = date.fromordinal(first)
+        elif first < _ordinal(self.start):
+            # Move the stored records to make room for earlier days
+            shift = (_ordinal(self.start) - first) * RECORD_SIZE
+            self._file.seek(HEADER_SIZE)
+            stored = self._file.read(self.day_count * RECORD_SIZE)
+            self._file.seek(HEADER_SIZE)
+            self._file.write(bytes(shift) + stored)
+            self.day_count += shift // RECORD_SIZE
+            self.start = date.fromordinal(first)
+
+        start = _ordinal(self.start)
+        day_count = max(self.day_count, last - start + 1)
+        if day_count > self.day_count:
+            self._file.truncate(HEADER_SIZE + day_count * RECORD_SIZE)
+            self.day_count = day_count
+
+        stored_at = int(time.time())
+        for ordinal in sorted(days):
+            self._file.seek(HEADER_SIZE + (ordinal - start) * RECORD_SIZE)
+            self._file.write(_record(days[ordinal], stored_at))
+
+        self._write_header()
+        self._file.flush()
+        self._writes += 1
+        self._file_stat = self._stat()
+        return len(days)
+
+    def store_day(self, schedule: DaySchedule, source: Optional[str] = None) -> None:
+        """
+        Write or overwrite one day schedule.
+
+        Args:
+            schedule: Day schedule to store
+            source: Ignored, accepted for compatibility with ScheduleArchive
+        """
+        self.store_days([schedule], source)
+
+    def date_range(self) -> Optional[Tuple[date, date]]:
+        """
+        Get the first and last stored days.
+
+        Returns:
+            Tuple of (first day, last day) or None for an empty archive
+        """
+        self._refresh()
+        if self.start is None:
+            return None
+        return self.start, self.start + timedelta(days=self.day_count - 1)
+
+    def _bounds(self, start: date, end: date) -> Tuple[int, int]:
+        if self.start is None:
+            return 0, 0
+        first = _ordinal(self.start)
+        lower = min(max(_ordinal(start) - first, 0), self.day_count)
+        upper = min(max(_ordinal(end) - first + 1, lower), self.day_count)
+        return lower, upper
+
+    def records(self, start: date, end: date) -> np.ndarray:
+        """
+        Get the raw records of a date range without copying.
+
+        Args:
+            start: First day, inclusive
+            end: Last day, inclusive
+
+        Returns:
+            uint8 view of shape (days, QUEUE_COUNT, MASK_BYTES) covering the
+            stored part of the range, starting at max(start, first day);
+            days that were never stored are all zeros
+        """
+        self._refresh()
+        lower, upper = self._bounds(start, end)
+        return self._view()[lower:upper]['masks']
+
+    def _stored_at(self, start: date, end: date) -> Tuple[int, np.ndarray]:
+        """First record index and the store times of a date range."""
+        self._refresh()
+        lower, upper = self._bounds(start, end)
+        return lower, self._view()[lower:upper]['stored_at']
+
+    def masks(self, start: date, end: date) -> np.ndarray:
+        """
+        Get the bitmasks of a date range.
+
+        Args:
+            start: First day, inclusive
+            end: Last day, inclusive
+
+        Returns:
+            uint64 array of shape (days, QUEUE_COUNT) for the stored part of
+            the range
+        """
+        records = self.records(start, end)
+        padded = np.zeros(records.shape[:2] + (8,), dtype=np.uint8)
+        padded[:, :, :MASK_BYTES] = records
+        return padded.view('<u8')[:, :, 0]
+
+    def slots(self, start: date, end: date) -> np.ndarray:
+        """
+        Get the outage slots of a date range.
+
+        Args:
+            start: First day, inclusive
+            end: Last day, inclusive
+
+        Returns:
+            Boolean array of shape (days, QUEUE_COUNT, SLOTS_PER_DAY) for the
+            stored part of the range
+        """
+        return np.unpackbits(self.records(start, end), axis=-1,
+                             bitorder='little').astype(bool)
+
+    def get_day(self, date_obj: date) -> Optional[DaySchedule]:
+        """
+        Load the schedule of one day.
+
+        Args:
+            date_obj: Day to load
+
+        Returns:
+            DaySchedule or None if the day was never stored
+        """
+        _, stored_at = self._stored_at(date_obj, date_obj)
+        if not len(stored_at) or not stored_at[0]:
+            return None
+        records = self.records(date_obj, date_obj)
+        return DaySchedule(date_obj, [int.from_bytes(mask.tobytes(), 'little')
+                                      for mask in records[0]])
+
+    def iter_days(self, start: date, end: date) -> Iterator[DaySchedule]:
+        """
+        Iterate over the stored days of a date range.
+
+        Args:
+            start: First day, inclusive
+            end: Last day, inclusive
+
+        Yields:
+            DaySchedule for every stored day of the range
+        """
+        lower, stored_at = self._stored_at(start, end)
+        masks = self.masks(start, end)
+        for offset in np.flatnonzero(stored_at).tolist():
+            yield DaySchedule(self.start + timedelta(days=lower + offset), masks[offset].tolist())
+
+    def total_minutes_by_queue(self, start: date, end: date) -> Dict[int, int]:
+        """
+        Sum outage minutes per sub-queue over a date range.
+
+        Args:
+            start: First day, inclusive
+            end: Last day, inclusive
+
+        Returns:
+            Dictionary mapping every sub-queue id to its total outage
+            minutes, 0 when no day in the range is stored
+        """
+        totals = self.slots(start, end).sum(axis=(0, 2)) * MINUTES_PER_SLOT
+        return {queue_id: int(total) for queue_id, total in enumerate(totals)}
+
+    def daily_minutes(self, queue_id: int, start: date, end: date) -> List[Tuple[date, int]]:
+        """
+        Get outage minutes of one sub-queue for each stored day.
+
+        Args:
+            queue_id: Sub-queue id
+            start: First day, inclusive
+            end: Last day, inclusive
+
+        Returns:
+            List of (date, minutes) in date order
+        """
+        lower, stored_at = self._stored_at(start, end)
+        minutes = self.slots(start, end)[:, queue_id].sum(axis=1) * MINUTES_PER_SLOT
+        return [(self.start + timedelta(days=lower + offset), int(minutes[offset]))
+                for offset in np.flatnonzero(stored_at).tolist()]
+
+    def busiest_days(self, start: date, end: date, limit: int = 10,
+                     queue_id: Optional[int] = None) -> List[Tuple[date, int]]:
+        """
+        Find the stored days with the most outage minutes.
+
+        Args:
+            start: First day, inclusive
+            end: Last day, inclusive
+            limit: Maximum number of days to return
+            queue_id: Restrict to one sub-queue, or sum over all of them
+
+        Returns:
+            List of (date, minutes) ordered from the most minutes, earlier
+            days first on ties
+        """
+        lower, stored_at = self._stored_at(start, end)
+        slots = self.slots(start, end)
+        if queue_id is not None:
+            slots = slots[:, queue_id:queue_id + 1]
+        minutes = slots.sum(axis=(1, 2)) * MINUTES_PER_SLOT
+        offsets = np.flatnonzero(stored_at)
+        order = offsets[np.lexsort((offsets, -minutes[offsets]))][:limit]
+        return [(self.start + timedelta(days=lower + offset), int(minutes[offset]))
+                for offset in order.tolist()]
+
+    def revision(self) -> Tuple[int, int]:
+        """
+        Get a cheap change marker of the archive.
+
+        Returns:
+            Tuple that differs after any write through this object or
+            another process writing the same file
+        """
+        self._refresh()
+        return self._writes, self._file_stat[0]
+
+    def last_updated(self, start: date, end: date) -> Optional[datetime]:
+        """
+        Get the latest store time of the days in a date range.
+
+        Args:
+            start: First day, inclusive
+            end: Last day, inclusive
+
+        Returns:
+            Latest update time or None if no day in the range is stored
+        """
+        _, stored_at = self._stored_at(start, end)
+        latest = int(stored_at.max(initial=0))
+        return datetime.fromtimestamp(latest) if latest else None
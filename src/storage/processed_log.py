@@ -0,0 +1,138 @@
+"""
+Persistent log of processed schedule images.
+
+Remembers the content hash and file stat of every ingested image in an
+append-only text file, so a restarted watcher neither re-reads files it has
+already seen nor analyzes the same image content twice. Failed analyses are
+kept in a separate file next to it; they are reported but never count as
+processed, so the images are analyzed again.
+"""
+
+import os
+import threading
+from typing import Dict, Optional, Set, Tuple
+
+
+FileStat = Tuple[int, int]
+
+
+class ProcessedLog:
+    """Append-only record of processed image hashes and file stats."""
+
+    SEPARATOR = '\t'
+    FAILURES_SUFFIX = '.failed'
+
+    def __init__(self, path: str):
+        """
+        Open or create a log.
+
+        Args:
+            path: Log file path; one "hash, size, mtime_ns, path" line per
+                entry. Failures go to the same path with FAILURES_SUFFIX,
+                one "hash, size, mtime_ns, error, path" line per entry.
+        """
+        self.path = path
+        self.failures_path = path + self.FAILURES_SUFFIX
+        self._hashes: Set[str] = set()
+        self._stats: Dict[str, FileStat] = {}
+        # Path -> (hash, stat, error) of the last failed analysis
+        self._failures: Dict[str, Tuple[str, FileStat, str]] = {}
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        if os.path.exists(path):
+            self._load()
+        if os.path.exists(self.failures_path):
+            self._load_failures()
+        self._file = open(path, 'a', encoding='utf-8')
+        self._failures_file = open(self.failures_path, 'a', encoding='utf-8')
+
+    def _load(self) -> None:
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                fields = line.rstrip('\n').split(self.SEPARATOR, 3)
+                if len(fields) != 4 or not line.endswith('\n'):
+                    # Skip the truncated tail of an interrupted write
+                    continue
+                digest, size, mtime_ns, path = fields
+                self._hashes.add(digest)
+                self._stats[path] = (int(size), int(mtime_ns))
+
+    def _load_failures(self) -> None:
+        with open(self.failures_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                fields = line.rstrip('\n').split(self.SEPARATOR, 4)
+                if len(fields) != 5 or not line.endswith('\n'):
+                    continue
+                digest, size, mtime_ns, error, path = fields
+                if self._stats.get(path) == (int(size), int(mtime_ns)):
+                    # Analyzed successfully after this failure
+                    continue
+                self._failures[path] = (digest, (int(size), int(mtime_ns)), error)
+
+    def __enter__(self) -> 'ProcessedLog':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the log files."""
+        self._file.close()
+        self._failures_file.close()
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def seen(self, digest: str) -> bool:
+        """Check whether image content with this hash was processed."""
+        return digest in self._hashes
+
+    def known_stat(self, path: str) -> Optional[FileStat]:
+        """Get the (size, mtime_ns) a file had when it was processed."""
+        return self._stats.get(path)
+
+    def record(self, digest: str, path: str, stat: FileStat) -> None:
+        """
+        Remember a processed file.
+
+        Args:
+            digest: Content hash of the image
+            path: Image file path
+            stat: Tuple of (size, mtime_ns) of the processed file
+        """
+        with self._lock:
+            self._hashes.add(digest)
+            self._stats[path] = stat
+            self._failures.pop(path, None)
+            self._file.write(self.SEPARATOR.join(
+                (digest, str(stat[0]), str(stat[1]), path)) + '\n')
+            self._file.flush()
+
+    def record_failure(self, digest: str, path: str, stat: FileStat, error: str) -> None:
+        """
+        Remember a failed analysis without marking the file as processed.
+
+        Args:
+            digest: Content hash of the image
+            path: Image file path
+            stat: Tuple of (size, mtime_ns) of the file
+            error: Error message of the analysis
+        """
+        error = ' '.join(error.split())
+        with self._lock:
+            self._failures[path] = (digest, stat, error)
+            self._failures_file.write(self.SEPARATOR.join(
+                (digest, str(stat[0]), str(stat[1]), error, path)) + '\n')
+            self._failures_file.flush()
+
+    def failures(self) -> Dict[str, str]:
+        """
+        Get the files whose last analysis failed.
+
+        Returns:
+            Dictionary mapping file path to the error message
+        """
+        with self._lock:
+            return {path: error for path, (_, _, error) in self._failures.items()}
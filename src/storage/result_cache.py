@@ -0,0 +1,206 @@
+"""
+Content-addressed on-disk cache of analyzed schedule grids.
+
+Stores the full outage matrix of every analyzed image keyed by a hash of the
+image bytes, namespaced by the active ScheduleConfig fingerprint. Namespaces
+live in a dedicated subdirectory of the cache directory and carry a marker
+file; only marked namespaces are ever deleted. Unmarked namespaces left by
+earlier versions are deleted once when they hold nothing but cache files.
+"""
+
+import hashlib
+import os
+import re
+import shutil
+import sys
+import tempfile
+from typing import TYPE_CHECKING, Optional
+
+from schedule_config import ScheduleConfig
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+NAMESPACE_DIR = 'results'
+MARKER_FILE = '.schedule-cache'
+_NAMESPACE_NAME = re.compile(r'[0-9a-f]{16}')
+# Files an unmarked namespace of an earlier version may contain
+_LEGACY_FILE = re.compile(r'[0-9a-f]{40}\.grid|.*\.tmp|calibration\.json')
+
+
+def default_cache_dir() -> str:
+    """
+    Get the per-user cache directory of the application.
+
+    Returns:
+        Path inside LOCALAPPDATA on Windows or XDG_CACHE_HOME elsewhere
+    """
+    if sys.platform == "win32":
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.join(
+            os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'ScheduleAnalyzer')
+
+
+def hash_image_bytes(data: bytes) -> str:
+    """
+    Hash encoded image bytes for use as a cache key.
+
+    Args:
+        data: Raw image file contents
+
+    Returns:
+        Hex digest of the image content
+    """
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+
+def _is_legacy_namespace(path: str) -> bool:
+    """Whether an unmarked directory is a namespace written by an earlier version."""
+    try:
+        names = os.listdir(path)
+    except OSError:
+        return False
+    return (any(name.endswith(ResultCache.FILE_SUFFIX) for name in names)
+            and all(_LEGACY_FILE.fullmatch(name) for name in names))
+
+
+class ResultCache:
+    """Size-bounded LRU cache of outage matrices stored as small files."""
+
+    FILE_SUFFIX = '.grid'
+
+    def __init__(self, directory: str, max_entries: int = 4096,
+                 fingerprint: Optional[str] = None):
+        """
+        Open the cache, dropping entries made with a different configuration.
+
+        Matrices are stored in directory/results/<fingerprint>. Besides the
+        namespaces, only unmarked namespaces of earlier versions that hold
+        nothing but cache files are removed from the directory.
+
+        Args:
+            directory: Root cache directory, may be shared with other files
+            max_entries: Maximum number of stored matrices before eviction
+            fingerprint: Configuration fingerprint, defaults to
+                ScheduleConfig.fingerprint()
+        """
+        self.root = directory
+        self.max_entries = max(max_entries, 1)
+        self.fingerprint = fingerprint or ScheduleConfig.fingerprint()
+        self.namespaces = os.path.join(directory, NAMESPACE_DIR)
+        self.directory = os.path.join(self.namespaces, self.fingerprint)
+        self.shape = (len(ScheduleConfig.QUEUE_COORDINATES),
+                      ScheduleConfig.TOTAL_HALF_HOURS)
+
+        os.makedirs(self.directory, exist_ok=True)
+        marker = os.path.join(self.directory, MARKER_FILE)
+        if not os.path.exists(marker):
+            open(marker, 'wb').close()
+        self._remove_stale_namespaces()
+        self._entry_count = sum(1 for _ in self._iter_entries())
+
+    def _remove_stale_namespaces(self) -> None:
+        """Delete cache namespaces created for other configurations."""
+        for parent in (self.namespaces, self.root):
+            for name in os.listdir(parent):
+                path = os.path.join(parent, name)
+                if path == self.directory or not _NAMESPACE_NAME.fullmatch(name):
+                    continue
+                if (os.path.isfile(os.path.join(path, MARKER_FILE))
+                        and parent == self.namespaces) or _is_legacy_namespace(path):
+                    shutil.rmtree(path, ignore_errors=True)
+
+    def _iter_entries(self):
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.endswith(self.FILE_SUFFIX):
+                yield entry
+
+    def _entry_path(self, image_hash: str) -> str:
+        return os.path.join(self.directory, image_hash + self.FILE_SUFFIX)
+
+    def get(self, image_hash: str) -> Optional['np.ndarray']:
+        """
+        Read a cached matrix and mark it as recently used.
+
+        Args:
+            image_hash: Result of hash_image_bytes
+
+        Returns:
+            Outage matrix or None on a cache miss
+        """
+        path = self._entry_path(image_hash)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            return None
+
+        if len(data) != self.shape[0] * self.shape[1]:
+            return None
+        import numpy as np
+        return np.frombuffer(data, dtype=np.uint8).reshape(self.shape).copy()
+
+    def put(self, image_hash: str, matrix: 'np.ndarray') -> None:
+        """
+        Store a matrix, evicting least recently used entries if needed.
+
+        Args:
+            image_hash: Result of hash_image_bytes
+            matrix: Outage matrix from analyze_grid
+        """
+        import numpy as np
+
+        path = self._entry_path(image_hash)
+        is_new = not os.path.exists(path)
+
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(np.ascontiguousarray(matrix, dtype=np.uint8).tobytes())
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+
+        if is_new:
+            self._entry_count += 1
+            if self._entry_count > self.max_entries:
+                self._evict()
+
+    def _evict(self) -> None:
+        """Remove least recently used entries down to 90% of capacity."""
+        entries = []
+        for entry in self._iter_entries():
+            try:
+                entries.append((entry.stat().st_mtime, entry.path))
+            except OSError:
+                continue
+
+        entries.sort()
+        keep = int(self.max_entries * 0.9)
+        for _, path in entries[:max(len(entries) - keep, 0)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+        self._entry_count = min(len(entries), keep)
+
+    def clear(self) -> None:
+        """Remove all cached matrices for the current configuration."""
+        for entry in list(self._iter_entries()):
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+        self._entry_count = 0
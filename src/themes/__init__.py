@@ -4,7 +4,11 @@ Theme management module.
 Provides system theme detection and color scheme management.
 """
 
-from src.themes.theme_manager import ModernTheme
+from src.lazy_imports import lazy_exports
 
-__all__ = ["ModernTheme"]
+_EXPORTS = {
+    "ModernTheme": "src.themes.theme_manager",
+}
 
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
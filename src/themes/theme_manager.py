@@ -5,9 +5,12 @@ Provides automatic detection of system theme (dark/light) across different
 operating systems and returns appropriate color schemes for the UI.
 """
 
+import os
 import sys
 import subprocess
-from typing import Dict
+import threading
+from concurrent.futures import Future
+from typing import Dict, Optional
 
 
 class ModernTheme:
@@ -35,6 +38,61 @@ class ModernTheme:
 
         return False
 
+    @staticmethod
+    def detect_system_theme_async() -> "Future[bool]":
+        """
+        Detect the system theme on a background thread.
+
+        Detection may spawn a subprocess that takes up to a second, so the
+        window is shown with the cached theme while it runs.
+
+        Returns:
+            Future resolved with True if dark theme is detected
+        """
+        future: "Future[bool]" = Future()
+
+        def detect() -> None:
+            future.set_result(ModernTheme.detect_system_theme())
+
+        threading.Thread(target=detect, name="theme-detection", daemon=True).start()
+        return future
+
+    @staticmethod
+    def load_cached_theme(path: str) -> Optional[bool]:
+        """
+        Read the theme detected on the previous run.
+
+        Args:
+            path: Theme cache file
+
+        Returns:
+            True for dark, False for light, None if nothing is cached
+        """
+        try:
+            with open(path, encoding='utf-8') as f:
+                value = f.read().strip()
+        except OSError:
+            return None
+        if value in ('dark', 'light'):
+            return value == 'dark'
+        return None
+
+    @staticmethod
+    def save_cached_theme(path: str, dark_mode: bool) -> None:
+        """
+        Remember the detected theme for the next start.
+
+        Args:
+            path: Theme cache file
+            dark_mode: Whether dark theme was detected
+        """
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write('dark' if dark_mode else 'light')
+        except OSError:
+            pass
+
     @staticmethod
     def _detect_macos_theme() -> bool:
         """
@@ -4,7 +4,11 @@ User Interface module.
 Contains the main application window and UI components.
 """
 
-from src.ui.main_window import ScheduleAnalyzerUI
+from src.lazy_imports import lazy_exports
 
-__all__ = ["ScheduleAnalyzerUI"]
+_EXPORTS = {
+    "ScheduleAnalyzerUI": "src.ui.main_window",
+}
 
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
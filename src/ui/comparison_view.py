@@ -0,0 +1,384 @@
+"""
+Virtualized comparison window for sub-queue summaries of many days.
+
+Rows of a ComparisonTable are drawn on a canvas with a fixed pool of canvas
+items covering only the rows in view; scrolling re-labels the pool instead
+of creating widgets, so it costs the same for one day or several years.
+Days can be streamed in from a background iterator while the window is open.
+"""
+
+import queue
+import threading
+import tkinter as tk
+from tkinter import messagebox, ttk
+from typing import Callable, Dict, Iterable, List, Optional
+
+from src.core.schedule import QUEUE_NAMES, SLOTS_PER_DAY, DaySchedule
+
+
+class _RowItems:
+    """Canvas items of one pooled row and the bitmask they currently show."""
+
+    __slots__ = ('tag', 'background', 'texts', 'cells', 'mask')
+
+    def __init__(self, tag: str, background: int, texts: List[int], cells: List[int]):
+        self.tag = tag
+        self.background = background
+        self.texts = texts
+        self.cells = cells
+        self.mask: Optional[int] = None
+
+
+class ComparisonView:
+    """Toplevel window listing, sorting and filtering sub-queue summaries."""
+
+    ROW_HEIGHT = 26
+    HEADER_HEIGHT = 30
+    CELL_WIDTH = 6
+    STRIP_X = 420
+    TABLE_WIDTH = STRIP_X + SLOTS_PER_DAY * CELL_WIDTH + 10
+    WHEEL_ROWS = 3
+
+    POLL_INTERVAL_MS = 50
+    CHUNK_DAYS = 31
+
+    ALL_QUEUES = "Всі черги"
+    # (sort key, title, x)
+    COLUMNS = (
+        ('day', "Дата", 10),
+        ('queue', "Черга", 110),
+        ('count', "Відключень", 210),
+        ('minutes', "Загальний час", 310),
+    )
+
+    def __init__(self, parent: tk.Misc, colors: Dict[str, str], title: str, subtitle: str):
+        """
+        Open the window with an empty table.
+
+        Args:
+            parent: Owner widget
+            colors: Theme colors of the main window
+            title: Window heading
+            subtitle: Line under the heading, e.g. the date or the source
+        """
+        self.colors = colors
+        self.title = title
+        self.subtitle = subtitle
+        # numpy is loaded with the first comparison window, not at start-up
+        from src.core.comparison import ComparisonTable
+        self.table = ComparisonTable()
+        self._top = 0
+        self._pool: List[_RowItems] = []
+        self._loading = False
+        self._chunks: "queue.Queue[object]" = queue.Queue()
+        self._closed = threading.Event()
+
+        self.window = tk.Toplevel(parent)
+        self.window.title(title)
+        self.window.geometry(f"{self.TABLE_WIDTH + 90}x620")
+        self.window.configure(bg=colors['bg'])
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        self.status_var = tk.StringVar()
+
+        self._create_header()
+        self._create_filters()
+        self._create_table()
+        self._create_buttons()
+        self._draw_column_titles()
+        self._update_status()
+
+    def _create_header(self) -> None:
+        header_frame = ttk.Frame(self.window, style='Modern.TFrame')
+        header_frame.pack(fill=tk.X, padx=30, pady=(25, 10))
+
+        ttk.Label(header_frame, text=self.title,
+                 font=('Segoe UI', 18, 'bold'),
+                 foreground=self.colors['fg'],
+                 background=self.colors['bg']).pack(anchor='w')
+
+        ttk.Label(header_frame, text=self.subtitle,
+                 font=('Segoe UI', 12),
+                 foreground=self.colors['text_secondary'],
+                 background=self.colors['bg']).pack(anchor='w', pady=(5, 0))
+
+    def _create_filters(self) -> None:
+        filter_frame = ttk.Frame(self.window, style='Modern.TFrame')
+        filter_frame.pack(fill=tk.X, padx=30, pady=(0, 10))
+
+        ttk.Label(filter_frame, text="Черга:", style='Modern.TLabel').pack(side=tk.LEFT)
+        self.queue_var = tk.StringVar(value=self.ALL_QUEUES)
+        queue_combo = ttk.Combobox(filter_frame, textvariable=self.queue_var,
+                                   values=[self.ALL_QUEUES, *QUEUE_NAMES],
+                                   state='readonly', width=14, style='Modern.TCombobox')
+        queue_combo.pack(side=tk.LEFT, padx=(8, 20))
+        queue_combo.bind('<<ComboboxSelected>>', lambda event: self._apply_filter())
+
+        ttk.Label(filter_frame, text="Не менше, хв:", style='Modern.TLabel').pack(side=tk.LEFT)
+        self.min_minutes_var = tk.StringVar(value="0")
+        minutes_box = ttk.Spinbox(filter_frame, textvariable=self.min_minutes_var,
+                                  from_=0, to=24 * 60, increment=30, width=6,
+                                  command=self._apply_filter)
+        minutes_box.pack(side=tk.LEFT, padx=(8, 0))
+        minutes_box.bind('<Return>', lambda event: self._apply_filter())
+        minutes_box.bind('<FocusOut>', lambda event: self._apply_filter())
+
+    def _create_table(self) -> None:
+        table_frame = tk.Frame(self.window, bg=self.colors['secondary_bg'],
+                              highlightbackground=self.colors['border'],
+                              highlightthickness=1)
+        table_frame.pack(fill=tk.BOTH, expand=True, padx=30, pady=(0, 10))
+        table_frame.columnconfigure(0, weight=1)
+        table_frame.rowconfigure(1, weight=1)
+
+        self.header_canvas = tk.Canvas(table_frame, height=self.HEADER_HEIGHT,
+                                       bg=self.colors['secondary_bg'], highlightthickness=0)
+        self.header_canvas.grid(row=0, column=0, sticky='ew')
+
+        self.canvas = tk.Canvas(table_frame, bg=self.colors['secondary_bg'],
+                                highlightthickness=0)
+        self.canvas.grid(row=1, column=0, sticky='nsew')
+
+        self.scrollbar = ttk.Scrollbar(table_frame, orient='vertical',
+                                       command=self._on_scrollbar)
+        self.scrollbar.grid(row=0, column=1, rowspan=2, sticky='ns')
+
+        self.canvas.bind('<Configure>', lambda event: self._redraw())
+        for widget in (self.canvas, self.header_canvas):
+            widget.bind('<MouseWheel>', self._on_mousewheel)
+            widget.bind('<Button-4>', self._on_mousewheel)
+            widget.bind('<Button-5>', self._on_mousewheel)
+
+    def _create_buttons(self) -> None:
+        button_frame = ttk.Frame(self.window, style='Modern.TFrame')
+        button_frame.pack(fill=tk.X, padx=30, pady=(0, 25))
+
+        ttk.Label(button_frame, textvariable=self.status_var,
+                 style='Subtitle.TLabel').pack(side=tk.LEFT)
+
+        ttk.Button(button_frame, text="Закрити",
+                  command=self.close, style='Secondary.TButton').pack(side=tk.RIGHT)
+
+        ttk.Button(button_frame, text="Копіювати",
+                  command=self.copy_rows, style='Secondary.TButton').pack(
+                      side=tk.RIGHT, padx=(0, 10))
+
+    def _draw_column_titles(self) -> None:
+        canvas = self.header_canvas
+        canvas.delete('all')
+        sort_key, descending = self.table.sort_key
+        middle = self.HEADER_HEIGHT // 2
+
+        for key, title, x in self.COLUMNS:
+            if key == sort_key:
+                title += " ▼" if descending else " ▲"
+            tag = f"sort_{key}"
+            canvas.create_text(x, middle, text=title, anchor='w', tags=tag,
+                               font=('Segoe UI', 10, 'bold'), fill=self.colors['fg'])
+            canvas.tag_bind(tag, '<Button-1>', lambda event, key=key: self._toggle_sort(key))
+
+        for hour in range(0, 25, 6):
+            x = self.STRIP_X + hour * 2 * self.CELL_WIDTH
+            canvas.create_text(x, middle, text=f"{hour:02d}", font=('Segoe UI', 8),
+                               fill=self.colors['text_secondary'])
+
+    def _row_capacity(self) -> int:
+        """Number of rows that fit the canvas, counting a partly visible one."""
+        return max(self.canvas.winfo_height() // self.ROW_HEIGHT, 0) + 1
+
+    def _page_rows(self) -> int:
+        return max(self.canvas.winfo_height() // self.ROW_HEIGHT, 1)
+
+    def _ensure_pool(self, size: int) -> None:
+        canvas = self.canvas
+        middle = self.ROW_HEIGHT // 2
+        while len(self._pool) < size:
+            slot = len(self._pool)
+            tag = f"row_{slot}"
+            top = slot * self.ROW_HEIGHT
+            background = canvas.create_rectangle(
+                0, top, self.TABLE_WIDTH, top + self.ROW_HEIGHT - 2,
+                width=0, tags=tag)
+            texts = [
+                canvas.create_text(x, top + middle, anchor='w', tags=tag,
+                                   font=('Segoe UI', 10), fill=self.colors['input_fg'])
+                for _, _, x in self.COLUMNS
+            ]
+            canvas.itemconfigure(texts[2], fill=self.colors['accent'])
+            cells = [
+                canvas.create_rectangle(
+                    self.STRIP_X + index * self.CELL_WIDTH, top + 6,
+                    self.STRIP_X + (index + 1) * self.CELL_WIDTH - 1,
+                    top + self.ROW_HEIGHT - 8,
+                    width=0, tags=tag)
+                for index in range(SLOTS_PER_DAY)
+            ]
+            self._pool.append(_RowItems(tag, background, texts, cells))
+
+    def _redraw(self) -> None:
+        """Show the rows starting at the current top row in the item pool."""
+        canvas = self.canvas
+        total = len(self.table)
+        self._top = max(min(self._top, total - self._page_rows()), 0)
+        self._ensure_pool(self._row_capacity())
+
+        stop = min(self._top + len(self._pool), total)
+        slots = self.table.slots(self._top, stop)
+        outage, free = self.colors['error'], self.colors['border']
+
+        for offset, items in enumerate(self._pool):
+            index = self._top + offset
+            if index >= stop:
+                canvas.itemconfigure(items.tag, state='hidden')
+                items.mask = None
+                continue
+
+            day, queue_id, count, minutes, mask = self.table.row(index)
+            canvas.itemconfigure(items.tag, state='normal')
+            canvas.itemconfigure(items.background, fill=self.colors[
+                'input_bg' if index % 2 else 'secondary_bg'])
+            labels = (day.strftime('%d.%m.%Y'), QUEUE_NAMES[queue_id], str(count),
+                      f"{minutes // 60}г {minutes % 60}хв")
+            for item, label in zip(items.texts, labels):
+                canvas.itemconfigure(item, text=label)
+
+            if items.mask != mask:
+                for item, is_outage in zip(items.cells, slots[offset]):
+                    canvas.itemconfigure(item, fill=outage if is_outage else free)
+                items.mask = mask
+
+        if total:
+            self.scrollbar.set(self._top / total,
+                               min((self._top + self._page_rows()) / total, 1.0))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def _scroll_to(self, top: int) -> None:
+        if top != self._top:
+            self._top = top
+            self._redraw()
+
+    def _on_scrollbar(self, action: str, amount: str, unit: Optional[str] = None) -> None:
+        if action == 'moveto':
+            self._scroll_to(int(float(amount) * len(self.table)))
+        elif action == 'scroll':
+            step = self._page_rows() if unit == 'pages' else 1
+            self._scroll_to(self._top + int(amount) * step)
+
+    def _on_mousewheel(self, event: tk.Event) -> None:
+        up = event.num == 4 or getattr(event, 'delta', 0) > 0
+        self._scroll_to(self._top + (-self.WHEEL_ROWS if up else self.WHEEL_ROWS))
+
+    def _toggle_sort(self, key: str) -> None:
+        """Sort by a column; counts and minutes start with the largest."""
+        current, descending = self.table.sort_key
+        if key == current:
+            descending = not descending
+        else:
+            descending = key in ('count', 'minutes')
+        self.table.sort(key, descending)
+        self._top = 0
+        self._draw_column_titles()
+        self._redraw()
+
+    def _apply_filter(self) -> None:
+        name = self.queue_var.get()
+        queue_ids = None if name == self.ALL_QUEUES else [QUEUE_NAMES.index(name)]
+        try:
+            min_minutes = max(int(self.min_minutes_var.get()), 0)
+        except ValueError:
+            min_minutes = 0
+        self.table.set_filter(queue_ids, min_minutes)
+        self._top = 0
+        self._redraw()
+        self._update_status()
+
+    def _update_status(self) -> None:
+        status = f"Рядків: {len(self.table)} з {self.table.total}"
+        if self._loading:
+            status += ", завантаження..."
+        self.status_var.set(status)
+
+    def add_days(self, schedules: Iterable[DaySchedule]) -> None:
+        """
+        Append day schedules to the table and refresh the visible rows.
+
+        Args:
+            schedules: Day schedules to show
+        """
+        self.table.add_days(schedules)
+        self._redraw()
+        self._update_status()
+
+    def stream(self, load: Callable[[], Iterable[DaySchedule]]) -> None:
+        """
+        Load day schedules on a background thread and show them as they come.
+
+        Args:
+            load: Function returning the day schedules; it is called and
+                iterated on the background thread
+        """
+        self._loading = True
+        self._update_status()
+        threading.Thread(target=self._read_days, args=(load,),
+                         name='comparison-loader', daemon=True).start()
+        self.window.after(self.POLL_INTERVAL_MS, self._poll_days)
+
+    def _read_days(self, load: Callable[[], Iterable[DaySchedule]]) -> None:
+        """Read schedules in chunks; runs on the loader thread."""
+        chunk: List[DaySchedule] = []
+        error: Optional[Exception] = None
+        try:
+            for schedule in load():
+                if self._closed.is_set():
+                    return
+                chunk.append(schedule)
+                if len(chunk) >= self.CHUNK_DAYS:
+                    self._chunks.put(chunk)
+                    chunk = []
+        except Exception as e:
+            error = e
+        if chunk:
+            self._chunks.put(chunk)
+        self._chunks.put(error)
+
+    def _poll_days(self) -> None:
+        if self._closed.is_set():
+            return
+
+        schedules: List[DaySchedule] = []
+        finished, error = False, None
+        while True:
+            try:
+                item = self._chunks.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, list):
+                schedules.extend(item)
+            else:
+                finished, error = True, item
+
+        if finished:
+            self._loading = False
+        if schedules or finished:
+            self.add_days(schedules)
+        if error is not None:
+            messagebox.showerror("Помилка", f"Помилка завантаження:\n{error}",
+                                 parent=self.window)
+        if not finished:
+            self.window.after(self.POLL_INTERVAL_MS, self._poll_days)
+
+    def copy_rows(self) -> None:
+        """Copy the filtered rows in their current order to the clipboard."""
+        lines = [f"{self.title} - {self.subtitle}", ""]
+        for index in range(len(self.table)):
+            day, queue_id, count, minutes, _ = self.table.row(index)
+            lines.append(f"{day.strftime('%d.%m.%Y')} {QUEUE_NAMES[queue_id]:<15} "
+                         f"{count:<10} {minutes // 60}г {minutes % 60}хв")
+        self.window.clipboard_clear()
+        self.window.clipboard_append("\n".join(lines) + "\n")
+        messagebox.showinfo("Успіх", "Таблицю скопійовано!", parent=self.window)
+
+    def close(self) -> None:
+        """Stop loading and close the window."""
+        self._closed.set()
+        self.window.destroy()
@@ -6,19 +6,21 @@ Redesigned with improved user experience and modern interface.
 
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
-from PIL import Image
-import json
 from datetime import datetime
 import os
 import sys
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Iterator, List, Optional
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from analyze_schedule import analyze_row, time_to_string, resize_image
+# The analysis pipeline (PIL), the calendar export (icalendar, pytz), the
+# result cache and the comparison view (numpy) are imported on first use so
+# the window appears without loading them.
+from src.core.schedule import QUEUE_NAMES, DaySchedule, queue_id
+from src.storage.result_cache import default_cache_dir
 from src.themes.theme_manager import ModernTheme
-from src.utils.calendar_export import CalendarExporter
-from src.utils.time_calculator import calculate_total_time, queue_sort_key
+from src.ui.task_runner import BackgroundTaskRunner, TaskCancelled, TaskContext
+from src.utils.result_builder import QueueResult
 
 
 class ModernStyleConfigurator:
@@ -36,6 +38,7 @@ class ModernStyleConfigurator:
         self._configure_labels()
         self._configure_inputs()
         self._configure_buttons()
+        self._configure_progress()
 
     def _configure_frames(self) -> None:
         self.style.configure('Modern.TFrame', background=self.colors['bg'])
@@ -145,6 +148,13 @@ class ModernStyleConfigurator:
         self.style.map('Icon.TButton',
                      background=[('active', self.colors['input_bg'])])
 
+    def _configure_progress(self) -> None:
+        self.style.configure('Modern.Horizontal.TProgressbar',
+                           background=self.colors['accent'],
+                           troughcolor=self.colors['input_bg'],
+                           borderwidth=0,
+                           thickness=6)
+
 
 class ScheduleAnalyzerUI:
     """Main application window with modern, user-friendly interface."""
@@ -153,33 +163,64 @@ class ScheduleAnalyzerUI:
     WINDOW_SIZE = "1000x700"
     MIN_WINDOW_SIZE = (900, 600)
 
-    AVAILABLE_QUEUES = {
-        "Черга 1-1": 90, "Черга 1-2": 109,
-        "Черга 2-1": 127, "Черга 2-2": 146,
-        "Черга 3-1": 170, "Черга 3-2": 190,
-        "Черга 4-1": 214, "Черга 4-2": 233,
-        "Черга 5-1": 255, "Черга 5-2": 275,
-        "Черга 6-1": 298, "Черга 6-2": 315,
+    ANALYSIS_STAGES = {
+        'read': (0.15, "Читаю файл..."),
+        'decode': (0.4, "Декодую зображення..."),
+        'classify': (0.8, "Розпізнаю кольори..."),
     }
 
+    THEME_POLL_MS = 50
+
     def __init__(self, root: tk.Tk):
         self.root = root
         self.root.title(self.WINDOW_TITLE)
         self.root.geometry(self.WINDOW_SIZE)
         self.root.minsize(*self.MIN_WINDOW_SIZE)
 
-        self.dark_mode = ModernTheme.detect_system_theme()
+        # Start with the theme of the previous run; the system theme is
+        # detected in the background and applied when it differs.
+        self.theme_path = os.path.join(default_cache_dir(), 'theme')
+        self.dark_mode = bool(ModernTheme.load_cached_theme(self.theme_path))
         self.colors = ModernTheme.get_theme_colors(self.dark_mode)
+        self._cards: List[tk.Frame] = []
 
         self.setup_styles()
         self.center_window()
         self.initialize_variables()
         self.create_modern_ui()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        self._theme_detection = ModernTheme.detect_system_theme_async()
+        self.root.after(self.THEME_POLL_MS, self._poll_theme_detection)
 
     def setup_styles(self) -> None:
         configurator = ModernStyleConfigurator(self.colors)
         configurator.configure_all_styles(self.root)
 
+    def _poll_theme_detection(self) -> None:
+        """Apply the detected system theme once background detection ends."""
+        if not self._theme_detection.done():
+            self.root.after(self.THEME_POLL_MS, self._poll_theme_detection)
+            return
+
+        dark_mode = self._theme_detection.result()
+        ModernTheme.save_cached_theme(self.theme_path, dark_mode)
+        if dark_mode != self.dark_mode:
+            self._apply_theme(dark_mode)
+
+    def _apply_theme(self, dark_mode: bool) -> None:
+        """Recolor the already built window for another theme."""
+        self.dark_mode = dark_mode
+        self.colors = ModernTheme.get_theme_colors(dark_mode)
+        self.setup_styles()
+
+        for card in self._cards:
+            card.configure(bg=self.colors['secondary_bg'],
+                           highlightbackground=self.colors['border'])
+        self.result_text.configure(bg=self.colors['input_bg'],
+                                   fg=self.colors['input_fg'],
+                                   insertbackground=self.colors['fg'])
+
     def center_window(self) -> None:
         self.root.update_idletasks()
         width = self.root.winfo_width()
@@ -194,6 +235,36 @@ class ScheduleAnalyzerUI:
         self.selected_queue = tk.StringVar(value="Черга 1-1")
         self.status_var = tk.StringVar(value="Готовий до роботи")
         self.file_name_var = tk.StringVar(value="Файл не вибрано")
+        self.progress_var = tk.DoubleVar(value=0.0)
+        self._session = None
+        self.result: Optional[QueueResult] = None
+        self.task_runner = BackgroundTaskRunner(self.root, self._on_task_progress,
+                                                self._on_busy_changed)
+
+    @staticmethod
+    def _open_result_cache() -> Optional["ResultCache"]:
+        """Open the on-disk result cache, or run without it if unavailable."""
+        from src.storage.result_cache import ResultCache
+        try:
+            return ResultCache(default_cache_dir())
+        except OSError:
+            return None
+
+    @property
+    def session(self) -> "AnalysisSession":
+        """Analysis session, created with the result cache on first analysis."""
+        if self._session is None:
+            from src.pipeline.session import AnalysisSession
+            self._session = AnalysisSession(self._open_result_cache())
+        return self._session
+
+    def _create_card(self, parent: tk.Misc) -> tk.Frame:
+        """Create a bordered card frame that follows theme changes."""
+        card = tk.Frame(parent, bg=self.colors['secondary_bg'],
+                       highlightbackground=self.colors['border'],
+                       highlightthickness=1)
+        self._cards.append(card)
+        return card
 
     def create_modern_ui(self) -> None:
         """Create modern, simplified UI with better visual hierarchy."""
@@ -246,9 +317,7 @@ class ScheduleAnalyzerUI:
 
     def _create_input_card(self, parent: ttk.Frame) -> None:
         """Create modern input card with file, date, and queue selection."""
-        card = tk.Frame(parent, bg=self.colors['secondary_bg'],
-                       highlightbackground=self.colors['border'],
-                       highlightthickness=1)
+        card = self._create_card(parent)
         card.grid(row=0, column=0, sticky='ew', pady=(0, 15))
         card.columnconfigure(0, weight=1)
 
@@ -305,16 +374,14 @@ class ScheduleAnalyzerUI:
                  font=('Segoe UI', 10, 'bold')).grid(row=0, column=0, sticky='w')
 
         queue_combo = ttk.Combobox(queue_frame, textvariable=self.selected_queue,
-                                   values=list(self.AVAILABLE_QUEUES.keys()),
+                                   values=list(QUEUE_NAMES),
                                    state='readonly', font=('Segoe UI', 11),
                                    style='Modern.TCombobox', width=18)
         queue_combo.grid(row=0, column=1, sticky='ew', padx=(10, 0), ipady=6)
 
     def _create_action_card(self, parent: ttk.Frame) -> None:
         """Create action buttons card."""
-        card = tk.Frame(parent, bg=self.colors['secondary_bg'],
-                       highlightbackground=self.colors['border'],
-                       highlightthickness=1)
+        card = self._create_card(parent)
         card.grid(row=1, column=0, sticky='ew', pady=(0, 0))
         card.columnconfigure(0, weight=1)
 
@@ -329,7 +396,12 @@ class ScheduleAnalyzerUI:
         compare_btn = ttk.Button(card, text="Порівняти всі черги",
                                 command=self.compare_all_queues,
                                 style='Secondary.TButton')
-        compare_btn.grid(row=2, column=0, sticky='ew', padx=20, pady=(0, 20))
+        compare_btn.grid(row=2, column=0, sticky='ew', padx=20, pady=(0, 10))
+
+        archive_btn = ttk.Button(card, text="Порівняти дні з архіву",
+                                command=self.compare_archive_days,
+                                style='Secondary.TButton')
+        archive_btn.grid(row=3, column=0, sticky='ew', padx=20, pady=(0, 20))
 
     def _create_right_panel(self, parent: ttk.Frame) -> None:
         """Create right panel with results."""
@@ -338,9 +410,7 @@ class ScheduleAnalyzerUI:
         right_panel.columnconfigure(0, weight=1)
         right_panel.rowconfigure(0, weight=1)
 
-        card = tk.Frame(right_panel, bg=self.colors['secondary_bg'],
-                       highlightbackground=self.colors['border'],
-                       highlightthickness=1)
+        card = self._create_card(right_panel)
         card.grid(row=0, column=0, sticky='nsew')
         card.columnconfigure(0, weight=1)
         card.rowconfigure(1, weight=1)
@@ -397,6 +467,12 @@ class ScheduleAnalyzerUI:
         version_label = ttk.Label(status_frame, text="v2.0.0", style='Info.TLabel')
         version_label.pack(side=tk.RIGHT)
 
+        self.progress_bar = ttk.Progressbar(status_frame, variable=self.progress_var,
+                                            maximum=1.0, length=160, mode='determinate',
+                                            style='Modern.Horizontal.TProgressbar')
+        self.cancel_button = ttk.Button(status_frame, text="Скасувати",
+                                        command=self.cancel_task, style='Icon.TButton')
+
     def select_file_modern(self) -> None:
         """Modern file selection with improved feedback."""
         filename = filedialog.askopenfilename(
@@ -446,58 +522,31 @@ class ScheduleAnalyzerUI:
             messagebox.showerror("Помилка", "Будь ласка, виберіть чергу для аналізу!")
             return
 
+        queue_name = self.selected_queue.get()
         self.status_var.set("Аналізую графік...")
-        self.root.update_idletasks()
 
-        try:
-            img = Image.open(self.image_path.get())
-            img = resize_image(img)
+        self._request_schedule(
+            date_obj,
+            lambda schedule: self._show_analysis_result(schedule, queue_name),
+            "Помилка під час аналізу"
+        )
 
-            queue_name = self.selected_queue.get()
-            y_coord = self.AVAILABLE_QUEUES[queue_name]
-            outages = analyze_row(img, y_coord)
+    def _show_analysis_result(self, schedule: DaySchedule, queue_name: str) -> None:
+        """Display single-queue analysis results."""
+        self.result = QueueResult.from_schedule(schedule, queue_id(queue_name))
+        hours, minutes = divmod(self.result.total_minutes, 60)
 
-            outage_list = [
-                {"start": time_to_string(start), "end": time_to_string(end)}
-                for start, end in outages
-            ]
+        self.result_text.delete('1.0', tk.END)
+        self.result_text.insert('1.0', self.result.to_json())
 
-            hours, minutes, total_minutes = calculate_total_time(outage_list)
-
-            output = {
-                "date": date_obj.strftime('%d.%m.%Y'),
-                "queue": queue_name,
-                "outages": outage_list,
-                "total_outage_time": {
-                    "hours": hours,
-                    "minutes": minutes,
-                    "total_minutes": total_minutes,
-                    "formatted": f"{hours} год {minutes} хв"
-                },
-                "analysis_info": {
-                    "outage_count": len(outage_list),
-                    "analyzed_at": datetime.now().strftime('%d.%m.%Y %H:%M:%S')
-                }
-            }
-
-            json_output = json.dumps(output, ensure_ascii=False, indent=2)
-            self.result_text.delete('1.0', tk.END)
-            self.result_text.insert('1.0', json_output)
-
-            self.status_var.set(f"Аналіз завершено: {len(outage_list)} відключень, {hours}г {minutes}хв")
-
-            messagebox.showinfo("Успіх",
-                f"Аналіз завершено успішно!\n\n"
-                f"Відключень знайдено: {len(outage_list)}\n"
-                f"Загальний час: {hours} год {minutes} хв\n"
-                f"Дата: {date_obj.strftime('%d.%m.%Y')}")
-
-        except FileNotFoundError:
-            messagebox.showerror("Помилка", "Файл не знайдено!")
-            self.status_var.set("Помилка: файл не знайдено")
-        except Exception as e:
-            messagebox.showerror("Помилка", f"Помилка під час аналізу:\n{str(e)}")
-            self.status_var.set(f"Помилка: {str(e)[:50]}")
+        self.status_var.set(f"Аналіз завершено: {self.result.outage_count} відключень, "
+                            f"{hours}г {minutes}хв")
+
+        messagebox.showinfo("Успіх",
+            f"Аналіз завершено успішно!\n\n"
+            f"Відключень знайдено: {self.result.outage_count}\n"
+            f"Загальний час: {hours} год {minutes} хв\n"
+            f"Дата: {self.result.date.strftime('%d.%m.%Y')}")
 
     def compare_all_queues(self) -> None:
         """Compare all queues with modern visualization."""
@@ -506,170 +555,120 @@ class ScheduleAnalyzerUI:
             return
 
         self.status_var.set("Порівнюю всі черги...")
-        self.root.update_idletasks()
-
-        try:
-            img = Image.open(self.image_path.get())
-            img = resize_image(img)
-
-            comparison_results = self._analyze_all_queues(img)
-            comparison_results.sort(key=queue_sort_key)
-
-            self._show_modern_comparison_window(comparison_results, date_obj.strftime('%d.%m.%Y'))
-            self.status_var.set(f"Порівняння завершено для {len(comparison_results)} черг")
-
-        except FileNotFoundError:
-            messagebox.showerror("Помилка", "Файл не знайдено!")
-            self.status_var.set("Помилка: файл не знайдено")
-        except Exception as e:
-            messagebox.showerror("Помилка", f"Помилка під час порівняння:\n{str(e)}")
-            self.status_var.set(f"Помилка: {str(e)[:50]}")
-
-    def _analyze_all_queues(self, img: Image.Image) -> List[Dict]:
-        """Analyze all queues in the image."""
-        comparison_results = []
 
-        for queue_name, y_coord in self.AVAILABLE_QUEUES.items():
-            outages = analyze_row(img, y_coord)
+        self._request_schedule(
+            date_obj,
+            self._show_comparison_result,
+            "Помилка під час порівняння"
+        )
 
-            outage_list = [
-                {"start": time_to_string(start), "end": time_to_string(end)}
-                for start, end in outages
+    def _show_comparison_result(self, schedule: DaySchedule) -> None:
+        """Display comparison of all queues."""
+        from src.ui.comparison_view import ComparisonView
+        view = ComparisonView(self.root, self.colors, "Порівняння черг",
+                              f"Дата: {schedule.date.strftime('%d.%m.%Y')}")
+        view.add_days([schedule])
+        self.status_var.set(f"Порівняння завершено для {len(QUEUE_NAMES)} черг")
+
+    def compare_archive_days(self) -> None:
+        """Compare all queues over every day of a schedule archive."""
+        path = filedialog.askopenfilename(
+            title="Виберіть архів графіків",
+            filetypes=[
+                ("Архів графіків", "*.sqlite *.sqlite3 *.db *.bin"),
+                ("Всі файли", "*.*")
             ]
-
-            hours, minutes, total_minutes = calculate_total_time(outage_list)
-
-            comparison_results.append({
-                "queue": queue_name,
-                "count": len(outage_list),
-                "hours": hours,
-                "minutes": minutes,
-                "total_minutes": total_minutes
-            })
-
-        return comparison_results
-
-    def _show_modern_comparison_window(self, results: List[Dict], date: str) -> None:
-        """Display comparison results in modern window."""
-        comparison_window = tk.Toplevel(self.root)
-        comparison_window.title("Порівняння черг")
-        comparison_window.geometry("700x600")
-        comparison_window.configure(bg=self.colors['bg'])
-
-        header_frame = ttk.Frame(comparison_window, style='Modern.TFrame')
-        header_frame.pack(fill=tk.X, padx=30, pady=(25, 15))
-
-        ttk.Label(header_frame,
-                 text=f"Порівняння черг",
-                 font=('Segoe UI', 18, 'bold'),
-                 foreground=self.colors['fg'],
-                 background=self.colors['bg']).pack(anchor='w')
-
-        ttk.Label(header_frame,
-                 text=f"Дата: {date}",
-                 font=('Segoe UI', 12),
-                 foreground=self.colors['text_secondary'],
-                 background=self.colors['bg']).pack(anchor='w', pady=(5, 0))
-
-        table_frame = tk.Frame(comparison_window, bg=self.colors['secondary_bg'],
-                              highlightbackground=self.colors['border'],
-                              highlightthickness=1)
-        table_frame.pack(fill=tk.BOTH, expand=True, padx=30, pady=(0, 15))
-
-        canvas = tk.Canvas(table_frame, bg=self.colors['secondary_bg'],
-                          highlightthickness=0)
-        scrollbar = ttk.Scrollbar(table_frame, orient="vertical", command=canvas.yview)
-        scrollable_frame = ttk.Frame(canvas, style='Card.TFrame')
-
-        scrollable_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
         )
+        if not path:
+            return
 
-        canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
+        from src.ui.comparison_view import ComparisonView
+        view = ComparisonView(self.root, self.colors, "Порівняння днів",
+                              f"Архів: {os.path.basename(path)}")
+        view.stream(lambda: self._archive_days(path))
+        self.status_var.set(f"Завантажую архів: {os.path.basename(path)}")
+
+    @staticmethod
+    def _archive_days(path: str) -> Iterator[DaySchedule]:
+        """Iterate over all days of an archive; runs on the loader thread."""
+        from src.storage.archive import open_archive
+        with open_archive(path) as archive:
+            days = archive.date_range()
+            if days is not None:
+                yield from archive.iter_days(*days)
+
+    def _request_schedule(self, date_obj: datetime,
+                          on_ready: Callable[[DaySchedule], None],
+                          error_message: str) -> None:
+        """
+        Deliver the schedule of the selected file to a callback.
+
+        Answers from the session state when the file is unchanged; otherwise
+        analyzes it on the background worker.
+        """
+        path = self.image_path.get()
+
+        schedule = self.session.get(path, date_obj)
+        if schedule is not None:
+            self.task_runner.cancel()
+            on_ready(schedule)
+            return
 
-        header_labels = [
-            ("Черга", 150),
-            ("Кількість", 100),
-            ("Загальний час", 150),
-            ("Хвилин", 100)
-        ]
+        self.task_runner.submit(
+            ('analysis', path),
+            lambda context: self._run_analysis(context, path, date_obj),
+            lambda schedule: on_ready(DaySchedule(date_obj, schedule.masks)),
+            lambda error: self._handle_task_error(error, error_message)
+        )
 
-        header_row = ttk.Frame(scrollable_frame, style='Card.TFrame')
-        header_row.pack(fill=tk.X, padx=15, pady=(15, 5))
+    def _run_analysis(self, context: TaskContext, path: str,
+                      date_obj: datetime) -> DaySchedule:
+        """Analyze the image file; runs on the background worker."""
+        def on_stage(stage: str) -> None:
+            context.report(*self.ANALYSIS_STAGES[stage])
 
-        for i, (text, width) in enumerate(header_labels):
-            label = tk.Label(header_row, text=text,
-                           font=('Segoe UI', 10, 'bold'),
-                           bg=self.colors['secondary_bg'],
-                           fg=self.colors['fg'],
-                           width=width//7, anchor='w')
-            label.pack(side=tk.LEFT, padx=5)
-
-        for result in results:
-            row_frame = tk.Frame(scrollable_frame, bg=self.colors['input_bg'],
-                               highlightbackground=self.colors['border'],
-                               highlightthickness=1)
-            row_frame.pack(fill=tk.X, padx=15, pady=2)
-
-            queue_label = tk.Label(row_frame, text=result['queue'],
-                                  font=('Segoe UI', 10),
-                                  bg=self.colors['input_bg'],
-                                  fg=self.colors['input_fg'],
-                                  width=20, anchor='w')
-            queue_label.pack(side=tk.LEFT, padx=5, pady=8)
-
-            count_label = tk.Label(row_frame, text=str(result['count']),
-                                  font=('Segoe UI', 10),
-                                  bg=self.colors['input_bg'],
-                                  fg=self.colors['accent'],
-                                  width=13, anchor='w')
-            count_label.pack(side=tk.LEFT, padx=5)
-
-            time_str = f"{result['hours']}г {result['minutes']}хв"
-            time_label = tk.Label(row_frame, text=time_str,
-                                 font=('Segoe UI', 10),
-                                 bg=self.colors['input_bg'],
-                                 fg=self.colors['input_fg'],
-                                 width=20, anchor='w')
-            time_label.pack(side=tk.LEFT, padx=5)
-
-            minutes_label = tk.Label(row_frame, text=f"{result['total_minutes']} хв",
-                                   font=('Segoe UI', 9),
-                                   bg=self.colors['input_bg'],
-                                   fg=self.colors['text_secondary'],
-                                   width=13, anchor='w')
-            minutes_label.pack(side=tk.LEFT, padx=5)
-
-        canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-
-        button_frame = ttk.Frame(comparison_window, style='Modern.TFrame')
-        button_frame.pack(fill=tk.X, padx=30, pady=(0, 25))
-
-        def copy_comparison():
-            table_text = f"Порівняння черг - {date}\n\n"
-            for result in results:
-                table_text += f"{result['queue']:<15} {result['count']:<10} {result['hours']}г {result['minutes']}хв\n"
-            comparison_window.clipboard_clear()
-            comparison_window.clipboard_append(table_text)
-            messagebox.showinfo("Успіх", "Таблицю скопійовано!")
+        return self.session.load(path, date_obj, on_stage)
 
-        ttk.Button(button_frame, text="Копіювати",
-                  command=copy_comparison, style='Secondary.TButton').pack(
-                      side=tk.LEFT, padx=(0, 10))
+    def _handle_task_error(self, error: Exception, message: str) -> None:
+        """Report a failed or cancelled background task."""
+        if isinstance(error, TaskCancelled):
+            self.status_var.set("Операцію скасовано")
+        elif isinstance(error, FileNotFoundError):
+            messagebox.showerror("Помилка", "Файл не знайдено!")
+            self.status_var.set("Помилка: файл не знайдено")
+        else:
+            messagebox.showerror("Помилка", f"{message}:\n{str(error)}")
+            self.status_var.set(f"Помилка: {str(error)[:50]}")
+
+    def cancel_task(self) -> None:
+        """Cancel the running analysis."""
+        self.task_runner.cancel()
+        self.status_var.set("Скасовую...")
+
+    def _on_task_progress(self, fraction: float, message: str) -> None:
+        self.progress_var.set(fraction)
+        if message:
+            self.status_var.set(message)
+
+    def _on_busy_changed(self, busy: bool) -> None:
+        if busy:
+            self.progress_bar.pack(side=tk.LEFT, padx=(15, 0))
+            self.cancel_button.pack(side=tk.LEFT, padx=(10, 0))
+        else:
+            self.progress_bar.pack_forget()
+            self.cancel_button.pack_forget()
+            self.progress_var.set(0.0)
 
-        ttk.Button(button_frame, text="Закрити",
-                  command=comparison_window.destroy, style='Secondary.TButton').pack(
-                      side=tk.LEFT)
+    def on_close(self) -> None:
+        """Stop background work and close the window."""
+        self.task_runner.shutdown()
+        self.root.destroy()
 
     def copy_result(self) -> None:
         """Copy analysis results to clipboard."""
-        result = self.result_text.get('1.0', tk.END).strip()
-        if result:
+        if self.result is not None:
             self.root.clipboard_clear()
-            self.root.clipboard_append(result)
+            self.root.clipboard_append(self.result.to_json())
             self.status_var.set("Результат скопійовано")
             messagebox.showinfo("Успіх", "Результат скопійовано в буфер обміну!")
         else:
@@ -677,8 +676,7 @@ class ScheduleAnalyzerUI:
 
     def save_result(self) -> None:
         """Save analysis results to JSON file."""
-        result = self.result_text.get('1.0', tk.END).strip()
-        if not result:
+        if self.result is None:
             messagebox.showwarning("Попередження", "Немає результатів для збереження!")
             return
 
@@ -691,7 +689,7 @@ class ScheduleAnalyzerUI:
         if filename:
             try:
                 with open(filename, 'w', encoding='utf-8') as f:
-                    f.write(result)
+                    f.write(self.result.to_json())
                 self.status_var.set(f"Збережено: {os.path.basename(filename)}")
                 messagebox.showinfo("Успіх", f"Результат збережено!\n\n{filename}")
             except Exception as e:
@@ -699,60 +697,51 @@ class ScheduleAnalyzerUI:
 
     def clear_result(self) -> None:
         """Clear the result display."""
+        self.result = None
         self.result_text.delete('1.0', tk.END)
         self.status_var.set("Результати очищено")
 
     def export_calendar(self) -> None:
         """Export analysis results to iCalendar format."""
-        result = self.result_text.get('1.0', tk.END).strip()
-        if not result:
+        result = self.result
+        if result is None:
             messagebox.showwarning("Попередження", "Немає результатів для експорту!")
             return
 
-        try:
-            data = json.loads(result)
-            date_str = data.get('date', '')
-            queue_name = data.get('queue', '')
-            outages = data.get('outages', [])
-
-            if not outages:
-                messagebox.showinfo("Інформація",
-                                  "Немає відключень для експорту в календар")
-                return
-
-            date_obj = datetime.strptime(date_str, '%d.%m.%Y')
-
-            filename = filedialog.asksaveasfilename(
-                defaultextension=".ics",
-                filetypes=[("Календар", "*.ics"), ("Всі файли", "*.*")],
-                initialfile=f"outages_{queue_name.replace(' ', '_')}_{date_obj.strftime('%Y%m%d')}.ics"
-            )
-
-            if filename:
-                self.status_var.set("Експортую в календар...")
-                self.root.update_idletasks()
-
-                success, message = CalendarExporter.export_to_ics(data, date_obj, filename)
-
-                if success:
-                    self.status_var.set(f"Календар експортовано: {len(outages)} подій")
-                    try:
-                        os.startfile(filename)
-                        messagebox.showinfo("Успіх",
-                                       f"Календар створено та відкрито!\n\n"
-                                       f"Подій: {len(outages)}\n"
-                                       f"Файл: {os.path.basename(filename)}")
-                    except Exception:
-                        messagebox.showinfo("Успіх",
-                                          f"Календар створено!\n\n"
-                                          f"Подій: {len(outages)}\n"
-                                          f"Файл: {filename}")
-                else:
-                    messagebox.showerror("Помилка", f"Помилка експорту:\n{message}")
-                    self.status_var.set("Помилка експорту")
-
-        except json.JSONDecodeError:
-            messagebox.showerror("Помилка", "Невірний формат JSON!")
-        except Exception as e:
-            messagebox.showerror("Помилка", f"Помилка експорту:\n{str(e)}")
+        # An existing calendar is updated, not overwritten, so do not ask
+        filename = filedialog.asksaveasfilename(
+            defaultextension=".ics",
+            filetypes=[("Календар", "*.ics"), ("Всі файли", "*.*")],
+            initialfile=f"outages_{result.queue_name.replace(' ', '_')}_{result.date.strftime('%Y%m%d')}.ics",
+            confirmoverwrite=False
+        )
+        if not filename:
+            return
+
+        if not result.intervals and not os.path.isfile(filename):
+            messagebox.showinfo("Інформація",
+                              "Немає відключень для експорту в календар")
+            return
+
+        self.status_var.set("Експортую в календар...")
+        self.root.update_idletasks()
+
+        from src.utils.calendar_export import CalendarExporter
+        success, message = CalendarExporter.export_result(result, filename)
 
+        if success:
+            self.status_var.set(f"Календар експортовано: {result.outage_count} подій")
+            try:
+                os.startfile(filename)
+                messagebox.showinfo("Успіх",
+                               f"Календар створено та відкрито!\n\n"
+                               f"Подій: {result.outage_count}\n"
+                               f"Файл: {os.path.basename(filename)}")
+            except Exception:
+                messagebox.showinfo("Успіх",
+                                  f"Календар створено!\n\n"
+                                  f"Подій: {result.outage_count}\n"
+                                  f"Файл: {filename}")
+        else:
+            messagebox.showerror("Помилка", f"Помилка експорту:\n{message}")
+            self.status_var.set("Помилка експорту")
@@ -0,0 +1,178 @@
+"""
+Background task execution for the Tk user interface.
+
+Runs long operations on a worker thread and marshals progress and results
+back to the Tk main loop through root.after polling.
+"""
+
+import threading
+import tkinter as tk
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+
+class TaskCancelled(Exception):
+    """Raised inside a background task once it has been cancelled."""
+
+
+class TaskContext:
+    """Cancellation flag and progress channel shared with a running task."""
+
+    def __init__(self):
+        self._cancelled = threading.Event()
+        self.progress: Tuple[float, str] = (0.0, "")
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether cancellation has been requested."""
+        return self._cancelled.is_set()
+
+    def cancel(self) -> None:
+        """Request cancellation at the next checkpoint."""
+        self._cancelled.set()
+
+    def report(self, fraction: float, message: str) -> None:
+        """
+        Publish progress and act as a cancellation checkpoint.
+
+        Args:
+            fraction: Completed part of the work from 0.0 to 1.0
+            message: Status text for the user
+
+        Raises:
+            TaskCancelled: If cancellation has been requested
+        """
+        if self.cancelled:
+            raise TaskCancelled()
+        self.progress = (fraction, message)
+
+
+class _TaskRequest:
+    """Work function and main-thread callbacks of one submitted task."""
+
+    def __init__(self, key: Hashable,
+                 work: Callable[[TaskContext], Any],
+                 on_success: Callable[[Any], None],
+                 on_error: Callable[[Exception], None]):
+        self.key = key
+        self.work = work
+        self.on_success = on_success
+        self.on_error = on_error
+        self.context = TaskContext()
+        self.future: Optional[Future] = None
+
+
+class BackgroundTaskRunner:
+    """
+    Single-worker task runner that coalesces repeated requests.
+
+    At most one task runs at a time. Submitting a task with the same key as
+    the running one only replaces its callbacks, so the running work is
+    reused for the latest request; submitting a different task cancels the
+    running one and replaces any previously queued request, so only the
+    latest request is executed next.
+    """
+
+    POLL_INTERVAL_MS = 50
+
+    def __init__(self, root: tk.Misc,
+                 on_progress: Callable[[float, str], None],
+                 on_busy_changed: Callable[[bool], None]):
+        """
+        Create the runner.
+
+        Args:
+            root: Tk widget used for after() scheduling
+            on_progress: Called on the main thread with (fraction, message)
+            on_busy_changed: Called on the main thread when a task starts
+                or the runner becomes idle
+        """
+        self.root = root
+        self.on_progress = on_progress
+        self.on_busy_changed = on_busy_changed
+        self._executor = ThreadPoolExecutor(max_workers=1,
+                                            thread_name_prefix='analysis')
+        self._current: Optional[_TaskRequest] = None
+        self._pending: Optional[_TaskRequest] = None
+
+    @property
+    def busy(self) -> bool:
+        """Whether a task is running."""
+        return self._current is not None
+
+    def submit(self, key: Hashable,
+               work: Callable[[TaskContext], Any],
+               on_success: Callable[[Any], None],
+               on_error: Callable[[Exception], None]) -> None:
+        """
+        Submit work to run on the background thread.
+
+        Args:
+            key: Identity of the request used for coalescing
+            work: Function receiving a TaskContext; runs off the main thread
+            on_success: Called on the main thread with the work result
+            on_error: Called on the main thread with the raised exception
+        """
+        request = _TaskRequest(key, work, on_success, on_error)
+
+        if self._current is None:
+            self._start(request)
+            return
+
+        if self._current.key == key and not self._current.context.cancelled:
+            self._current.on_success = on_success
+            self._current.on_error = on_error
+            self._pending = None
+            return
+
+        self._current.context.cancel()
+        self._pending = request
+
+    def cancel(self) -> None:
+        """Cancel the running task and drop any queued request."""
+        self._pending = None
+        if self._current is not None:
+            self._current.context.cancel()
+
+    def shutdown(self) -> None:
+        """Cancel outstanding work and stop the worker thread."""
+        self.cancel()
+        self._executor.shutdown(wait=False)
+
+    def _start(self, request: _TaskRequest) -> None:
+        self._current = request
+        request.future = self._executor.submit(request.work, request.context)
+        self.on_busy_changed(True)
+        self.root.after(self.POLL_INTERVAL_MS, self._poll)
+
+    def _poll(self) -> None:
+        request = self._current
+        if request is None:
+            return
+
+        if not request.future.done():
+            self.on_progress(*request.context.progress)
+            self.root.after(self.POLL_INTERVAL_MS, self._poll)
+            return
+
+        self._current = None
+        pending, self._pending = self._pending, None
+
+        if pending is not None:
+            self._start(pending)
+            return
+
+        self.on_busy_changed(False)
+
+        error = request.future.exception()
+        if error is None and request.context.cancelled:
+            error = TaskCancelled()
+
+        if error is not None:
+            request.on_error(error)
+            return
+
+        try:
+            request.on_success(request.future.result())
+        except Exception as e:
+            request.on_error(e)
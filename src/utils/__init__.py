@@ -1,11 +1,21 @@
 """
 Utility functions module.
 
-Contains calendar export and time calculation utilities.
+Contains calendar export, result building, time calculation and stage
+profiling utilities.
 """
 
-from src.utils.calendar_export import CalendarExporter
-from src.utils.time_calculator import calculate_total_time, queue_sort_key
+from src.lazy_imports import lazy_exports
 
-__all__ = ["CalendarExporter", "calculate_total_time", "queue_sort_key"]
+_EXPORTS = {
+    "CalendarExporter": "src.utils.calendar_export",
+    "Profiler": "src.utils.profiling",
+    "QueueResult": "src.utils.result_builder",
+    "build_queue_result": "src.utils.result_builder",
+    "calculate_total_time": "src.utils.time_calculator",
+    "queue_sort_key": "src.utils.time_calculator",
+    "stage": "src.utils.profiling",
+}
 
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
@@ -5,11 +5,15 @@ Provides functionality to export power outage schedules to iCalendar format
 with automatic reminders.
 """
 
+import os
 from datetime import datetime, timedelta
-from typing import Dict, Tuple, Any
+from typing import Dict, Iterable, List, Optional, Tuple, Any
 from icalendar import Calendar, Event, Alarm
 import pytz
 
+from src.utils.profiling import stage
+from src.utils.result_builder import QueueResult
+
 
 class CalendarExporter:
     """Handles exporting power outage schedules to iCalendar format."""
@@ -23,6 +27,9 @@ class CalendarExporter:
         'Час: {start_time} - {end_time}'
     )
     ALARM_DESCRIPTION_TEMPLATE = '[!] Відключення через {minutes} хвилин - {queue}'
+    COMBINED_CALENDAR_QUEUE = 'усі черги'
+    UID_TEMPLATE = '{date}-{queue}-{start:02d}-{end:02d}@schedule-analyzer'
+    QUEUE_FILE_TEMPLATE = 'outages_{queue}.ics'
 
     @staticmethod
     def export_to_ics(data: Dict, date_obj: datetime, filename: str) -> Tuple[bool, str]:
@@ -43,25 +50,181 @@ class CalendarExporter:
         if not outages:
             return False, "Немає відключень для експорту"
 
-        cal = CalendarExporter._create_calendar(queue_name)
-        tz = pytz.timezone(CalendarExporter.TIMEZONE)
+        with stage('build_calendar'):
+            cal = CalendarExporter._create_calendar(queue_name)
+            tz = pytz.timezone(CalendarExporter.TIMEZONE)
 
-        for outage in outages:
-            event = CalendarExporter._create_event(
-                outage,
-                date_obj,
-                queue_name,
-                tz
-            )
-            cal.add_component(event)
+            for outage in outages:
+                event = CalendarExporter._create_event(
+                    outage,
+                    date_obj,
+                    queue_name,
+                    tz
+                )
+                cal.add_component(event)
 
         try:
-            with open(filename, 'wb') as f:
+            with stage('export_ics'), open(filename, 'wb') as f:
                 f.write(cal.to_ical())
             return True, filename
         except Exception as e:
             return False, str(e)
 
+    @staticmethod
+    def event_uid(date_obj: datetime, queue_name: str, start_time: str, end_time: str) -> str:
+        """
+        Build a stable event UID from the day, queue and slot range.
+
+        The same outage always gets the same UID, so calendar clients update
+        events instead of accumulating duplicates on every re-export.
+
+        Args:
+            date_obj: Day of the outage
+            queue_name: Name of the power outage queue, e.g. "Черга 3-2"
+            start_time: Start in HH:MM format
+            end_time: End in HH:MM format; 00:00 and 24:00 mean midnight
+
+        Returns:
+            UID string, e.g. "20250101-3-2-16-20@schedule-analyzer"
+        """
+        start_hour, start_minute = map(int, start_time.split(':'))
+        end_hour, end_minute = map(int, end_time.split(':'))
+        return CalendarExporter.UID_TEMPLATE.format(
+            date=date_obj.strftime('%Y%m%d'),
+            queue=queue_name.split()[-1],
+            start=start_hour * 2 + start_minute // 30,
+            end=(end_hour * 2 + end_minute // 30) or 48
+        )
+
+    @staticmethod
+    def export_to_ics_streaming(data: Dict, date_obj: datetime, filename: str) -> Tuple[bool, str]:
+        """
+        Export power outage schedule with the streaming writer.
+
+        Produces the same bytes as export_to_ics without building the
+        icalendar object tree.
+
+        Args:
+            data: Dictionary containing queue name and outage information
+            date_obj: Date object for the schedule
+            filename: Path to save the .ics file
+
+        Returns:
+            Tuple of (success: bool, message: str)
+        """
+        return CalendarExporter._write_streaming(data.get('queue', ''), date_obj,
+                                                 data.get('outages', []), filename)
+
+    @staticmethod
+    def export_result(result: QueueResult, filename: str) -> Tuple[bool, str]:
+        """
+        Export an analysis result with the streaming writer.
+
+        An existing calendar is updated incrementally like in export_many:
+        events of the day that disappeared are cancelled, new ones are added
+        and the rest of the file is kept. A day without outages can only be
+        exported into an existing calendar.
+
+        Args:
+            result: Analysis result of one sub-queue
+            filename: Path of the .ics file
+
+        Returns:
+            Tuple of (success: bool, message: str)
+        """
+        if not os.path.isfile(filename):
+            return CalendarExporter._write_streaming(result.queue_name, result.date,
+                                                     result.outages, filename)
+
+        from src.utils.ics_writer import update_calendar
+
+        try:
+            with stage('export_ics'):
+                update_calendar(filename, result.queue_name,
+                                [(result.date, result.queue_name, result.outages)])
+            return True, filename
+        except Exception as e:
+            return False, str(e)
+
+    @staticmethod
+    def _write_streaming(queue_name: str, date_obj: datetime,
+                         outages: List[Dict[str, str]], filename: str) -> Tuple[bool, str]:
+        from src.utils.ics_writer import write_calendar
+
+        if not outages:
+            return False, "Немає відключень для експорту"
+
+        try:
+            with stage('export_ics'), open(filename, 'wb') as f:
+                write_calendar(f, queue_name, [(date_obj, outages)])
+            return True, filename
+        except Exception as e:
+            return False, str(e)
+
+    @staticmethod
+    def export_many(schedules: Iterable[Any],
+                    destination: str,
+                    combined: bool = False,
+                    queue_ids: Optional[Iterable[int]] = None) -> Tuple[bool, str]:
+        """
+        Export many days of all queues in a single call.
+
+        Writes one .ics file per queue into a directory, or one combined file
+        with the events of every queue. Calendar templates are shared between
+        the queue files. When several schedules have the same date, the last
+        one wins.
+
+        Existing files are updated incrementally: events of the exported days
+        that disappeared are cancelled, new ones are added and everything else
+        is kept byte for byte. Unchanged files are not rewritten. Days without
+        outages are only exported into existing calendars, where they cancel
+        the earlier events.
+
+        Args:
+            schedules: DaySchedule objects to export
+            destination: Output directory, or file path when combined
+            combined: Write a single calendar with all queues
+            queue_ids: Sub-queue ids to export, defaults to all
+
+        Returns:
+            Tuple of (success: bool, message: str) with the destination path
+            or the error message
+        """
+        from src.core.schedule import QUEUE_COUNT, QUEUE_NAMES
+        from src.utils.ics_writer import update_calendar
+
+        days = sorted({schedule.date: schedule for schedule in schedules}.items())
+        queue_ids = sorted(set(queue_ids)) if queue_ids is not None else list(range(QUEUE_COUNT))
+
+        def queue_filename(queue_id: int) -> str:
+            return os.path.join(destination, CalendarExporter.QUEUE_FILE_TEMPLATE.format(
+                queue=QUEUE_NAMES[queue_id].replace(' ', '_')))
+
+        if not any(day.masks[queue_id] for _, day in days for queue_id in queue_ids):
+            # Days without outages still cancel the events of existing calendars
+            existing = [destination] if combined else map(queue_filename, queue_ids)
+            if not any(os.path.isfile(path) for path in existing):
+                return False, "Немає відключень для експорту"
+
+        def queue_events(queue_id: int) -> Iterable[Tuple[Any, str, List[Dict[str, str]]]]:
+            queue_name = QUEUE_NAMES[queue_id]
+            return [(date_obj, queue_name, day.outage_list(queue_id)) for date_obj, day in days]
+
+        try:
+            with stage('export_ics'):
+                if combined:
+                    update_calendar(destination, CalendarExporter.COMBINED_CALENDAR_QUEUE,
+                                    [event for queue_id in queue_ids
+                                     for event in queue_events(queue_id)])
+                else:
+                    os.makedirs(destination, exist_ok=True)
+                    for queue_id in queue_ids:
+                        update_calendar(queue_filename(queue_id), QUEUE_NAMES[queue_id],
+                                        queue_events(queue_id))
+            return True, destination
+        except Exception as e:
+            return False, str(e)
+
     @staticmethod
     def _create_calendar(queue_name: str) -> Calendar:
         """
@@ -104,6 +267,8 @@ class CalendarExporter:
         end_dt = CalendarExporter._parse_datetime(end_time_str, date_obj, tz, is_end=True)
 
         event = Event()
+        event.add('uid', CalendarExporter.event_uid(
+            date_obj, queue_name, start_time_str, end_time_str))
         event.add('summary', CalendarExporter.EVENT_SUMMARY_TEMPLATE.format(queue=queue_name))
         event.add('dtstart', start_dt)
         event.add('dtend', end_dt)
@@ -132,14 +297,15 @@ class CalendarExporter:
             time_str: Time string in HH:MM format
             date_obj: Date object
             tz: Timezone object
-            is_end: Whether this is an end time (handles 24:00 case)
+            is_end: Whether this is an end time (24:00 and 00:00 mean midnight
+                of the next day)
 
         Returns:
             Localized datetime object
         """
         hour, minute = map(int, time_str.split(':'))
 
-        if is_end and hour == 24 and minute == 0:
+        if is_end and hour in (0, 24) and minute == 0:
             return tz.localize(datetime.combine(
                 date_obj.date() + timedelta(days=1),
                 datetime.min.time()
@@ -0,0 +1,436 @@
+"""
+Streaming iCalendar writer for power outage schedules.
+
+Writes VCALENDAR/VEVENT/VALARM text directly to a binary stream using
+precomputed, pre-folded templates instead of building an icalendar object
+tree. The output is byte-for-byte identical to CalendarExporter.export_to_ics.
+
+Existing calendars can be updated incrementally with update_calendar: events
+are matched by their stable UID and only the difference is written.
+"""
+
+import os
+import re
+import tempfile
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import BinaryIO, Dict, Iterable, List, Optional, Tuple
+
+from src.utils.calendar_export import CalendarExporter
+
+
+LINE_LIMIT = 75
+CRLF = '\r\n'
+FOLD_SEPARATOR = '\r\n '
+
+EVENT_BEGIN = b'BEGIN:VEVENT\r\n'
+EVENT_END = b'END:VEVENT\r\n'
+CALENDAR_END = b'END:VCALENDAR\r\n'
+STATUS_CONFIRMED = 'CONFIRMED'
+STATUS_CANCELLED = 'CANCELLED'
+
+UID_PATTERN = re.compile(r'^(\d{8})-(\S+?)-\d{2}-\d{2}@')
+
+
+def escape_text(text: str) -> str:
+    """
+    Escape a TEXT property value as defined in RFC 5545.
+
+    Args:
+        text: Raw property value
+
+    Returns:
+        Escaped value
+    """
+    return (text.replace(r'\N', '\n')
+            .replace('\\', '\\\\')
+            .replace(';', r'\;')
+            .replace(',', r'\,')
+            .replace('\r\n', r'\n')
+            .replace('\n', r'\n')
+            .replace('\r', r'\n'))
+
+
+def fold_line(line: str) -> str:
+    """
+    Fold a content line to at most 75 octets per physical line.
+
+    Never splits a backslash escape across the fold, matching the icalendar
+    package.
+
+    Args:
+        line: Unfolded content line without line break
+
+    Returns:
+        Folded line without the trailing line break
+    """
+    if len(line.encode('utf-8')) < LINE_LIMIT:
+        return line
+
+    folded: List[str] = []
+    current: List[str] = []
+    byte_count = 0
+    for char in line:
+        char_bytes = len(char.encode('utf-8'))
+        if current and byte_count + char_bytes >= LINE_LIMIT:
+            if len(current) > 1 and current[-1] in '\\^':
+                prefix = current.pop()
+                folded.append(''.join(current))
+                current = [prefix]
+                byte_count = len(prefix.encode('utf-8'))
+            else:
+                folded.append(''.join(current))
+                current = []
+                byte_count = 0
+        current.append(char)
+        byte_count += char_bytes
+
+    if current:
+        folded.append(''.join(current))
+    return FOLD_SEPARATOR.join(folded)
+
+
+def content_line(name: str, value: str) -> str:
+    """Build a folded content line with CRLF for an escaped TEXT property."""
+    return fold_line(f"{name}:{escape_text(value)}") + CRLF
+
+
+class IcsStreamWriter:
+    """Streams outage events as iCalendar text to a binary output."""
+
+    def __init__(self, output: Optional[BinaryIO], timezone: str = CalendarExporter.TIMEZONE):
+        """
+        Create a writer.
+
+        Args:
+            output: Binary stream receiving UTF-8 calendar text, or None when
+                only render_event is used
+            timezone: TZID used for event times
+        """
+        self.output = output
+        self.timezone = timezone
+        self._day_strings: Dict[date, Tuple[str, str]] = {}
+        self.event_count = 0
+
+    def begin_calendar(self, queue_name: str) -> None:
+        """
+        Write the calendar header.
+
+        Args:
+            queue_name: Queue shown in the calendar name
+        """
+        self.output.write(_calendar_header(queue_name, self.timezone))
+
+    def end_calendar(self) -> None:
+        """Write the calendar footer."""
+        self.output.write(b'END:VCALENDAR\r\n')
+
+    def _day(self, date_obj: date) -> Tuple[str, str]:
+        """Formatted date and next-day date, cached per day."""
+        strings = self._day_strings.get(date_obj)
+        if strings is None:
+            strings = (date_obj.strftime('%Y%m%d'),
+                       (date_obj + timedelta(days=1)).strftime('%Y%m%d'))
+            self._day_strings[date_obj] = strings
+        return strings
+
+    def render_event(self, date_obj: date, queue_name: str,
+                     start_time: str, end_time: str,
+                     sequence: int = 0, status: str = STATUS_CONFIRMED) -> bytes:
+        """
+        Render one outage event with its two reminders.
+
+        Args:
+            date_obj: Day of the outage
+            queue_name: Name of the power outage queue
+            start_time: Start in HH:MM format
+            end_time: End in HH:MM format; 24:00 and 00:00 mean midnight of
+                the next day
+            sequence: Revision number, omitted when 0
+            status: Event status
+
+        Returns:
+            Encoded VEVENT block
+        """
+        if isinstance(date_obj, datetime):
+            date_obj = date_obj.date()
+        day, next_day = self._day(date_obj)
+
+        start_hour, start_minute = start_time.split(':')
+        end_hour, end_minute = end_time.split(':')
+        if int(end_hour) in (0, 24) and int(end_minute) == 0:
+            end_stamp = f"{next_day}T000000"
+        else:
+            end_stamp = f"{day}T{int(end_hour):02d}{int(end_minute):02d}00"
+        start_stamp = f"{day}T{int(start_hour):02d}{int(start_minute):02d}00"
+
+        summary, alarms = _event_templates(queue_name)
+        uid = CalendarExporter.event_uid(date_obj, queue_name, start_time, end_time)
+        return ''.join((
+            'BEGIN:VEVENT\r\n',
+            summary,
+            f"DTSTART;TZID={self.timezone}:{start_stamp}\r\n",
+            f"DTEND;TZID={self.timezone}:{end_stamp}\r\n",
+            f"UID:{uid}\r\n",
+            f"SEQUENCE:{sequence}\r\n" if sequence else '',
+            _event_description(queue_name, start_time, end_time),
+            'LOCATION:Україна\r\n',
+            f"STATUS:{status}\r\n",
+            alarms,
+            'END:VEVENT\r\n',
+        )).encode('utf-8')
+
+    def write_event(self, date_obj: date, queue_name: str,
+                    start_time: str, end_time: str) -> None:
+        """
+        Write one outage event with its two reminders.
+
+        Args:
+            date_obj: Day of the outage
+            queue_name: Name of the power outage queue
+            start_time: Start in HH:MM format
+            end_time: End in HH:MM format; 24:00 and 00:00 mean midnight of
+                the next day
+        """
+        self.output.write(self.render_event(date_obj, queue_name, start_time, end_time))
+        self.event_count += 1
+
+    def write_outages(self, date_obj: date, queue_name: str,
+                      outages: Iterable[Dict[str, str]]) -> None:
+        """
+        Write events for a list of outages of one day.
+
+        Args:
+            date_obj: Day of the outages
+            queue_name: Name of the power outage queue
+            outages: Dictionaries with 'start' and 'end' time strings
+        """
+        for outage in outages:
+            self.write_event(date_obj, queue_name, outage['start'], outage['end'])
+
+
+@lru_cache(maxsize=64)
+def _calendar_header(queue_name: str, timezone: str) -> bytes:
+    return (
+        'BEGIN:VCALENDAR\r\n'
+        'VERSION:2.0\r\n'
+        + content_line('PRODID', '-//Schedule Analyzer//UA')
+        + content_line('X-WR-CALNAME',
+                       CalendarExporter.CALENDAR_NAME_TEMPLATE.format(queue=queue_name))
+        + content_line('X-WR-TIMEZONE', timezone)
+    ).encode('utf-8')
+
+
+@lru_cache(maxsize=64)
+def _event_templates(queue_name: str) -> Tuple[str, str]:
+    """Pre-folded SUMMARY line and VALARM blocks of a queue."""
+    summary = content_line('SUMMARY',
+                           CalendarExporter.EVENT_SUMMARY_TEMPLATE.format(queue=queue_name))
+    alarms = ''.join(
+        'BEGIN:VALARM\r\n'
+        'ACTION:DISPLAY\r\n'
+        + content_line('DESCRIPTION', CalendarExporter.ALARM_DESCRIPTION_TEMPLATE.format(
+            minutes=minutes, queue=queue_name))
+        + f"TRIGGER:-PT{minutes}M\r\n"
+        'END:VALARM\r\n'
+        for minutes in (15, 5)
+    )
+    return summary, alarms
+
+
+@lru_cache(maxsize=4096)
+def _event_description(queue_name: str, start_time: str, end_time: str) -> str:
+    return content_line('DESCRIPTION', CalendarExporter.EVENT_DESCRIPTION_TEMPLATE.format(
+        queue=queue_name, start_time=start_time, end_time=end_time))
+
+
+def write_calendar(output: BinaryIO, queue_name: str,
+                   days: Iterable[Tuple[date, Iterable[Dict[str, str]]]]) -> int:
+    """
+    Stream a complete calendar of one queue covering many days.
+
+    Args:
+        output: Binary stream receiving the calendar
+        queue_name: Name of the power outage queue
+        days: Pairs of (date, list of outage dictionaries)
+
+    Returns:
+        Number of written events
+    """
+    writer = IcsStreamWriter(output)
+    writer.begin_calendar(queue_name)
+    for date_obj, outages in days:
+        writer.write_outages(date_obj, queue_name, outages)
+    writer.end_calendar()
+    return writer.event_count
+
+
+def _event_properties(block: bytes) -> Dict[str, str]:
+    """
+    Read the top-level properties of a VEVENT block.
+
+    Args:
+        block: Encoded VEVENT block
+
+    Returns:
+        Mapping of property name (without parameters) to raw value; the first
+        occurrence wins, so VALARM properties never shadow event ones
+    """
+    properties: Dict[str, str] = {}
+    text = block.replace(b'\r\n ', b'').decode('utf-8')
+    for line in text.split('\r\n'):
+        name, _, value = line.partition(':')
+        properties.setdefault(name.split(';', 1)[0], value)
+    return properties
+
+
+def _event_key(properties: Dict[str, str]) -> Tuple[str, Optional[str]]:
+    """Day (YYYYMMDD) and queue token of an event; token is None without a UID."""
+    match = UID_PATTERN.match(properties.get('UID', ''))
+    if match:
+        return match.group(1), match.group(2)
+    return properties.get('DTSTART', '')[:8], None
+
+
+def _with_status(block: bytes, properties: Dict[str, str], status: str) -> bytes:
+    """Copy of a VEVENT block with a new status and the next SEQUENCE."""
+    sequence = int(properties.get('SEQUENCE', '0')) + 1
+    old_status = f"STATUS:{properties.get('STATUS', STATUS_CONFIRMED)}\r\n".encode('utf-8')
+    block = block.replace(old_status, f"STATUS:{status}\r\n".encode('utf-8'), 1)
+    if 'SEQUENCE' in properties:
+        old_sequence = f"SEQUENCE:{properties['SEQUENCE']}\r\n".encode('utf-8')
+        return block.replace(old_sequence, f"SEQUENCE:{sequence}\r\n".encode('utf-8'), 1)
+    uid_line = f"UID:{properties['UID']}\r\n".encode('utf-8')
+    return block.replace(uid_line, uid_line + f"SEQUENCE:{sequence}\r\n".encode('utf-8'), 1)
+
+
+def _split_calendar(data: bytes) -> Tuple[bytes, List[bytes], bytes]:
+    """
+    Split calendar bytes into header, VEVENT blocks and footer.
+
+    Raises:
+        ValueError: If the data is not a complete calendar
+    """
+    first = data.find(EVENT_BEGIN)
+    if first < 0:
+        footer_start = data.rfind(CALENDAR_END)
+        if footer_start < 0:
+            raise ValueError("Некоректний файл календаря")
+        return data[:footer_start], [], data[footer_start:]
+
+    blocks: List[bytes] = []
+    position = first
+    while True:
+        end = data.find(EVENT_END, position)
+        if end < 0:
+            raise ValueError("Некоректний файл календаря")
+        end += len(EVENT_END)
+        blocks.append(data[position:end])
+        if not data.startswith(EVENT_BEGIN, end):
+            break
+        position = end
+    if not data.startswith(CALENDAR_END, end):
+        raise ValueError("Некоректний файл календаря")
+    return data[:first], blocks, data[end:]
+
+
+def _replace_file(filename: str, parts: Iterable[bytes]) -> None:
+    """Atomically replace a file with the concatenated parts."""
+    directory = os.path.dirname(os.path.abspath(filename))
+    fd, temp_path = tempfile.mkstemp(suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            for part in parts:
+                f.write(part)
+        os.replace(temp_path, filename)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def update_calendar(filename: str, calendar_queue: str,
+                    events: Iterable[Tuple[date, str, Iterable[Dict[str, str]]]]) -> Dict[str, int]:
+    """
+    Create or incrementally update a calendar file.
+
+    Each (day, queue) pair in events replaces the previously exported state of
+    that pair. Events are matched by UID: outages that are gone are kept as
+    CANCELLED with an incremented SEQUENCE, cancelled outages that come back
+    are confirmed again, and new outages are appended. Untouched VEVENT blocks
+    keep their exact bytes. Events without a UID from older exports are
+    dropped for the updated days.
+
+    When nothing changed the file is left alone; when events were only added
+    they are appended in place; otherwise the file is replaced atomically.
+
+    Args:
+        filename: Path of the .ics file
+        calendar_queue: Queue shown in the calendar name of a new file
+        events: Triples of (date, queue name, list of outage dictionaries)
+
+    Returns:
+        Counts of 'added', 'cancelled', 'restored' and 'unchanged' events
+
+    Raises:
+        ValueError: If the existing file is not a calendar written by this module
+    """
+    writer = IcsStreamWriter(None)
+    wanted: Dict[str, bytes] = {}
+    covered = set()
+    for date_obj, queue_name, outages in events:
+        if isinstance(date_obj, datetime):
+            date_obj = date_obj.date()
+        covered.add((date_obj.strftime('%Y%m%d'), queue_name.split()[-1]))
+        for outage in outages:
+            uid = CalendarExporter.event_uid(date_obj, queue_name, outage['start'], outage['end'])
+            wanted[uid] = writer.render_event(date_obj, queue_name,
+                                              outage['start'], outage['end'])
+
+    covered_days = {day for day, _ in covered}
+    counts = {'added': 0, 'cancelled': 0, 'restored': 0, 'unchanged': 0}
+
+    if not os.path.exists(filename):
+        counts['added'] = len(wanted)
+        _replace_file(filename, [_calendar_header(calendar_queue, writer.timezone),
+                                 *wanted.values(), CALENDAR_END])
+        return counts
+
+    with open(filename, 'rb') as f:
+        data = f.read()
+    header, blocks, footer = _split_calendar(data)
+
+    modified = False
+    kept: List[bytes] = []
+    for block in blocks:
+        properties = _event_properties(block)
+        day, token = _event_key(properties)
+        uid = properties.get('UID')
+        status = properties.get('STATUS', STATUS_CONFIRMED)
+
+        if uid in wanted:
+            del wanted[uid]
+            if status == STATUS_CANCELLED:
+                block = _with_status(block, properties, STATUS_CONFIRMED)
+                counts['restored'] += 1
+                modified = True
+            else:
+                counts['unchanged'] += 1
+        elif token is None:
+            if day in covered_days:
+                modified = True
+                continue
+        elif (day, token) in covered and status != STATUS_CANCELLED:
+            block = _with_status(block, properties, STATUS_CANCELLED)
+            counts['cancelled'] += 1
+            modified = True
+        kept.append(block)
+
+    counts['added'] = len(wanted)
+    if modified:
+        _replace_file(filename, [header, *kept, *wanted.values(), footer])
+    elif wanted:
+        with open(filename, 'r+b') as f:
+            f.seek(len(data) - len(footer))
+            f.write(b''.join(wanted.values()) + footer)
+            f.truncate()
+    return counts
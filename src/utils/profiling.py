@@ -0,0 +1,176 @@
+"""
+Per-stage timing instrumentation for the analysis pipeline.
+
+Pipeline code wraps each stage in ``with stage('name'):``. While no profile
+is active in the current context the call returns a shared no-op context
+manager, so instrumentation costs a context variable lookup. Inside
+``Profiler.track`` every stage records its duration and the net number of
+memory blocks it left allocated.
+"""
+
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Any, ContextManager, Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+TOTAL_STAGE = 'total'
+
+_NULL_STAGE = nullcontext()
+
+
+class StageProfile:
+    """Stage durations and allocation counts collected for one image or export."""
+
+    __slots__ = ('label', 'stages')
+
+    def __init__(self, label: str = ''):
+        """
+        Create an empty profile.
+
+        Args:
+            label: Name of the profiled item, e.g. the image path
+        """
+        self.label = label
+        # (stage name, seconds, net allocated blocks) in completion order
+        self.stages: List[Tuple[str, float, int]] = []
+
+    def add(self, name: str, seconds: float, blocks: int) -> None:
+        """Record one finished stage."""
+        self.stages.append((name, seconds, blocks))
+
+
+_current_profile: ContextVar[Optional[StageProfile]] = ContextVar(
+    'current_profile', default=None)
+
+
+class _StageTimer:
+    """Context manager measuring one stage into the active profile."""
+
+    __slots__ = ('profile', 'name', 'start', 'blocks')
+
+    def __init__(self, profile: StageProfile, name: str):
+        self.profile = profile
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.blocks = sys.getallocatedblocks()
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        elapsed = time.perf_counter() - self.start
+        self.profile.add(self.name, elapsed, sys.getallocatedblocks() - self.blocks)
+
+
+def stage(name: str) -> ContextManager[None]:
+    """
+    Measure a pipeline stage if profiling is active in this context.
+
+    Args:
+        name: Stage name shown in the report
+
+    Returns:
+        Context manager timing the enclosed block
+    """
+    profile = _current_profile.get()
+    if profile is None:
+        return _NULL_STAGE
+    return _StageTimer(profile, name)
+
+
+def _percentile(ordered: Sequence[float], fraction: float) -> float:
+    index = min(int(round(fraction * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+class Profiler:
+    """Collects stage profiles of many images or exports and summarizes them."""
+
+    def __init__(self):
+        self.profiles: List[StageProfile] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def track(self, label: str = '') -> Iterator[StageProfile]:
+        """
+        Profile all stages run in the enclosed block.
+
+        Args:
+            label: Name of the profiled item, e.g. the image path
+
+        Yields:
+            Profile being filled; it is added to the profiler on exit
+        """
+        profile = StageProfile(label)
+        token = _current_profile.set(profile)
+        try:
+            with _StageTimer(profile, TOTAL_STAGE):
+                yield profile
+        finally:
+            _current_profile.reset(token)
+            self.add(profile)
+
+    def add(self, profile: StageProfile) -> None:
+        """
+        Add a profile collected elsewhere, e.g. in a worker process.
+
+        Args:
+            profile: Finished profile
+        """
+        with self._lock:
+            self.profiles.append(profile)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Summarize every stage over all profiles.
+
+        Stages are listed in order of first appearance, with the total last.
+
+        Returns:
+            Mapping of stage name to count, p50/p95/max/total milliseconds
+            and mean net allocated blocks
+        """
+        durations: Dict[str, List[float]] = {}
+        blocks: Dict[str, int] = {}
+        with self._lock:
+            for profile in self.profiles:
+                for name, seconds, allocated in profile.stages:
+                    durations.setdefault(name, []).append(seconds)
+                    blocks[name] = blocks.get(name, 0) + allocated
+
+        if TOTAL_STAGE in durations:
+            durations[TOTAL_STAGE] = durations.pop(TOTAL_STAGE)
+
+        summary = {}
+        for name, samples in durations.items():
+            ordered = sorted(samples)
+            summary[name] = {
+                "count": len(ordered),
+                "p50_ms": _percentile(ordered, 0.50) * 1000,
+                "p95_ms": _percentile(ordered, 0.95) * 1000,
+                "max_ms": ordered[-1] * 1000,
+                "total_ms": sum(ordered) * 1000,
+                "mean_blocks": blocks[name] / len(ordered),
+            }
+        return summary
+
+    def format_report(self) -> str:
+        """
+        Format the stage summary as a text table.
+
+        Returns:
+            Report with one line per stage
+        """
+        summary = self.summary()
+        lines = [f"Профіль етапів ({len(self.profiles)} вимірювань)",
+                 f"{'етап':<18}{'к-сть':>7}{'p50 мс':>10}{'p95 мс':>10}"
+                 f"{'макс мс':>10}{'всього мс':>12}{'блоків':>10}"]
+        for name, stats in summary.items():
+            lines.append(
+                f"{name:<18}{stats['count']:>7}{stats['p50_ms']:>10.3f}"
+                f"{stats['p95_ms']:>10.3f}{stats['max_ms']:>10.3f}"
+                f"{stats['total_ms']:>12.1f}{stats['mean_blocks']:>10.1f}"
+            )
+        return '\n'.join(lines)
@@ -0,0 +1,128 @@
+"""
+Result building utilities for power outage schedule analysis.
+
+Provides the analysis result of one sub-queue and the JSON-ready structure
+shared by the UI and batch tools.
+"""
+
+import json
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from schedule_config import time_to_string
+from src.core.schedule import MINUTES_PER_SLOT, QUEUE_NAMES, DaySchedule
+
+
+class QueueResult:
+    """
+    Analysis result of one sub-queue for one day.
+
+    Holds the outage periods as slot indices; the JSON structure is only
+    rendered on request, for display or saving.
+    """
+
+    __slots__ = ('queue_name', 'date', 'intervals', 'analyzed_at')
+
+    def __init__(self, queue_name: str,
+                 date_obj: date,
+                 intervals: Sequence[Tuple[int, int]],
+                 analyzed_at: Optional[datetime] = None):
+        """
+        Create a result.
+
+        Args:
+            queue_name: Name of the power outage queue
+            date_obj: Date of the schedule
+            intervals: List of (start_index, end_index) half-hour periods
+            analyzed_at: Analysis timestamp, defaults to now
+        """
+        if isinstance(date_obj, datetime):
+            date_obj = date_obj.date()
+        self.queue_name = queue_name
+        self.date = date_obj
+        self.intervals: Tuple[Tuple[int, int], ...] = tuple(intervals)
+        self.analyzed_at = analyzed_at or datetime.now()
+
+    @classmethod
+    def from_schedule(cls, schedule: DaySchedule, queue_id: int,
+                      analyzed_at: Optional[datetime] = None) -> 'QueueResult':
+        """
+        Take the result of one sub-queue from a day schedule.
+
+        Args:
+            schedule: Analyzed day schedule
+            queue_id: Sub-queue id
+            analyzed_at: Analysis timestamp, defaults to now
+
+        Returns:
+            QueueResult of the sub-queue
+        """
+        return cls(QUEUE_NAMES[queue_id], schedule.date, schedule.intervals(queue_id),
+                   analyzed_at)
+
+    @property
+    def outage_count(self) -> int:
+        """Number of separate outage periods."""
+        return len(self.intervals)
+
+    @property
+    def total_minutes(self) -> int:
+        """Total outage time in minutes."""
+        return sum(end - start for start, end in self.intervals) * MINUTES_PER_SLOT
+
+    @property
+    def outages(self) -> List[Dict[str, str]]:
+        """Outage periods as {"start", "end"} time strings."""
+        return [
+            {"start": time_to_string(start), "end": time_to_string(end)}
+            for start, end in self.intervals
+        ]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert to a JSON-ready dictionary.
+
+        Returns:
+            Dictionary with date, queue, outages and total outage time
+        """
+        total_minutes = self.total_minutes
+        hours, minutes = divmod(total_minutes, 60)
+
+        return {
+            "date": self.date.strftime('%d.%m.%Y'),
+            "queue": self.queue_name,
+            "outages": self.outages,
+            "total_outage_time": {
+                "hours": hours,
+                "minutes": minutes,
+                "total_minutes": total_minutes,
+                "formatted": f"{hours} год {minutes} хв"
+            },
+            "analysis_info": {
+                "outage_count": self.outage_count,
+                "analyzed_at": self.analyzed_at.strftime('%d.%m.%Y %H:%M:%S')
+            }
+        }
+
+    def to_json(self) -> str:
+        """Render the result as indented JSON for display or saving."""
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+
+
+def build_queue_result(queue_name: str,
+                       outages: List[Tuple[int, int]],
+                       date_obj: datetime,
+                       analyzed_at: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    Build the analysis result for a single queue.
+
+    Args:
+        queue_name: Name of the power outage queue
+        outages: List of (start_index, end_index) half-hour periods
+        date_obj: Date of the schedule
+        analyzed_at: Analysis timestamp, defaults to now
+
+    Returns:
+        Dictionary with date, queue, outages and total outage time
+    """
+    return QueueResult(queue_name, date_obj, outages, analyzed_at).to_dict()
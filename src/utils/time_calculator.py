@@ -6,6 +6,8 @@ Provides functions for calculating total outage duration and sorting queues.
 
 from typing import Dict, List, Tuple
 
+from src.core.schedule import queue_id, queue_number
+
 
 def calculate_total_time(outages: List[Dict[str, str]]) -> Tuple[int, int, int]:
     """
@@ -49,19 +51,10 @@ def queue_sort_key(item: Dict) -> Tuple[int, int]:
         item: Dictionary containing 'queue' field with queue name
 
     Returns:
-        Tuple of (main_number, sub_number) for sorting
+        Tuple of (main_number, sub_number) for sorting, (99, 99) for
+        unknown queue names
     """
-    queue_name = item['queue']
-    parts = queue_name.split()
-
-    if len(parts) >= 2:
-        try:
-            main_num = int(parts[1].split('-')[0])
-            sub_num = int(parts[1].split('-')[1])
-            return (main_num, sub_num)
-        except (ValueError, IndexError):
-            return (99, 99)
-
-    return (99, 99)
-
-
+    try:
+        return queue_number(queue_id(item['queue']))
+    except KeyError:
+        return (99, 99)
@@ -0,0 +1,33 @@
+"""Shared fixtures: synthetic schedule images with known outages."""
+
+import random
+from typing import Optional, Tuple
+
+import numpy as np
+import pytest
+
+from schedule_config import ScheduleConfig
+from src.bench.synthetic import encode_image, random_outage_matrix, render_schedule
+
+TARGET_SIZE = (ScheduleConfig.TARGET_WIDTH, ScheduleConfig.TARGET_HEIGHT)
+
+
+@pytest.fixture
+def outage_matrix() -> np.ndarray:
+    """Ground-truth outage matrix of a synthetic schedule."""
+    return random_outage_matrix(random.Random(7))
+
+
+@pytest.fixture
+def render_png():
+    """Render an outage matrix into encoded PNG, or JPEG with a quality, bytes."""
+    def render(matrix: np.ndarray, size: Tuple[int, int] = TARGET_SIZE,
+               jpeg_quality: Optional[int] = None) -> bytes:
+        return encode_image(render_schedule(matrix, size), jpeg_quality)
+    return render
+
+
+@pytest.fixture
+def schedule_png(outage_matrix, render_png) -> bytes:
+    """Encoded PNG of the synthetic schedule."""
+    return render_png(outage_matrix)
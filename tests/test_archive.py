@@ -0,0 +1,123 @@
+"""Tests of the SQLite and binary schedule archives."""
+
+from datetime import date, timedelta
+
+import pytest
+
+from src.core.schedule import QUEUE_COUNT, DaySchedule, mask_from_intervals
+from src.storage.archive import ScheduleArchive, open_archive
+from src.storage.binary_archive import BinaryArchive
+
+FIRST = date(2026, 1, 10)
+
+
+def make_day(offset: int) -> DaySchedule:
+    masks = [mask_from_intervals([(offset % 40, offset % 40 + 1 + queue)])
+             for queue in range(QUEUE_COUNT)]
+    return DaySchedule(FIRST + timedelta(days=offset), masks)
+
+
+@pytest.fixture(params=['archive.sqlite', 'archive.bin'])
+def archive(request, tmp_path):
+    with open_archive(str(tmp_path / request.param)) as opened:
+        yield opened
+
+
+def test_open_archive_picks_format_by_extension(tmp_path):
+    with open_archive(str(tmp_path / 'a.BIN')) as binary:
+        assert isinstance(binary, BinaryArchive)
+    with open_archive(str(tmp_path / 'a.sqlite')) as sqlite:
+        assert isinstance(sqlite, ScheduleArchive)
+
+
+def test_days_round_trip(archive):
+    days = [make_day(offset) for offset in (0, 1, 5)]
+    assert archive.store_days(days) == 3
+
+    for day in days:
+        assert archive.get_day(day.date).masks == day.masks
+    assert [day.date for day in archive.iter_days(FIRST, FIRST + timedelta(days=9))] == \
+        [day.date for day in days]
+
+
+def test_missing_day_is_none(archive):
+    archive.store_days([make_day(0), make_day(3)])
+
+    assert archive.get_day(FIRST + timedelta(days=1)) is None
+    assert archive.get_day(FIRST - timedelta(days=1)) is None
+    assert archive.get_day(FIRST + timedelta(days=30)) is None
+
+
+def test_daily_minutes_skips_missing_days(archive):
+    archive.store_days([make_day(0), make_day(2)])
+
+    minutes = archive.daily_minutes(1, FIRST, FIRST + timedelta(days=2))
+
+    assert minutes == [(FIRST, 60), (FIRST + timedelta(days=2), 60)]
+
+
+def test_totals_cover_every_queue(archive):
+    archive.store_day(make_day(0))
+
+    before = FIRST - timedelta(days=1)
+    assert archive.total_minutes_by_queue(before, before) == dict.fromkeys(range(QUEUE_COUNT), 0)
+    assert archive.total_minutes_by_queue(FIRST, FIRST) == \
+        {queue: make_day(0).total_minutes(queue) for queue in range(QUEUE_COUNT)}
+
+
+def test_busiest_days_of_both_archives_agree(tmp_path):
+    quiet = DaySchedule(FIRST + timedelta(days=7))
+    days = [make_day(offset) for offset in (0, 1, 3, 6)] + [quiet]
+    end = FIRST + timedelta(days=9)
+    results = []
+    for name in ('archive.sqlite', 'archive.bin'):
+        with open_archive(str(tmp_path / name)) as archive:
+            archive.store_days(days)
+            results.append((archive.busiest_days(FIRST, end, limit=3),
+                            archive.busiest_days(FIRST, end, queue_id=4),
+                            archive.busiest_days(end, end)))
+
+    assert results[0] == results[1]
+    assert results[0][2] == []
+    assert results[0][1][-1] == (quiet.date, 0)
+
+
+def test_revision_and_last_updated_follow_writes(archive):
+    end = FIRST + timedelta(days=5)
+    assert archive.last_updated(FIRST, end) is None
+    before = archive.revision()
+
+    archive.store_day(make_day(1))
+
+    assert archive.revision() != before
+    assert archive.last_updated(FIRST, end) is not None
+    assert archive.last_updated(end, end) is None
+
+
+def test_binary_archive_grows_backwards(tmp_path):
+    with BinaryArchive(str(tmp_path / 'a.bin')) as archive:
+        archive.store_day(make_day(5))
+        archive.store_day(make_day(0))
+
+        assert archive.date_range() == (FIRST, FIRST + timedelta(days=5))
+        assert archive.get_day(FIRST + timedelta(days=5)).masks == make_day(5).masks
+        assert archive.get_day(FIRST + timedelta(days=2)) is None
+
+
+def test_read_only_binary_archive_sees_other_writers(tmp_path):
+    path = str(tmp_path / 'a.bin')
+    with BinaryArchive(path) as writer:
+        writer.store_day(make_day(0))
+        with open_archive(path, read_only=True) as reader:
+            assert reader.get_day(FIRST).masks == make_day(0).masks
+            with pytest.raises(ValueError):
+                reader.store_day(make_day(1))
+
+            writer.store_day(make_day(4))
+
+            assert reader.get_day(FIRST + timedelta(days=4)).masks == make_day(4).masks
+
+
+def test_read_only_binary_archive_must_exist(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        BinaryArchive(str(tmp_path / 'missing.bin'), read_only=True)
@@ -0,0 +1,101 @@
+"""Tests of grid calibration per layout template."""
+
+import os
+import random
+
+import numpy as np
+from PIL import Image
+
+from analyze_schedule import NOMINAL_GEOMETRY, SamplingPlan, get_classifier
+from src.bench.synthetic import random_outage_matrix, render_schedule
+from src.core.calibration import GridCalibrator, detect_geometry, layout_fingerprint
+
+
+def _shifted(matrix: np.ndarray, dx: int, dy: int) -> Image.Image:
+    img = render_schedule(matrix)
+    canvas = Image.new('RGB', img.size, (255, 255, 255))
+    canvas.paste(img, (dx, dy))
+    return canvas
+
+
+def _classify(img: Image.Image, calibrate) -> np.ndarray:
+    plan, classifier = calibrate(img)
+    return classifier.classify_array(plan.sample(img))
+
+
+def test_fingerprint_ignores_the_day_drawn_on_a_template(outage_matrix):
+    other = random_outage_matrix(random.Random(8))
+
+    assert (layout_fingerprint(render_schedule(outage_matrix))
+            == layout_fingerprint(render_schedule(other)))
+    assert (layout_fingerprint(render_schedule(outage_matrix))
+            != layout_fingerprint(_shifted(outage_matrix, -30, 8)))
+
+
+def test_nominal_template_keeps_nominal_geometry(outage_matrix):
+    scale_x, offset_x, scale_y, offset_y = detect_geometry(render_schedule(outage_matrix))
+
+    assert abs(scale_x - 1) < 0.01 and abs(offset_x) <= 1
+    assert abs(scale_y - 1) < 0.01 and abs(offset_y) <= 1
+
+
+def test_shifted_grid_is_found(outage_matrix):
+    img = _shifted(outage_matrix, -30, 8)
+    nominal = _classify(img, lambda image: (SamplingPlan.for_image_size(image.size),
+                                            get_classifier()))
+
+    geometry = detect_geometry(img)
+
+    assert abs(geometry[1] + 30) <= 1 and abs(geometry[3] - 8) <= 1
+    assert not np.array_equal(nominal, outage_matrix)
+    assert np.array_equal(_classify(img, GridCalibrator().calibrate), outage_matrix)
+
+
+def test_grid_leaving_the_image_falls_back_to_nominal(outage_matrix):
+    calibration = GridCalibrator().calibration(_shifted(outage_matrix, 40, 0))
+
+    assert calibration.geometry == NOMINAL_GEOMETRY
+
+
+def test_scaled_image_is_analyzed_correctly(outage_matrix):
+    img = render_schedule(outage_matrix, size=(2560, 670))
+
+    assert np.array_equal(_classify(img, GridCalibrator().calibrate), outage_matrix)
+
+
+def test_calibrations_are_shared_between_processes(tmp_path, outage_matrix):
+    img = _shifted(outage_matrix, -30, 8)
+    first = GridCalibrator(str(tmp_path))
+    # Opened before the first one saved anything, like a sibling worker
+    second = GridCalibrator(str(tmp_path))
+
+    first.calibration(img)
+    calibration = second.calibration(img)
+
+    assert (first.misses, second.misses, second.hits) == (1, 0, 1)
+    assert calibration.geometry == first.calibration(img).geometry
+
+
+def test_saving_merges_calibrations_of_other_processes(tmp_path, outage_matrix):
+    first = GridCalibrator(str(tmp_path))
+    second = GridCalibrator(str(tmp_path))
+    first.calibration(render_schedule(outage_matrix))
+    second.calibration(_shifted(outage_matrix, -30, 8))
+
+    third = GridCalibrator(str(tmp_path))
+    third.calibration(render_schedule(outage_matrix))
+    third.calibration(_shifted(outage_matrix, -30, 8))
+
+    assert (third.hits, third.misses) == (2, 0)
+
+
+def test_failed_save_leaves_no_temporary_file(tmp_path, outage_matrix, monkeypatch):
+    calibrator = GridCalibrator(str(tmp_path))
+
+    def fail(*args):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, 'replace', fail)
+    calibrator.calibration(render_schedule(outage_matrix))
+
+    assert os.listdir(tmp_path) == []
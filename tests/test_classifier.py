@@ -0,0 +1,80 @@
+"""Tests of the lookup-table palette classifier."""
+
+import numpy as np
+import pytest
+
+from analyze_schedule import PaletteClassifier, get_classifier
+from schedule_config import NO_OUTAGE, ScheduleConfig
+
+PALETTE = list(ScheduleConfig.QUEUE_COLORS)
+
+
+def reference_ids(pixels: np.ndarray, palette, thresholds) -> np.ndarray:
+    """Nearest palette colour within its threshold, by plain Euclidean distance."""
+    ids = []
+    for pixel in pixels.tolist():
+        best_id, best_distance = NO_OUTAGE, None
+        for color_id, (color, threshold) in enumerate(zip(palette, thresholds), start=1):
+            distance = sum((a - b) ** 2 for a, b in zip(pixel, color))
+            if distance < threshold ** 2 and (best_distance is None or distance < best_distance):
+                best_id, best_distance = color_id, distance
+        ids.append(best_id)
+    return np.array(ids, dtype=np.uint8)
+
+
+def table_entry(classifier: PaletteClassifier, pixel) -> int:
+    red, green, blue = (value >> classifier.QUANT_SHIFT for value in pixel)
+    return int(classifier.table[(red * classifier.LEVELS + green) * classifier.LEVELS + blue])
+
+
+def sample_pixels(palette, seed: int = 3) -> np.ndarray:
+    """Uniform pixels plus pixels scattered around every palette colour."""
+    rng = np.random.default_rng(seed)
+    uniform = rng.integers(0, 256, size=(2000, 3))
+    near = (np.repeat(np.array(palette), 300, axis=0) +
+            rng.integers(-60, 61, size=(len(palette) * 300, 3)))
+    return np.clip(np.concatenate([uniform, near]), 0, 255).astype(np.uint8)
+
+
+@pytest.mark.parametrize('threshold', [ScheduleConfig.COLOR_THRESHOLD,
+                                       tuple(range(20, 20 + 5 * len(PALETTE), 5))])
+def test_table_matches_euclidean_definition(threshold):
+    classifier = PaletteClassifier(PALETTE, threshold)
+    pixels = sample_pixels(PALETTE)
+    expected = reference_ids(pixels, PALETTE, classifier.thresholds)
+
+    assert np.array_equal(classifier.classify_array(pixels), expected)
+    assert [classifier.classify(tuple(pixel)) for pixel in pixels.tolist()] == expected.tolist()
+
+
+def test_ambiguous_bins_fall_back_to_exact_distance():
+    classifier = PaletteClassifier([(100, 100, 100)], 10)
+    # Distances 9.95 and 10.05 share one 4x4x4 bin on the threshold sphere
+    inside, outside = (109, 104, 101), (109, 104, 102)
+
+    assert table_entry(classifier, inside) == classifier.AMBIGUOUS
+    assert table_entry(classifier, outside) == classifier.AMBIGUOUS
+    assert classifier.classify(inside) == 1
+    assert classifier.classify(outside) == NO_OUTAGE
+    assert classifier.classify_array(np.array([inside, outside], dtype=np.uint8)).tolist() == \
+        [1, NO_OUTAGE]
+
+
+def test_rgba_pixels_ignore_alpha():
+    classifier = get_classifier()
+    color = PALETTE[0]
+
+    assert classifier.classify(color + (0,)) == 1
+    assert classifier.classify_array(np.array([[color + (255,)]], dtype=np.uint8)).tolist() == [[1]]
+
+
+def test_threshold_count_must_match_palette():
+    with pytest.raises(ValueError):
+        PaletteClassifier(PALETTE, (30, 40))
+
+
+def test_classifiers_are_shared_per_palette_and_threshold():
+    assert get_classifier() is get_classifier(PALETTE, ScheduleConfig.COLOR_THRESHOLD)
+    assert get_classifier(threshold=[20] * len(PALETTE)) is \
+        get_classifier(threshold=(20,) * len(PALETTE))
+    assert get_classifier(threshold=20) is not get_classifier()
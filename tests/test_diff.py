@@ -0,0 +1,49 @@
+"""Tests of schedule revision diffs."""
+
+from datetime import date
+
+from src.core.schedule import QUEUE_COUNT, DaySchedule
+from src.pipeline.diff import diff_image_with_schedule, diff_images
+from src.storage.binary_archive import BinaryArchive
+
+DAY = date(2026, 1, 12)
+
+
+def test_identical_images_reuse_every_row(schedule_png):
+    diff = diff_images(schedule_png, schedule_png, DAY)
+
+    assert diff.changed_queues == []
+    assert diff.changed_slots == 0
+    assert diff.rows_classified == 0
+
+
+def test_changed_row_is_the_only_one_classified(outage_matrix, render_png, schedule_png):
+    corrected = outage_matrix.copy()
+    corrected[3, 10:12] = 0 if corrected[3, 10] else 1
+
+    diff = diff_images(schedule_png, render_png(corrected), DAY)
+
+    assert diff.rows_classified == 1
+    assert diff.changed_queues == [3]
+    assert diff.changed_slots == 2
+    assert diff.to_dict()["unchanged"] == QUEUE_COUNT - 1
+
+
+def test_image_matches_its_archived_schedule(outage_matrix, schedule_png):
+    previous = DaySchedule.from_matrix(DAY, outage_matrix)
+
+    diff = diff_image_with_schedule(previous, schedule_png, DAY)
+
+    assert diff.to_dict()["baseline"] is True
+    assert diff.changed_queues == []
+
+
+def test_day_missing_from_binary_archive_has_no_baseline(tmp_path, schedule_png):
+    with BinaryArchive(str(tmp_path / 'archive.bin')) as archive:
+        archive.store_day(DaySchedule(date(2026, 1, 10), [0] * QUEUE_COUNT))
+        archive.store_day(DaySchedule(date(2026, 1, 14), [0] * QUEUE_COUNT))
+
+        diff = diff_image_with_schedule(archive.get_day(DAY), schedule_png, DAY)
+
+    assert diff.to_dict()["baseline"] is False
+    assert diff.changed_queues == list(range(QUEUE_COUNT))
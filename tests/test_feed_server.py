@@ -0,0 +1,92 @@
+"""Tests of the feed server's conditional responses."""
+
+import http.client
+import threading
+from datetime import date
+
+import pytest
+
+from src.core.schedule import QUEUE_COUNT, DaySchedule, mask_from_intervals
+from src.server.feeds import FeedCache
+from src.server.http_server import FeedServer
+from src.storage.archive import open_archive
+
+DAY = date(2026, 1, 12)
+WINDOW = '?from=2026-01-10&to=2026-01-14'
+
+
+def make_day(date_obj: date, start: int) -> DaySchedule:
+    return DaySchedule(date_obj, [mask_from_intervals([(start, start + 4)])] * QUEUE_COUNT)
+
+
+@pytest.fixture(params=['archive.sqlite', 'archive.bin'])
+def served(request, tmp_path):
+    """Archive with one day and a running server; yields (archive, feeds, request)."""
+    with open_archive(str(tmp_path / request.param)) as archive:
+        archive.store_day(make_day(DAY, 16))
+        feeds = FeedCache(archive)
+        feeds.REVALIDATE_SECONDS = 0
+        server = FeedServer(('127.0.0.1', 0), feeds, quiet=True)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+
+        def get(path, headers=None, method='GET'):
+            connection = http.client.HTTPConnection(*server.server_address[:2], timeout=5)
+            try:
+                connection.request(method, path, headers=headers or {})
+                response = connection.getresponse()
+                return response.status, dict(response.getheaders()), response.read()
+            finally:
+                connection.close()
+
+        try:
+            yield archive, feeds, get
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+@pytest.mark.parametrize('fmt', ['ics', 'json'])
+def test_matching_etag_gets_304(served, fmt):
+    _, feeds, get = served
+    status, headers, body = get(f'/1-1.{fmt}{WINDOW}')
+    assert status == 200 and body
+    assert headers['Last-Modified']
+
+    status, headers_304, body = get(f'/1-1.{fmt}{WINDOW}', {'If-None-Match': headers['ETag']})
+
+    assert status == 304 and body == b''
+    assert headers_304['ETag'] == headers['ETag']
+    assert feeds.renders == 1
+
+
+def test_weak_etag_list_and_last_modified_match(served):
+    _, _, get = served
+    _, headers, _ = get(f'/1-1.ics{WINDOW}')
+
+    etags = f'"other", W/{headers["ETag"]}'
+    assert get(f'/1-1.ics{WINDOW}', {'If-None-Match': etags})[0] == 304
+    assert get(f'/1-1.ics{WINDOW}', {'If-Modified-Since': headers['Last-Modified']})[0] == 304
+    # If-None-Match takes precedence over a matching date
+    assert get(f'/1-1.ics{WINDOW}', {'If-None-Match': '"other"',
+                                     'If-Modified-Since': headers['Last-Modified']})[0] == 200
+
+
+def test_archive_write_changes_etag(served):
+    archive, _, get = served
+    _, headers, _ = get(f'/1-1.ics{WINDOW}')
+
+    archive.store_day(make_day(DAY, 30))
+    status, new_headers, _ = get(f'/1-1.ics{WINDOW}', {'If-None-Match': headers['ETag']})
+
+    assert status == 200
+    assert new_headers['ETag'] != headers['ETag']
+
+
+def test_head_and_errors(served):
+    _, _, get = served
+
+    status, headers, body = get(f'/1-1.ics{WINDOW}', method='HEAD')
+    assert status == 200 and body == b'' and int(headers['Content-Length']) > 0
+    assert get('/9-9.ics')[0] == 404
+    assert get('/1-1.ics?from=2026-13-01')[0] == 400
@@ -0,0 +1,129 @@
+"""Tests of the streaming ICS writer and incremental calendar updates."""
+
+import os
+from datetime import date, datetime
+
+import pytest
+from icalendar import Calendar
+
+from src.core.schedule import QUEUE_COUNT, QUEUE_NAMES, DaySchedule, mask_from_intervals
+from src.utils.calendar_export import CalendarExporter
+from src.utils.ics_writer import update_calendar
+from src.utils.result_builder import QueueResult
+
+DAY = date(2026, 1, 12)
+QUEUE = QUEUE_NAMES[0]
+MORNING = {'start': '08:00', 'end': '10:00'}
+EVENING = {'start': '20:00', 'end': '00:00'}
+
+
+def read_events(path):
+    """Map event UID to (STATUS, SEQUENCE) of a calendar file."""
+    with open(path, 'rb') as f:
+        calendar = Calendar.from_ical(f.read())
+    return {str(event['UID']): (str(event.get('STATUS')), int(event.get('SEQUENCE', 0)))
+            for event in calendar.walk('VEVENT')}
+
+
+def uid(outage):
+    return CalendarExporter.event_uid(DAY, QUEUE, outage['start'], outage['end'])
+
+
+@pytest.mark.parametrize('queue_name, day, outages', [
+    (QUEUE_NAMES[0], datetime(2026, 1, 12), [MORNING]),
+    # Daylight saving time starts on 2026-03-29 in Kyiv
+    (QUEUE_NAMES[5], datetime(2026, 3, 29), [{'start': '00:00', 'end': '01:30'}, MORNING, EVENING]),
+    (QUEUE_NAMES[-1], datetime(2026, 12, 31), [{'start': '22:30', 'end': '24:00'}]),
+])
+def test_streaming_writer_matches_icalendar_export(tmp_path, queue_name, day, outages):
+    data = {'queue': queue_name, 'outages': outages}
+    reference, streamed = str(tmp_path / 'reference.ics'), str(tmp_path / 'streamed.ics')
+
+    assert CalendarExporter.export_to_ics(data, day, reference)[0]
+    assert CalendarExporter.export_to_ics_streaming(data, day, streamed)[0]
+
+    with open(reference, 'rb') as f, open(streamed, 'rb') as g:
+        assert g.read() == f.read()
+
+
+def test_new_calendar_has_confirmed_events(tmp_path):
+    path = str(tmp_path / 'queue.ics')
+
+    counts = update_calendar(path, QUEUE, [(DAY, QUEUE, [MORNING, EVENING])])
+
+    assert counts['added'] == 2
+    assert read_events(path) == {uid(MORNING): ('CONFIRMED', 0),
+                                 uid(EVENING): ('CONFIRMED', 0)}
+
+
+def test_unchanged_update_leaves_file_alone(tmp_path):
+    path = str(tmp_path / 'queue.ics')
+    update_calendar(path, QUEUE, [(DAY, QUEUE, [MORNING])])
+    with open(path, 'rb') as f:
+        before = f.read()
+
+    counts = update_calendar(path, QUEUE, [(DAY, QUEUE, [MORNING])])
+
+    assert counts == {'added': 0, 'cancelled': 0, 'restored': 0, 'unchanged': 1}
+    with open(path, 'rb') as f:
+        assert f.read() == before
+
+
+def test_removed_outage_is_cancelled_and_restored(tmp_path):
+    path = str(tmp_path / 'queue.ics')
+    update_calendar(path, QUEUE, [(DAY, QUEUE, [MORNING, EVENING])])
+
+    counts = update_calendar(path, QUEUE, [(DAY, QUEUE, [EVENING])])
+
+    assert counts['cancelled'] == 1
+    assert read_events(path)[uid(MORNING)] == ('CANCELLED', 1)
+    assert read_events(path)[uid(EVENING)] == ('CONFIRMED', 0)
+
+    counts = update_calendar(path, QUEUE, [(DAY, QUEUE, [MORNING, EVENING])])
+
+    assert counts['restored'] == 1
+    assert read_events(path)[uid(MORNING)] == ('CONFIRMED', 2)
+
+
+def test_other_days_are_not_touched(tmp_path):
+    path = str(tmp_path / 'queue.ics')
+    other = date(2026, 1, 13)
+    update_calendar(path, QUEUE, [(DAY, QUEUE, [MORNING]), (other, QUEUE, [MORNING])])
+
+    update_calendar(path, QUEUE, [(DAY, QUEUE, [])])
+
+    statuses = sorted(status for status, _ in read_events(path).values())
+    assert statuses == ['CANCELLED', 'CONFIRMED']
+
+
+def test_export_many_cancels_with_days_without_outages(tmp_path):
+    destination = str(tmp_path / 'calendars')
+    busy = DaySchedule(DAY, [mask_from_intervals([(16, 20)])] + [0] * (QUEUE_COUNT - 1))
+    assert CalendarExporter.export_many([busy], destination, queue_ids=[0])[0]
+    path = os.path.join(destination, os.listdir(destination)[0])
+
+    success, _ = CalendarExporter.export_many([DaySchedule(DAY)], destination, queue_ids=[0])
+
+    assert success
+    assert [status for status, _ in read_events(path).values()] == ['CANCELLED']
+
+
+def test_export_many_without_outages_or_calendars_fails(tmp_path):
+    success, _ = CalendarExporter.export_many([DaySchedule(DAY)], str(tmp_path / 'none'))
+
+    assert not success
+
+
+def test_exporting_a_revised_result_updates_the_calendar(tmp_path):
+    path = str(tmp_path / 'queue.ics')
+    assert CalendarExporter.export_result(QueueResult(QUEUE, DAY, [(16, 20), (40, 48)]), path)[0]
+
+    assert CalendarExporter.export_result(QueueResult(QUEUE, DAY, [(40, 48)]), path)[0]
+
+    assert read_events(path) == {uid(MORNING): ('CANCELLED', 1), uid(EVENING): ('CONFIRMED', 0)}
+
+    assert CalendarExporter.export_result(QueueResult(QUEUE, DAY, []), path)[0]
+
+    assert read_events(path)[uid(EVENING)] == ('CANCELLED', 1)
+    assert not CalendarExporter.export_result(QueueResult(QUEUE, DAY, []),
+                                              str(tmp_path / 'new.ics'))[0]
@@ -0,0 +1,62 @@
+"""Tests of the asyncio ingestion pipeline and its sinks."""
+
+import io
+import json
+
+from src.pipeline import ingest
+from src.pipeline.ingest import CalendarSink, IngestionPipeline, JsonlSink
+
+
+def _pipeline(sinks, **kwargs) -> IngestionPipeline:
+    return IngestionPipeline(sinks, workers=2, readers=2, queue_size=2, use_threads=True,
+                             **kwargs)
+
+
+def _write_days(directory, png: bytes, days: int):
+    paths = []
+    for day in range(1, days + 1):
+        path = directory / f'grafik_2026-01-{day:02d}.png'
+        path.write_bytes(png)
+        paths.append(str(path))
+    return paths
+
+
+def test_failures_are_counted_and_reported(tmp_path, schedule_png):
+    good = _write_days(tmp_path, schedule_png, 1)[0]
+    undated = tmp_path / 'grafik.png'
+    undated.write_bytes(schedule_png)
+    broken = tmp_path / 'grafik_2026-01-02.png'
+    broken.write_bytes(b'not an image')
+    missing = str(tmp_path / 'grafik_2026-01-03.png')
+    output = io.StringIO()
+
+    stats = _pipeline([JsonlSink(output)]).run([good, str(undated), str(broken), missing])
+
+    records = {record["image"]: record
+               for record in map(json.loads, output.getvalue().splitlines())}
+    assert (stats.processed, stats.failed) == (4, 3)
+    assert len(records[good]["queues"]) == 12
+    assert all("error" in records[name] for name in (str(undated), str(broken), missing))
+
+
+def test_calendar_sink_exports_days_in_batches(tmp_path, monkeypatch, schedule_png):
+    calls = []
+    export_many = ingest.CalendarExporter.export_many
+
+    def counting_export(schedules, *args, **kwargs):
+        calls.append(len(schedules))
+        return export_many(schedules, *args, **kwargs)
+
+    monkeypatch.setattr(ingest.CalendarExporter, 'export_many', counting_export)
+    paths = _write_days(tmp_path, schedule_png, 5)
+    combined = tmp_path / 'all.ics'
+    sinks = [CalendarSink(str(tmp_path / 'calendars')),
+             CalendarSink(str(combined), combined=True, batch_size=2)]
+
+    stats = _pipeline(sinks).run(paths)
+
+    assert stats.failed == 0
+    assert sorted(calls) == [1, 2, 2, 5]
+    assert not sinks[0].errors and not sinks[1].errors
+    content = combined.read_text(encoding='utf-8')
+    assert all(f'DTSTART;TZID=Europe/Kiev:202601{day:02d}' in content for day in range(1, 6))
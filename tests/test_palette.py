@@ -0,0 +1,71 @@
+"""Tests of palette learning from the grid cells of a template."""
+
+import numpy as np
+from PIL import Image
+
+from analyze_schedule import (NOMINAL_GEOMETRY, NO_OUTAGE, SamplingPlan, ScheduleConfig,
+                              get_classifier)
+from src.bench.synthetic import render_schedule
+from src.core.calibration import calibrate_template
+from src.core.palette import learn_palette, nominal_palette
+
+# Every configured colour moved further than COLOR_THRESHOLD
+SHIFT = np.array([-40, -25, 30])
+
+
+def _recolored(matrix: np.ndarray) -> Image.Image:
+    """Render a schedule whose template uses shifted outage colours."""
+    pixels = np.asarray(render_schedule(matrix)).copy()
+    for color in ScheduleConfig.QUEUE_COLORS:
+        shifted = np.clip(np.array(color) + SHIFT, 0, 255)
+        pixels[(pixels == color).all(axis=-1)] = shifted
+    return Image.fromarray(pixels, 'RGB')
+
+
+def _classify(img: Image.Image, palette, thresholds) -> np.ndarray:
+    plan = SamplingPlan.for_image_size(img.size)
+    return get_classifier(palette, thresholds).classify_array(plan.sample(img))
+
+
+def test_configured_colours_are_learned_back(outage_matrix):
+    pixels = np.asarray(render_schedule(outage_matrix))
+
+    palette, thresholds = learn_palette(pixels, NOMINAL_GEOMETRY)
+
+    nominal, _ = nominal_palette()
+    assert np.abs(np.array(palette) - np.array(nominal)).max() <= 2
+    assert np.array_equal(_classify(render_schedule(outage_matrix), palette, thresholds),
+                          outage_matrix)
+
+
+def test_recolored_template_is_learned(outage_matrix):
+    img = _recolored(outage_matrix)
+    nominal, nominal_thresholds = nominal_palette()
+    expected = np.clip(np.array(nominal) + SHIFT, 0, 255)
+
+    palette, thresholds = learn_palette(np.asarray(img), NOMINAL_GEOMETRY)
+
+    assert np.abs(np.array(palette) - expected).max() <= 2
+    assert not np.array_equal(_classify(img, nominal, nominal_thresholds), outage_matrix)
+    assert np.array_equal(_classify(img, palette, thresholds), outage_matrix)
+
+
+def test_queue_without_outages_keeps_configured_colour(outage_matrix):
+    matrix = outage_matrix.copy()
+    matrix[4:6] = NO_OUTAGE
+
+    palette, thresholds = learn_palette(np.asarray(_recolored(matrix)), NOMINAL_GEOMETRY)
+
+    nominal, nominal_thresholds = nominal_palette()
+    assert palette[2] == nominal[2]
+    assert thresholds[2] == nominal_thresholds[2]
+
+
+def test_palette_is_learned_only_when_enabled(monkeypatch, outage_matrix):
+    img = _recolored(outage_matrix)
+
+    monkeypatch.setattr(ScheduleConfig, 'LEARN_PALETTE', False)
+    assert calibrate_template(img).palette == nominal_palette()[0]
+
+    monkeypatch.setattr(ScheduleConfig, 'LEARN_PALETTE', True)
+    assert calibrate_template(img).palette != nominal_palette()[0]
@@ -0,0 +1,98 @@
+"""Tests of the on-disk result cache."""
+
+import os
+
+import numpy as np
+
+from src.storage.result_cache import (MARKER_FILE, NAMESPACE_DIR, ResultCache, default_cache_dir,
+                                     hash_image_bytes)
+
+
+def _matrix(value: int = 1) -> np.ndarray:
+    return np.full((12, 48), value, dtype=np.uint8)
+
+
+def test_put_and_get_round_trip(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    cache.put('abc', _matrix(2))
+
+    assert np.array_equal(cache.get('abc'), _matrix(2))
+    assert cache.get('missing') is None
+
+
+def test_entries_live_in_dedicated_namespace(tmp_path):
+    cache = ResultCache(str(tmp_path), fingerprint='0123456789abcdef')
+
+    assert cache.directory == os.path.join(str(tmp_path), NAMESPACE_DIR, '0123456789abcdef')
+    assert os.path.isfile(os.path.join(cache.directory, MARKER_FILE))
+
+
+def test_stale_namespace_is_evicted(tmp_path):
+    old = ResultCache(str(tmp_path), fingerprint='0123456789abcdef')
+    old.put('abc', _matrix())
+
+    ResultCache(str(tmp_path), fingerprint='fedcba9876543210')
+
+    assert not os.path.exists(old.directory)
+
+
+def test_unrelated_directories_are_kept(tmp_path):
+    project = tmp_path / 'important_project'
+    project.mkdir()
+    (project / 'notes.txt').write_text('keep me')
+    namespaces = tmp_path / NAMESPACE_DIR
+    unmarked = namespaces / '0123456789abcdef'
+    unmarked.mkdir(parents=True)
+    (namespaces / 'not-a-namespace').mkdir()
+
+    ResultCache(str(tmp_path), fingerprint='fedcba9876543210')
+
+    assert (project / 'notes.txt').read_text() == 'keep me'
+    assert unmarked.is_dir()
+    assert (namespaces / 'not-a-namespace').is_dir()
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ResultCache(str(tmp_path), max_entries=10)
+    for index in range(11):
+        path = cache._entry_path(f'{index:02d}')
+        cache.put(f'{index:02d}', _matrix())
+        os.utime(path, (index, index))
+
+    assert len(list(cache._iter_entries())) == 9
+    assert cache.get('00') is None
+    assert cache.get('10') is not None
+
+
+def test_default_cache_dir_is_the_application_directory():
+    assert os.path.basename(default_cache_dir()) == 'ScheduleAnalyzer'
+
+
+def test_unmarked_namespaces_of_earlier_versions_are_removed(tmp_path):
+    legacy = [tmp_path / NAMESPACE_DIR / '0123456789abcdef', tmp_path / '1123456789abcdef']
+    for path in legacy:
+        path.mkdir(parents=True)
+        (path / (hash_image_bytes(b'image') + ResultCache.FILE_SUFFIX)).write_bytes(b'\0')
+        (path / 'calibration.json').write_text('{}')
+    other = tmp_path / '2123456789abcdef'
+    other.mkdir()
+    (other / 'notes.txt').write_text('keep me')
+
+    cache = ResultCache(str(tmp_path), fingerprint='fedcba9876543210')
+
+    assert not any(path.exists() for path in legacy)
+    assert (other / 'notes.txt').read_text() == 'keep me'
+    assert os.path.isdir(cache.directory)
+
+
+def test_failed_put_leaves_no_temporary_file(tmp_path, monkeypatch):
+    cache = ResultCache(str(tmp_path))
+
+    def fail(*args):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, 'replace', fail)
+    cache.put('abc', _matrix())
+
+    assert cache.get('abc') is None
+    assert sorted(os.listdir(cache.directory)) == [MARKER_FILE]
@@ -0,0 +1,47 @@
+"""Tests that native-size sampling and band decoding match the resize-then-scan analysis."""
+
+import io
+
+import pytest
+from PIL import Image
+
+from analyze_schedule import (analyze_grid, analyze_loaded, analyze_row, grid_to_outages,
+                              load_schedule_image, resize_image)
+from schedule_config import ScheduleConfig
+
+SIZES = [(1920, 502), (960, 251), (2560, 670), (1000, 262)]
+
+
+def resized_outages(data: bytes):
+    """Outages found by scanning each row of the LANCZOS-resized image."""
+    img = resize_image(Image.open(io.BytesIO(data)).convert('RGB'))
+    return {queue_name: analyze_row(img, y_coord)
+            for queue_name, y_coord in ScheduleConfig.QUEUE_COORDINATES.items()}
+
+
+@pytest.mark.parametrize('size', SIZES)
+@pytest.mark.parametrize('jpeg_quality', [None, 85])
+def test_native_plan_matches_resized_image(outage_matrix, render_png, size, jpeg_quality):
+    data = render_png(outage_matrix, size, jpeg_quality)
+    img = Image.open(io.BytesIO(data)).convert('RGB')
+
+    assert grid_to_outages(analyze_grid(img, resample=False)) == resized_outages(data)
+    assert resized_outages(data) == grid_to_outages(outage_matrix)
+
+
+@pytest.mark.parametrize('size', SIZES)
+@pytest.mark.parametrize('jpeg_quality', [None, 85])
+def test_band_loader_matches_resized_image(outage_matrix, render_png, size, jpeg_quality):
+    data = render_png(outage_matrix, size, jpeg_quality)
+
+    loaded = load_schedule_image(data)
+
+    assert grid_to_outages(analyze_loaded(loaded)) == resized_outages(data)
+    assert loaded.image.height < size[1]
+
+
+def test_large_jpeg_is_decoded_at_reduced_scale(outage_matrix, render_png):
+    loaded = load_schedule_image(render_png(outage_matrix, (2560, 670), 85))
+
+    assert loaded.source_size == (2560, 670)
+    assert loaded.decoded_size == (1280, 335)
@@ -0,0 +1,73 @@
+"""Tests of the bitmask schedule model."""
+
+from datetime import date
+
+import numpy as np
+
+from src.core.schedule import (QUEUE_COUNT, SLOTS_PER_DAY, DaySchedule, ScheduleSeries,
+                               mask_from_intervals, mask_intervals, mask_minutes, queue_id)
+from src.utils.calendar_export import CalendarExporter
+from src.utils.time_calculator import calculate_total_time, queue_sort_key
+
+DAY = date(2026, 1, 12)
+
+
+def test_intervals_round_trip_through_mask():
+    intervals = [(0, 3), (10, 11), (40, 48)]
+    mask = mask_from_intervals(intervals)
+
+    assert mask_intervals(mask) == intervals
+    assert mask_minutes(mask) == 12 * 30
+
+
+def test_from_matrix_matches_outage_slots():
+    matrix = np.zeros((QUEUE_COUNT, SLOTS_PER_DAY), dtype=np.uint8)
+    matrix[2, 4:8] = 3
+    matrix[5, 47] = 1
+
+    schedule = DaySchedule.from_matrix(DAY, matrix)
+
+    assert schedule.intervals(2) == [(4, 8)]
+    assert schedule.intervals(5) == [(47, 48)]
+    assert schedule.outage_count(2) == 1
+    assert schedule.total_minutes(2) == 120
+    assert sum(schedule.masks) == schedule.masks[2] + schedule.masks[5]
+
+
+def test_dict_round_trip_ends_at_midnight():
+    schedule = DaySchedule(DAY, [mask_from_intervals([(2, 4), (44, 48)])] + [0] * 11)
+    data = schedule.to_dict()
+
+    assert data["queues"]["Черга 1-1"][-1] == {"start": "22:00", "end": "24:00"}
+    assert DaySchedule.from_dict(data) == schedule
+
+
+def test_end_time_of_midnight_means_end_of_day():
+    data = {"date": DAY.isoformat(),
+            "queues": {"Черга 3-2": [{"start": "21:00", "end": "00:00"}]}}
+
+    schedule = DaySchedule.from_dict(data)
+
+    assert schedule.intervals(queue_id("Черга 3-2")) == [(42, 48)]
+    assert calculate_total_time(data["queues"]["Черга 3-2"]) == (3, 0, 180)
+    assert (CalendarExporter.event_uid(DAY, "Черга 3-2", "21:00", "00:00")
+            == CalendarExporter.event_uid(DAY, "Черга 3-2", "21:00", "24:00"))
+
+
+def test_series_stores_and_reads_days():
+    series = ScheduleSeries(DAY)
+    later = DaySchedule(date(2026, 1, 14), [mask_from_intervals([(0, 2)])] * QUEUE_COUNT)
+    series.set_day(later)
+
+    assert len(series) == 3
+    assert series.get_day(later.date) == later
+    assert series.get_day(date(2026, 1, 13)) == DaySchedule(date(2026, 1, 13))
+    assert series.total_minutes(0) == 60
+
+
+def test_queue_sort_key_orders_by_queue_numbers():
+    items = [{'queue': name} for name in ('Черга 3-2', 'Невідома', 'Черга 1-2', 'Черга 3-1')]
+
+    assert [item['queue'] for item in sorted(items, key=queue_sort_key)] == \
+        ['Черга 1-2', 'Черга 3-1', 'Черга 3-2', 'Невідома']
+    assert queue_sort_key({'queue': 'Черга 6-2'}) == (6, 2)
@@ -0,0 +1,17 @@
+"""Tests that the application start-up path stays free of heavy libraries."""
+
+import json
+import subprocess
+import sys
+
+from src.bench.startup import HEAVY_MODULES, REPO_ROOT
+
+
+def test_main_window_import_loads_no_heavy_modules():
+    probe = ("import json, sys\n"
+             "import src.ui.main_window\n"
+             f"print(json.dumps([name for name in {HEAVY_MODULES!r} if name in sys.modules]))")
+    completed = subprocess.run([sys.executable, "-c", probe], cwd=REPO_ROOT,
+                               capture_output=True, text=True, check=True)
+
+    assert json.loads(completed.stdout) == []
@@ -0,0 +1,97 @@
+"""Tests of the processed log and the watch-folder ingestion."""
+
+import io
+import os
+import threading
+import time
+
+from src.pipeline.watch import FolderWatcher
+from src.storage.processed_log import ProcessedLog
+from src.storage.result_cache import hash_image_bytes
+
+
+def _run_until(watcher: FolderWatcher, done, timeout: float = 30.0) -> None:
+    stop = threading.Event()
+    thread = threading.Thread(target=watcher.run, args=(stop,))
+    thread.start()
+    deadline = time.monotonic() + timeout
+    try:
+        while not done() and time.monotonic() < deadline:
+            time.sleep(0.05)
+    finally:
+        stop.set()
+        thread.join()
+    assert done()
+
+
+def _watcher(directory: str, log: ProcessedLog, default_date=None) -> FolderWatcher:
+    return FolderWatcher(directory, io.StringIO(), log, default_date=default_date, workers=1,
+                         settle_seconds=0.05, poll_interval=0.05, polling=True)
+
+
+def test_log_survives_restart(tmp_path):
+    path = str(tmp_path / 'processed.log')
+    with ProcessedLog(path) as log:
+        log.record('abc', '/images/a.png', (10, 20))
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('truncated\t1')
+
+    with ProcessedLog(path) as log:
+        assert log.seen('abc')
+        assert log.known_stat('/images/a.png') == (10, 20)
+        assert len(log) == 1
+
+
+def test_failures_are_kept_apart_from_processed_files(tmp_path):
+    path = str(tmp_path / 'processed.log')
+    with ProcessedLog(path) as log:
+        log.record_failure('abc', '/images/a.png', (10, 20), 'немає\tдати\n')
+        log.record_failure('def', '/images/b.png', (30, 40), 'помилка')
+        log.record('def', '/images/b.png', (30, 40))
+
+    with ProcessedLog(path) as log:
+        assert not log.seen('abc')
+        assert log.known_stat('/images/a.png') is None
+        assert log.failures() == {'/images/a.png': 'немає дати'}
+
+
+def test_failed_analysis_is_retried(tmp_path, schedule_png):
+    images = tmp_path / 'incoming'
+    images.mkdir()
+    image = images / 'schedule.png'
+    image.write_bytes(schedule_png)
+    state = str(tmp_path / 'processed.log')
+
+    with ProcessedLog(state) as log:
+        watcher = _watcher(str(images), log)
+        _run_until(watcher, lambda: watcher.failed == 1)
+        assert not log.seen(hash_image_bytes(schedule_png))
+        assert list(log.failures()) == [str(image)]
+
+        # Saving the same content again triggers another attempt
+        image.write_bytes(schedule_png)
+        _run_until(watcher, lambda: watcher.failed == 2)
+
+    # After a restart the file is analyzed again and succeeds
+    with ProcessedLog(state) as log:
+        watcher = _watcher(str(images), log, default_date='2026-01-12')
+        _run_until(watcher, lambda: watcher.processed == 1)
+        assert watcher.failed == 0
+        assert log.known_stat(str(image)) == (os.stat(image).st_size,
+                                              os.stat(image).st_mtime_ns)
+        assert log.failures() == {}
+
+
+def test_processed_content_is_skipped(tmp_path, schedule_png):
+    images = tmp_path / 'incoming'
+    images.mkdir()
+    (images / 'a_2026-01-12.png').write_bytes(schedule_png)
+    (images / 'b_2026-01-12.png').write_bytes(schedule_png)
+
+    with ProcessedLog(str(tmp_path / 'processed.log')) as log:
+        watcher = _watcher(str(images), log)
+        _run_until(watcher, lambda: watcher.processed + watcher.skipped == 2)
+
+    assert watcher.processed == 1
+    assert watcher.skipped == 1
+    assert watcher.failed == 0